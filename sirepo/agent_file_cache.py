@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Cache of lib and sim db files fetched from the supervisor by job_cmd
+
+Files are kept once per user dir (`cfg.dir`, set by the agent),
+revalidated with conditional GETs (ETag) and hardlinked into run
+dirs. Cached files are read-only so a run cannot modify the cache
+through a hardlink. Least recently used files are evicted when the
+cache exceeds `cfg.max_bytes`.
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from pykern import pkconfig
+from pykern import pkio
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdlog, pkdp
+import hashlib
+import os
+import shutil
+import sirepo.job
+
+_CHUNK_BYTES = 1024 * 1024
+
+_ETAG_SUFFIX = ".etag"
+
+_TMP_SUFFIX = ".tmp"
+
+_READ_ONLY = 0o444
+
+_cfg = None
+
+
+def to_path(key, path, get, copy=False):
+    """Write the content of key to path, fetching only if it changed
+
+    Args:
+        key (str): stable identifier of the content (uris may be unique per op)
+        path (py.path): destination
+        get (callable): takes headers and returns a streamed `requests.Response`
+        copy (bool): copy instead of hardlink, e.g. if path is chmod-ed [False]
+    Returns:
+        py.path: path
+    """
+    path = pkio.py_path(path)
+    if not _cfg.dir:
+        r = get(PKDict())
+        r.raise_for_status()
+        _download(r, path)
+        return path
+    d = pkio.mkdir_parent(_cfg.dir)
+    h = hashlib.sha1(key.encode()).hexdigest()
+    f = d.join(h)
+    e = d.join(h + _ETAG_SUFFIX)
+    x = PKDict()
+    if f.exists() and e.exists():
+        x["If-None-Match"] = pkio.read_text(e)
+    r = get(x)
+    if r.status_code == 304 and x:
+        r.close()
+        pkdc("hit key={}", key)
+    else:
+        r.raise_for_status()
+        _fill(d, f, e, r)
+    try:
+        # mtime is the LRU time
+        os.utime(f)
+        _link(f, path, copy)
+    except FileNotFoundError:
+        # evicted by another process
+        return to_path(key, path, get, copy=copy)
+    return path
+
+
+def _download(response, path):
+    with path.open("wb") as o:
+        for c in response.iter_content(chunk_size=_CHUNK_BYTES):
+            o.write(c)
+
+
+def _fill(cache_dir, path, etag_path, response):
+    t = cache_dir.join(path.basename + "-" + sirepo.job.unique_key() + _TMP_SUFFIX)
+    try:
+        _download(response, t)
+        t.chmod(_READ_ONLY)
+        # data before etag so a crash or a race only causes a refetch
+        os.replace(t, path)
+        v = response.headers.get("ETag")
+        if v:
+            pkio.write_text(t, v)
+            os.replace(t, etag_path)
+        else:
+            pkio.unchecked_remove(etag_path)
+    finally:
+        pkio.unchecked_remove(t)
+    _trim(cache_dir)
+
+
+def _link(src, dst, copy):
+    pkio.unchecked_remove(dst)
+    if not copy:
+        try:
+            os.link(src, dst)
+            return
+        except OSError as e:
+            if isinstance(e, FileNotFoundError):
+                raise
+            # e.g. different file systems
+            pkdlog("link failed src={} dst={} error={}", src, dst, e)
+    shutil.copyfile(src, dst)
+
+
+def _trim(cache_dir):
+    f = []
+    n = 0
+    for p in cache_dir.listdir():
+        if p.ext in (_ETAG_SUFFIX, _TMP_SUFFIX):
+            continue
+        try:
+            s = os.stat(p)
+        except FileNotFoundError:
+            continue
+        f.append((s.st_mtime, s.st_size, p))
+        n += s.st_size
+    for _, s, p in sorted(f, key=lambda x: x[0]):
+        if n <= _cfg.max_bytes:
+            return
+        pkio.unchecked_remove(p, cache_dir.join(p.basename + _ETAG_SUFFIX))
+        n -= s
+
+
+_cfg = pkconfig.init(
+    dir=(None, pkio.py_path, "where to cache files (set by job_agent)"),
+    max_bytes=(int(1e9), int, "maximum size of cached files"),
+)
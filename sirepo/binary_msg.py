@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""Binary encoding of messages with large numeric arrays
+
+Messages are JSON except that large numeric lists and numpy arrays
+are replaced by placeholders and sent as raw little-endian buffers
+after the JSON. Messages without arrays are plain JSON so receivers
+can always call `load_any`.
+
+Layout::
+
+    MAGIC, uint32 meta_len, uint32 value_len,
+    meta JSON ([[dtype, shape, offset], ...]), value JSON,
+    pad to 8 bytes, array buffers (each 8 byte aligned)
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from pykern import pkjson
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdlog, pkdp
+import json
+import numpy
+import struct
+
+#: mime type of binary replies (also in sirepo.js)
+CONTENT_TYPE = "application/x-sirepo-binary"
+
+#: first bytes of a binary message
+MAGIC = b"SRB1"
+
+#: placeholder key for an array in the value JSON (also in sirepo.js)
+_ARRAY_KEY = "_srArray"
+
+#: lists shorter than this are left as JSON
+_MIN_ARRAY_LEN = 256
+
+#: arrays which are images so precision is not an issue
+_FLOAT32_KEYS = frozenset(("z_matrix",))
+
+_ALIGN = 8
+
+_HEADER = struct.Struct("<4sII")
+
+_INT32 = numpy.iinfo(numpy.int32)
+
+
+def accepts(accept_header):
+    """Does client accept binary replies
+
+    Args:
+        accept_header (str): value of Accept or None
+    Returns:
+        bool: True if CONTENT_TYPE in header
+    """
+    return bool(accept_header) and CONTENT_TYPE in accept_header
+
+
+def dump_bytes(obj, want_binary=True, convert_lists=True):
+    """Encode obj, binary if it contains large numeric arrays
+
+    Args:
+        obj (object): message
+        want_binary (bool): if False, arrays are converted to lists [True]
+        convert_lists (bool): if False, only numpy arrays are sent as binary [True]
+    Returns:
+        bytes: binary message or JSON
+    """
+    if not want_binary:
+        return pkjson.dump_bytes(to_lists(obj))
+    a = []
+    v = _encode(obj, a, None, convert_lists)
+    if not a:
+        return pkjson.dump_bytes(obj)
+    m = []
+    o = 0
+    for x in a:
+        m.append([x.dtype.str, list(x.shape), o])
+        o += _aligned(x.nbytes)
+    m = json.dumps(m).encode()
+    v = pkjson.dump_bytes(v)
+    h = _HEADER.pack(MAGIC, len(m), len(v))
+    res = [h, m, v, _pad(len(h) + len(m) + len(v))]
+    for x in a:
+        res.append(x.tobytes())
+        res.append(_pad(x.nbytes))
+    return b"".join(res)
+
+
+def is_binary(data):
+    """Is data a binary message
+
+    Args:
+        data (bytes or str): message
+    Returns:
+        bool: True if encoded by `dump_bytes` with arrays
+    """
+    return isinstance(data, bytes) and data[: len(MAGIC)] == MAGIC
+
+
+def load_any(data):
+    """Decode `dump_bytes` or JSON
+
+    Arrays are read only numpy views on `data`.
+
+    Args:
+        data (bytes or str): message
+    Returns:
+        object: decoded message
+    """
+    if not is_binary(data):
+        return pkjson.load_any(data)
+    _, m, v = _HEADER.unpack_from(data)
+    b = memoryview(data)
+    s = _HEADER.size
+    d = _aligned(s + m + v)
+    a = []
+    for t, shape, o in json.loads(bytes(b[s : s + m])):
+        a.append(
+            numpy.frombuffer(
+                b,
+                dtype=t,
+                count=int(numpy.prod(shape)),
+                offset=d + o,
+            ).reshape(shape),
+        )
+
+    def _hook(pairs):
+        r = PKDict(pairs)
+        if len(r) == 1 and _ARRAY_KEY in r:
+            return a[r[_ARRAY_KEY]]
+        return r
+
+    return json.loads(bytes(b[s + m : s + m + v]), object_pairs_hook=_hook)
+
+
+def to_lists(obj):
+    """Replace numpy arrays with lists so obj can be formatted as JSON
+
+    Args:
+        obj (object): decoded message
+    Returns:
+        object: obj or copy without arrays
+    """
+    if isinstance(obj, numpy.ndarray):
+        return obj.tolist()
+    if isinstance(obj, dict):
+        return PKDict((k, to_lists(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return [to_lists(v) for v in obj]
+    return obj
+
+
+def _aligned(n):
+    return n + len(_pad(n))
+
+
+def _as_array(value, key):
+    """Convert value to a little endian array, if possible"""
+    if isinstance(value, numpy.ndarray):
+        a = value
+    else:
+        x = value[0]
+        if isinstance(x, list):
+            if not x or len(value) * len(x) < _MIN_ARRAY_LEN:
+                return None
+            x = x[0]
+        elif len(value) < _MIN_ARRAY_LEN:
+            return None
+        if isinstance(x, bool) or not isinstance(x, (int, float)):
+            return None
+        try:
+            a = numpy.asarray(value)
+        except ValueError:
+            # ragged
+            return None
+    if a.ndim not in (1, 2) or a.dtype.kind not in "fiu":
+        return None
+    if key in _FLOAT32_KEYS or a.dtype == numpy.float32:
+        t = "<f4"
+    elif a.dtype.kind == "f":
+        t = "<f8"
+    elif a.size == 0 or (a.min() >= _INT32.min and a.max() <= _INT32.max):
+        t = "<i4"
+    else:
+        t = "<f8"
+    return numpy.ascontiguousarray(a, dtype=t)
+
+
+def _encode(obj, arrays, key, convert_lists):
+    if isinstance(obj, dict):
+        return PKDict(
+            (k, _encode(v, arrays, k, convert_lists)) for k, v in obj.items()
+        )
+    if isinstance(obj, numpy.ndarray) or (
+        convert_lists and isinstance(obj, (list, tuple)) and len(obj)
+    ):
+        a = _as_array(obj, key)
+        if a is not None:
+            arrays.append(a)
+            return PKDict({_ARRAY_KEY: len(arrays) - 1})
+        if isinstance(obj, numpy.ndarray):
+            return obj.tolist()
+        return [_encode(v, arrays, None, convert_lists) for v in obj]
+    if isinstance(obj, (list, tuple)):
+        return [_encode(v, arrays, None, convert_lists) for v in obj]
+    return obj
+
+
+def _pad(n):
+    return b"\0" * (-n % _ALIGN)
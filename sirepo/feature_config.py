@@ -132,6 +132,10 @@ def _init():
         ),
         schema_common=dict(
             hide_guest_warning=b("Hide the guest warning in the UI", dev=True),
+            run_status_stream=b(
+                "Stream run status to the browser instead of polling runStatus",
+                dev=True,
+            ),
         ),
         moderated_sim_types=(
             frozenset(),
@@ -43,6 +43,9 @@ SERVER_RUN_MULTI_URI = "/job-api-run-multi-request"
 #: path supervisor registers to receive pings from server
 SERVER_PING_URI = "/job-api-ping"
 
+#: path supervisor registers to stream run status to server
+SERVER_STATUS_STREAM_URI = "/job-api-status-stream"
+
 #: path supervisor registers to receive requests from job_process for file PUTs
 DATA_FILE_URI = "/job-cmd-data-file"
 
@@ -184,6 +187,23 @@ cd '{}'
 
 
 def agent_env(env=None, uid=None):
+    return "\n".join(
+        (
+            "export {}='{}'".format(k, v)
+            for k, v in agent_env_values(env=env, uid=uid).items()
+        )
+    )
+
+
+def agent_env_values(env=None, uid=None):
+    """Environment for agents and job_cmds (see `agent_env`)
+
+    Args:
+        env (PKDict): values which override the defaults [None]
+        uid (str): user of the agent [logged in user]
+    Returns:
+        PKDict: env values (not necessarily str)
+    """
     x = pkconfig.to_environ(
         (
             "pykern.*",
@@ -201,6 +221,7 @@ def agent_env(env=None, uid=None):
             PYTHONSTARTUP="",
             PYTHONUNBUFFERED="1",
             SIREPO_AUTH_LOGGED_IN_USER=lambda: uid or sirepo.auth.hack_logged_in_user(),
+            SIREPO_JOB_BINARY_MESSAGES=_cfg.binary_messages,
             SIREPO_JOB_VERIFY_TLS=_cfg.verify_tls,
             SIREPO_JOB_MAX_MESSAGE_BYTES=_cfg.max_message_bytes,
             SIREPO_JOB_PING_INTERVAL_SECS=_cfg.ping_interval_secs,
@@ -216,7 +237,7 @@ def agent_env(env=None, uid=None):
             k,
             pykern.pkdebug.SECRETS_RE,
         )
-    return "\n".join(("export {}='{}'".format(k, v) for k, v in env.items()))
+    return env
 
 
 def cfg():
@@ -229,6 +250,11 @@ def init_module():
     if _cfg:
         return _cfg
     _cfg = pkconfig.init(
+        binary_messages=(
+            True,
+            bool,
+            "send large numeric arrays in binary (see sirepo.binary_msg)",
+        ),
         max_message_bytes=(
             int(2e8),
             pkconfig.parse_bytes,
@@ -8,29 +8,37 @@ from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp, pkdpretty
 from sirepo import simulation_db
 from sirepo.template import template_common
-import inspect
+import bisect
+import os
 import pykern.pkconfig
 import pykern.pkio
-import re
 import requests
+import requests.adapters
 import sirepo.quest
 import sirepo.auth
+import sirepo.binary_msg
 import sirepo.job
 import sirepo.mpi
 import sirepo.sim_data
 import sirepo.uri_router
 import sirepo.util
+import time
 
+#: upper bounds in seconds of `latency_histograms` buckets
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
 
-#: how many call frames to search backwards to find the api_.* caller
-_MAX_FRAME_SEARCH_DEPTH = 6
+#: api_name to histogram of supervisor request times
+_latency = PKDict()
+
+#: requests.Session per process
+_session_cache = PKDict(pid=None, session=None)
 
 
 class API(sirepo.quest.API):
     @sirepo.quest.Spec("internal_test", days="TimeDeltaDays")
     def api_adjustSupervisorSrtime(self, days):
         return self.request(
-            api_name="not used",
+            "api_adjustSupervisorSrtime",
             _request_content=PKDict(days=days),
             _request_uri=self._supervisor_uri(sirepo.job.SERVER_SRTIME_URI),
         )
@@ -38,17 +46,19 @@ class API(sirepo.quest.API):
     @sirepo.quest.Spec("require_adm")
     def api_admJobs(self):
         return self.request(
+            "api_admJobs",
             _request_content=PKDict(**self.parse_post()),
         )
 
     @sirepo.quest.Spec("require_user")
     def api_analysisJob(self):
-        return self.request()
+        return self.request("api_analysisJob")
 
     @sirepo.quest.Spec("require_user")
     def api_beginSession(self):
         u = self.auth.logged_in_user()
         return self.request(
+            "api_beginSession",
             _request_content=PKDict(
                 uid=u,
                 userDir=str(sirepo.simulation_db.user_path(u)),
@@ -80,6 +90,7 @@ class API(sirepo.quest.API):
             t.mksymlinkto(d, absolute=True)
             try:
                 r = self.request(
+                    "api_downloadDataFile",
                     computeJobHash="unused",
                     dataFileKey=t.basename,
                     frame=int(frame),
@@ -110,6 +121,7 @@ class API(sirepo.quest.API):
         try:
             k = sirepo.job.unique_key()
             r = self.request(
+                "api_jobSupervisorPing",
                 _request_content=PKDict(ping=k),
                 _request_uri=self._supervisor_uri(sirepo.job.SERVER_PING_URI),
             )
@@ -133,6 +145,7 @@ class API(sirepo.quest.API):
     @sirepo.quest.Spec("require_user")
     def api_ownJobs(self):
         return self.request(
+            "api_ownJobs",
             _request_content=self.parse_post().pkupdate(
                 uid=self.auth.logged_in_user(),
             ),
@@ -141,7 +154,7 @@ class API(sirepo.quest.API):
     @sirepo.quest.Spec("require_user")
     def api_runCancel(self):
         try:
-            return self.request()
+            return self.request("api_runCancel")
         except Exception as e:
             pkdlog("ignoring exception={} stack={}", e, pkdexc())
         # Always true from the client's perspective
@@ -165,6 +178,7 @@ class API(sirepo.quest.API):
             c.data.pkupdate(api=_api(c.data.api), awaitReply=m.awaitReply)
             r.append(c)
         return self.request(
+            "api_runMulti",
             _request_content=PKDict(data=r),
             _request_uri=self._supervisor_uri(sirepo.job.SERVER_RUN_MULTI_URI),
         )
@@ -174,11 +188,16 @@ class API(sirepo.quest.API):
         r = self._request_content(PKDict(fixup_old_data=True))
         if r.isParallel:
             r.isPremiumUser = self.auth.is_premium_user()
-        return self.request(_request_content=r)
+        return self.request("api_runSimulation", _request_content=r)
 
     @sirepo.quest.Spec("require_user")
     def api_runStatus(self):
-        return self.request()
+        return self.request("api_runStatus")
+
+    @sirepo.quest.Spec("require_user")
+    def api_runStatusStream(self):
+        """Server-sent events of runStatus replies (see job_supervisor)"""
+        return self.request("api_runStatusStream", _request_stream=True)
 
     @sirepo.quest.Spec("require_user")
     def api_sbatchLogin(self):
@@ -186,13 +205,14 @@ class API(sirepo.quest.API):
             PKDict(computeJobHash="unused", jobRunMode=sirepo.job.SBATCH),
         )
         r.sbatchCredentials = r.pkdel("data")
-        return self.request(_request_content=r)
+        return self.request("api_sbatchLogin", _request_content=r)
 
     @sirepo.quest.Spec("require_user", frame_id="SimFrameId")
     def api_simulationFrame(self, frame_id):
         return template_common.sim_frame(
             frame_id,
             lambda a: self.request(
+                "api_simulationFrame",
                 analysisModel=a.frameReport,
                 # simulation frames are always sequential requests even though
                 # the report name has 'animation' in it.
@@ -204,50 +224,73 @@ class API(sirepo.quest.API):
 
     @sirepo.quest.Spec("require_user")
     def api_statefulCompute(self):
-        return self._request_compute()
+        return self._request_compute("api_statefulCompute")
 
     @sirepo.quest.Spec("require_user")
     def api_statelessCompute(self):
-        return self._request_compute()
-
-    def request(self, **kwargs):
-        def get_api_name():
-            if "api_name" in kwargs:
-                return kwargs["api_name"]
-            f = inspect.currentframe()
-            for _ in range(_MAX_FRAME_SEARCH_DEPTH):
-                m = re.search(r"^api_.*$", f.f_code.co_name)
-                if m:
-                    return m.group()
-                f = f.f_back
-            else:
-                raise AssertionError(
-                    "{}: max frame search depth reached".format(f.f_code)
-                )
+        return self._request_compute("api_statelessCompute")
+
+    def request(self, api_name, **kwargs):
+        """Send request to supervisor
 
+        Args:
+            api_name (str): supervisor dispatches on this (ex. api_runStatus)
+            kwargs (dict): content or private args, e.g. _request_content
+        Returns:
+            object: reply from supervisor
+        """
         k = PKDict(kwargs)
-        u = k.pkdel("_request_uri") or self._supervisor_uri(sirepo.job.SERVER_URI)
+        s = k.pkdel("_request_stream")
+        u = k.pkdel("_request_uri") or self._supervisor_uri(
+            sirepo.job.SERVER_STATUS_STREAM_URI if s else sirepo.job.SERVER_URI,
+        )
         c = (
             k.pkdel("_request_content")
             if "_request_content" in k
             else self._request_content(k)
         )
         c.pkupdate(
-            api=get_api_name(),
+            api=api_name,
             serverSecret=sirepo.job.cfg().server_secret,
         )
         pkdlog("api={} runDir={}", c.api, c.get("runDir"))
-        r = requests.post(
-            u,
-            data=pkjson.dump_bytes(c),
-            headers=PKDict({"Content-type": "application/json"}),
-            verify=sirepo.job.cfg().verify_tls,
+        t = time.monotonic()
+        try:
+            r = _session().post(
+                u,
+                data=pkjson.dump_bytes(c),
+                headers=PKDict({"Content-type": "application/json"}),
+                verify=sirepo.job.cfg().verify_tls,
+                stream=bool(s),
+            )
+            r.raise_for_status()
+            if s:
+                return self._reply_stream(r)
+            # only simulation frames contain arrays (see template_common.sim_frame)
+            return sirepo.binary_msg.load_any(r.content)
+        finally:
+            _latency_record(api_name, time.monotonic() - t)
+
+    def _reply_stream(self, response):
+        def _events():
+            # runs after the api returns so must not use self
+            try:
+                for l in response.iter_lines():
+                    if l:
+                        yield b"data: " + l + b"\n\n"
+            finally:
+                response.close()
+
+        r = self.headers_for_no_cache(
+            self.reply(_events(), content_type="text/event-stream"),
         )
-        r.raise_for_status()
-        return pkjson.load_any(r.content)
+        # nginx must not buffer the stream
+        r.headers["X-Accel-Buffering"] = "no"
+        return r
 
-    def _request_compute(self):
+    def _request_compute(self, api_name):
         return self.request(
+            api_name,
             jobRunMode=sirepo.job.SEQUENTIAL,
             req_data=PKDict(**self.parse_post().req_data,).pkupdate(
                 computeJobHash="unused",
@@ -341,6 +384,57 @@ def init_apis(*args, **kwargs):
     pykern.pkio.mkdir_parent(sirepo.job.DATA_FILE_ROOT)
 
 
+def latency_histograms():
+    """Histograms of supervisor request times in this process
+
+    Returns:
+        PKDict: api_name to count, total secs, and counts per bucket
+    """
+    with sirepo.util.THREAD_LOCK:
+        return PKDict(
+            buckets=list(_LATENCY_BUCKETS) + ["inf"],
+            apis=PKDict(
+                (k, PKDict(v, counts=list(v.counts))) for k, v in _latency.items()
+            ),
+        )
+
+
+def _latency_record(api_name, secs):
+    i = bisect.bisect_left(_LATENCY_BUCKETS, secs)
+    with sirepo.util.THREAD_LOCK:
+        h = _latency.pksetdefault(
+            api_name,
+            lambda: PKDict(
+                count=0,
+                counts=[0] * (len(_LATENCY_BUCKETS) + 1),
+                secs=0.0,
+            ),
+        )[api_name]
+        h.count += 1
+        h.counts[i] += 1
+        h.secs += secs
+
+
+def _session():
+    """Persistent connections to the supervisor
+
+    Sessions are not shared across forks (e.g. uwsgi workers).
+    """
+    p = os.getpid()
+    with sirepo.util.THREAD_LOCK:
+        if _session_cache.pid != p:
+            s = requests.Session()
+            a = requests.adapters.HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=_cfg.pool_size,
+            )
+            s.mount("http://", a)
+            s.mount("https://", a)
+            _session_cache.pkupdate(pid=p, session=s)
+        return _session_cache.session
+
+
 _cfg = pykern.pkconfig.init(
+    pool_size=(8, int, "maximum persistent connections to supervisor per process"),
     supervisor_uri=sirepo.job.DEFAULT_SUPERVISOR_URI_DECL,
 )
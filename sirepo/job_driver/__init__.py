@@ -78,7 +78,12 @@ class DriverBase(PKDict):
             # TODO(robnagler) sbatch could override OP_RUN, but not OP_ANALYSIS
             # because OP_ANALYSIS touches the directory sometimes. Reasonably
             # there should only be one OP_ANALYSIS running on an agent at one time.
-            op_slot_q=PKDict({k: job_supervisor.SlotQueue() for k in SLOT_OPS}),
+            op_slot_q=PKDict(
+                {
+                    k: job_supervisor.SlotQueue(self._op_slot_q_size(k))
+                    for k in SLOT_OPS
+                }
+            ),
             uid=op.msg.uid,
             _agentId=job.unique_key(),
             _agent_start_lock=tornado.locks.Lock(),
@@ -216,6 +221,8 @@ class DriverBase(PKDict):
                 ),
                 SIREPO_PKCLI_JOB_AGENT_SUPERVISOR_SIM_DB_FILE_TOKEN=self._sim_db_file_token,
                 SIREPO_PKCLI_JOB_AGENT_AGENT_ID=self._agentId,
+                SIREPO_PKCLI_JOB_AGENT_FASTCGI_WORKERS=_cfg.fastcgi_workers,
+                SIREPO_PKCLI_JOB_AGENT_FORK_SERVER=_cfg.fork_server,
                 SIREPO_PKCLI_JOB_AGENT_START_DELAY=self.get("_agent_start_delay", 0),
                 SIREPO_PKCLI_JOB_AGENT_SUPERVISOR_URI=self.cfg.supervisor_uri.replace(
                     # TODO(robnagler) figure out why we need ws (wss, implicit)
@@ -316,6 +323,10 @@ class DriverBase(PKDict):
         else:
             getattr(self, "_receive_" + c.opName)(msg)
 
+    def _op_slot_q_size(self, op_name):
+        """Agents serve OP_ANALYSIS with a pool of fastcgi processes"""
+        return _cfg.fastcgi_workers if op_name == job.OP_ANALYSIS else 1
+
     def _receive_alive(self, msg):
         """Receive an ALIVE message from our agent
 
@@ -339,7 +350,7 @@ class DriverBase(PKDict):
         pkdlog("{} msg={}", self, msg)
 
     async def _slots_ready(self, op):
-        """Only one op of each type allowed"""
+        """Only one op of each type allowed (except `_op_slot_q_size`)"""
         n = op.opName
         if n in (job.OP_CANCEL, job.OP_KILL, job.OP_BEGIN_SESSION):
             return
@@ -383,6 +394,16 @@ def init_module(**imports):
     sirepo.util.setattr_imports(imports)
     _cfg = pkconfig.init(
         modules=((_DEFAULT_MODULE,), set, "available job driver modules"),
+        fastcgi_workers=(
+            2,
+            int,
+            "analysis ops run concurrently by an agent (job_cmd fastcgi processes)",
+        ),
+        fork_server=(
+            False,
+            bool,
+            "agents fork sequential compute job_cmds from a process with preloaded modules",
+        ),
         idle_check_secs=(
             1800,
             pkconfig.parse_seconds,
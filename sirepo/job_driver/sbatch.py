@@ -32,25 +32,17 @@ class SbatchDriver(job_driver.DriverBase):
     __instances = PKDict()
 
     def __init__(self, op):
-        def _op_queue_size(op_kind):
-            return self.cfg.run_slots if op_kind == job.OP_RUN else 1
-
         super().__init__(op)
         self.pkupdate(
             # before it is overwritten by prepare_send
             _local_user_dir=pkio.py_path(op.msg.userDir),
             _srdb_root=None,
-            # Allow self.cfg.run_slots and every other op type to
-            # run (assume OP_RUN is one of SLOT_OPS). This
-            # is essentially a no-op (sbatch constrains its own cpu
-            # resources) but makes it easier to code the other cases.
+            # Allow every op slot to be in use. This is essentially
+            # a no-op (sbatch constrains its own cpu resources) but
+            # makes it easier to code the other cases.
             cpu_slot_q=sirepo.job_supervisor.SlotQueue(
-                len(job_driver.SLOT_OPS) + self.cfg.run_slots - 1,
+                sum(self._op_slot_q_size(k) for k in job_driver.SLOT_OPS),
             ),
-            op_slot_q={
-                k: sirepo.job_supervisor.SlotQueue(maxsize=_op_queue_size(k))
-                for k in job_driver.SLOT_OPS
-            },
         )
         self.__instances[self.uid] = self
 
@@ -232,6 +224,11 @@ scancel -u $USER >& /dev/null || true
 """
         return res
 
+    def _op_slot_q_size(self, op_name):
+        if op_name == job.OP_RUN:
+            return self.cfg.run_slots
+        return super()._op_slot_q_size(op_name)
+
     def _raise_sbatch_login_srexception(self, reason, msg):
         raise util.SRException(
             "sbatchLogin",
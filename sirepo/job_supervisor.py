@@ -9,16 +9,27 @@ from pykern import pkcollections
 from pykern import pkconfig
 from pykern import pkinspect
 from pykern import pkio
+from pykern import pkjson
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdp, pkdc, pkdformat, pkdlog, pkdexc
 from sirepo import job
 import asyncio
+import collections
 import contextlib
 import copy
+import datetime
+import errno
+import functools
+import hashlib
 import inspect
+import json
+import os
 import pykern.pkio
 import re
+import shutil
+import sqlite3
 import sirepo.auth_db
+import sirepo.binary_msg
 import sirepo.const
 import sirepo.http_reply
 import sirepo.quest
@@ -28,6 +39,7 @@ import sirepo.srdb
 import sirepo.srtime
 import sirepo.tornado
 import sirepo.util
+import time
 import tornado.ioloop
 import tornado.locks
 
@@ -68,9 +80,21 @@ _PARALLEL_STATUS_FIELDS = frozenset(
 
 _cfg = None
 
+#: simulation frame replies for completed runs
+_frame_cache = None
+
+#: persisted _ComputeJob.db (see `create_job_db`)
+_job_db = None
+
+#: run dirs of completed sequential runs by computeJobHash
+_result_cache = None
+
 #: how many times restart request when Awaited() raised
 _MAX_RETRIES = 10
 
+#: opName to how long ops waited for slots
+_slot_waits = PKDict()
+
 
 class Awaited(Exception):
     """An await occurred, restart operation"""
@@ -105,40 +129,233 @@ class SlotProxy(PKDict):
     async def alloc(self, situation):
         if self._value is not None:
             return
-        try:
-            self._value = self._q.get_nowait()
-        except tornado.queues.QueueEmpty:
-            pkdlog("{} situation={}", self._op, situation)
-            with self._op.set_job_situation(situation):
-                self._value = await self._q.get()
-            raise Awaited()
+        self._value = self._q.get_nowait(self._op)
+        if self._value is not None:
+            return
+        pkdlog("{} situation={}", self._op, situation)
+        with self._op.set_job_situation(situation):
+            self._value = await self._q.get(self._op)
+        raise Awaited()
 
     def free(self):
         if self._value is None:
             return
-        self._q.task_done()
-        self._q.put_nowait(self._value)
+        self._q.put(self._op, self._value)
         self._value = None
 
+    def queue_position(self):
+        """Expected position (1-based) of op in the queue or None if not waiting"""
+        return self._q.queue_position(self._op)
+
+
+class SlotQueue(PKDict):
+    """Hands out slots 1..maxsize in the order chosen by `_cfg.slot_scheduler`
+
+    Ops of the same uid share a slot allocation in proportion to their
+    weight (premium users weigh more) and `analysis_slots` are reserved
+    for OP_ANALYSIS so short jobs are not stuck behind long runs.
+    """
 
-class SlotQueue(sirepo.tornado.Queue):
     def __init__(self, maxsize=1):
-        super().__init__(maxsize=maxsize)
-        for i in range(1, maxsize + 1):
-            self.put_nowait(i)
+        super().__init__(
+            maxsize=maxsize,
+            _free=list(range(maxsize, 0, -1)),
+            _held=collections.Counter(),
+            _held_analysis=0,
+            _seq=0,
+            _waiters=[],
+        )
+
+    async def get(self, op):
+        self._seq += 1
+        w = PKDict(
+            future=asyncio.Future(),
+            op=op,
+            seq=self._seq,
+            start=time.monotonic(),
+        )
+        self._waiters.append(w)
+        self._dispatch()
+        try:
+            return await w.future
+        except sirepo.util.ASYNC_CANCELED_ERROR:
+            if w.future.done() and not w.future.cancelled():
+                # got a slot after the task was canceled so put it back
+                self.put(op, w.future.result())
+            elif w in self._waiters:
+                self._waiters.remove(w)
+            raise
+
+    def get_nowait(self, op):
+        """Allocate a slot if op would be next in the queue
+
+        Returns:
+            int: slot or None if op must wait
+        """
+        w = PKDict(op=op, seq=self._seq + 1, start=None)
+        if self._select(self._waiters + [w]) is not w:
+            return None
+        return self._take(w)
+
+    def put(self, op, value):
+        self._held[op.msg.uid] -= 1
+        if not self._held[op.msg.uid]:
+            del self._held[op.msg.uid]
+        if op.opName == job.OP_ANALYSIS:
+            self._held_analysis -= 1
+        self._free.append(value)
+        self._dispatch()
+
+    def queue_position(self, op):
+        k = _SLOT_SCHEDULERS[_cfg.slot_scheduler.policy]
+        for i, w in enumerate(sorted(self._waiters, key=lambda x: k(self, x))):
+            if w.op is op:
+                return i + 1
+        return None
 
     def sr_slot_proxy(self, op):
         return SlotProxy(_op=op, _q=self)
 
+    def _can_take(self, op):
+        if not self._free:
+            return False
+        if op.opName == job.OP_ANALYSIS:
+            return True
+        # only analysis ops may use the reserved slots
+        return sum(self._held.values()) - self._held_analysis < self.maxsize - min(
+            _cfg.slot_scheduler.analysis_slots,
+            self.maxsize - 1,
+        )
+
+    def _dispatch(self):
+        while self._free:
+            w = self._select(self._waiters)
+            if not w:
+                return
+            self._waiters.remove(w)
+            w.future.set_result(self._take(w))
+
+    def _select(self, waiters):
+        k = _SLOT_SCHEDULERS[_cfg.slot_scheduler.policy]
+        return min(
+            (w for w in waiters if self._can_take(w.op)),
+            key=lambda x: k(self, x),
+            default=None,
+        )
+
+    def _take(self, waiter):
+        o = waiter.op
+        self._held[o.msg.uid] += 1
+        if o.opName == job.OP_ANALYSIS:
+            self._held_analysis += 1
+        s = _slot_waits.pksetdefault(
+            o.opName,
+            lambda: PKDict(count=0, maxSecs=0, totalSecs=0),
+        )[o.opName]
+        t = 0 if waiter.start is None else time.monotonic() - waiter.start
+        s.count += 1
+        s.totalSecs += t
+        s.maxSecs = max(s.maxSecs, t)
+        return self._free.pop()
+
+
+def _slot_key_fair_share(queue, waiter):
+    """Fewest slots held relative to the user's weight goes first"""
+    return (
+        queue._held[waiter.op.msg.uid]
+        / (
+            _cfg.slot_scheduler.premium_weight
+            if waiter.op.msg.get("isPremiumUser")
+            else 1
+        ),
+        waiter.seq,
+    )
+
+
+def _slot_key_fifo(queue, waiter):
+    return waiter.seq
+
+
+_SLOT_SCHEDULERS = PKDict(
+    fair_share=_slot_key_fair_share,
+    fifo=_slot_key_fifo,
+)
+
+
+def cache_stats():
+    """Hit, miss, and eviction counts of supervisor caches
+
+    Returns:
+        PKDict: frameCache and resultCache stats with bytes in use
+    """
+    return PKDict(
+        frameCache=PKDict(
+            _frame_cache.stats,
+            diskBytes=_frame_cache._disk_bytes,
+            memoryBytes=_frame_cache._memory_bytes,
+        ),
+        resultCache=PKDict(
+            _result_cache.stats,
+            diskBytes=_result_cache._disk_bytes,
+        ),
+    )
+
+
+def create_job_db(backend, db_dir, coalesce_secs=0, history_max=0):
+    """Open the store of _ComputeJob.db
+
+    Args:
+        backend (str): json (file per job) or sqlite
+        db_dir (py.path): where the store lives
+        coalesce_secs (int): delay of coalesced writes (0 disables)
+        history_max (int): history entries kept per job (0 unbounded)
+    Returns:
+        object: store with load, purge_candidates, and write
+    """
+    return _JOB_DBS[backend](
+        coalesce_secs=coalesce_secs,
+        db_dir=pkio.mkdir_parent(db_dir),
+        history_max=history_max,
+    )
+
 
 def init_module(**imports):
-    global _cfg, _DB_DIR, _NEXT_REQUEST_SECONDS
+    global _cfg, _DB_DIR, _NEXT_REQUEST_SECONDS, _frame_cache, _job_db, _result_cache
 
     if _cfg:
         return
     # import sirepo.job_driver
     sirepo.util.setattr_imports(imports)
     _cfg = pkconfig.init(
+        db=dict(
+            backend=(
+                "json",
+                _cfg_db_backend,
+                "where jobs are stored: json (file per job) or sqlite",
+            ),
+            coalesce_secs=(
+                1,
+                pkconfig.parse_seconds,
+                "how long to delay writes of running jobs (0 disables)",
+            ),
+            history_max=(
+                0,
+                int,
+                "maximum history entries per job for sqlite (0 unbounded)",
+            ),
+        ),
+        frame_cache=dict(
+            disk_bytes=(
+                int(1e9),
+                int,
+                "maximum size of simulation frames cached on disk (0 disables)",
+            ),
+            memory_bytes=(
+                int(1e8),
+                int,
+                "maximum size of simulation frames cached in memory (0 disables)",
+            ),
+        ),
         job_cache_secs=(300, int, "when to re-read job state from disk"),
         max_secs=dict(
             analysis=(
@@ -167,6 +384,18 @@ def init_module(**imports):
                 "maximum run-time for sequential job",
             ),
         ),
+        result_cache=dict(
+            disk_bytes=(
+                int(1e9),
+                int,
+                "maximum size of sequential results cached on disk (0 disables)",
+            ),
+            entry_bytes=(
+                int(1e7),
+                int,
+                "run dirs larger than this are not cached",
+            ),
+        ),
         purge_non_premium_after_secs=(
             0,
             pkconfig.parse_seconds,
@@ -178,8 +407,46 @@ def init_module(**imports):
             "when to clean up simulation runs of non-premium users (%H:%M:%S)",
         ),
         sbatch_poll_secs=(15, int, "how often to poll squeue and parallel status"),
+        slot_scheduler=dict(
+            analysis_slots=(
+                1,
+                int,
+                "slots of each cpu slot queue reserved for analysis ops",
+            ),
+            policy=(
+                "fair_share",
+                _cfg_slot_scheduler,
+                "order of waiting ops: fair_share or fifo",
+            ),
+            premium_weight=(
+                2,
+                int,
+                "share of slots for premium users relative to other users",
+            ),
+        ),
+        status_stream=dict(
+            keepalive_secs=(
+                15,
+                pkconfig.parse_seconds,
+                "how often to send status when it has not changed",
+            ),
+            max_secs=(
+                300,
+                pkconfig.parse_seconds,
+                "when to end a status stream (client reconnects)",
+            ),
+        ),
     )
     _DB_DIR = sirepo.srdb.supervisor_dir()
+    _job_db = create_job_db(db_dir=_DB_DIR, **_cfg.db)
+    _frame_cache = _FrameCache(
+        disk_bytes=_cfg.frame_cache.disk_bytes,
+        memory_bytes=_cfg.frame_cache.memory_bytes,
+    )
+    _result_cache = _ResultCache(
+        disk_bytes=_cfg.result_cache.disk_bytes,
+        entry_bytes=_cfg.result_cache.entry_bytes,
+    )
     _NEXT_REQUEST_SECONDS = PKDict(
         {
             job.PARALLEL: 2,
@@ -192,7 +459,34 @@ def init_module(**imports):
     )
 
 
+def _cfg_db_backend(value):
+    assert value in _JOB_DBS, "must be one of {}; backend={}".format(
+        sorted(_JOB_DBS),
+        value,
+    )
+    return value
+
+
+def _cfg_slot_scheduler(value):
+    assert value in _SLOT_SCHEDULERS, "must be one of {}; policy={}".format(
+        sorted(_SLOT_SCHEDULERS),
+        value,
+    )
+    return value
+
+
+async def _io(func, *args):
+    """Disk I/O off the ioloop"""
+    return await tornado.ioloop.IOLoop.current().run_in_executor(None, func, *args)
+
+
+def _tmp_basename(basename):
+    # dot prefix: removed by cache __init__ if the supervisor is restarted
+    return f".{basename}-{sirepo.util.random_base62(8)}"
+
+
 async def terminate():
+    _job_db.flush()
     await job_driver.terminate()
 
 
@@ -295,6 +589,10 @@ class _Supervisor(PKDict):
                     title="Status",
                     type="String",
                 ),
+                queuePosition=PKDict(
+                    title="Queue position",
+                    type="String",
+                ),
             )
             if uid:
                 h.name = PKDict(
@@ -333,6 +631,14 @@ class _Supervisor(PKDict):
                 )
                 return m - db.computeJobQueued
 
+            def _get_queue_position(compute_job):
+                r = [
+                    p
+                    for p in (o.cpu_slot.queue_position() for o in compute_job.ops)
+                    if p is not None
+                ]
+                return min(r) if r else ""
+
             r = []
             with sirepo.quest.start() as qcall:
                 for i in filter(_filter_jobs, _ComputeJob.instances.values()):
@@ -343,6 +649,7 @@ class _Supervisor(PKDict):
                         lastUpdateTime=i.db.lastUpdateTime,
                         elapsedTime=i.elapsed_time(),
                         statusMessage=i.db.get("jobStatusMessage", ""),
+                        queuePosition=_get_queue_position(i),
                         computeModel=sirepo.sim_data.split_jid(
                             i.db.computeJid
                         ).compute_model,
@@ -368,7 +675,7 @@ class _Supervisor(PKDict):
         return PKDict(header=_get_header(), jobs=_get_jobs())
 
     async def _receive_api_admJobs(self, req):
-        return self._get_running_pending_jobs()
+        return self._get_running_pending_jobs().pkupdate(slotWaits=_slot_waits)
 
     async def _receive_api_beginSession(self, req):
         c = self._create_op(job.OP_BEGIN_SESSION, req, job.SEQUENTIAL, "sequential")
@@ -397,6 +704,8 @@ class _ComputeJob(_Supervisor):
             ops=[],
             run_op=None,
             run_dir_slot_q=SlotQueue(),
+            status_changed=tornado.locks.Condition(),
+            status_stream_count=0,
             **kwargs,
         )
         # At start we don't know anything about the run_dir so assume ready
@@ -404,10 +713,11 @@ class _ComputeJob(_Supervisor):
         self.cache_timeout_set()
 
     def cache_timeout(self):
-        if self.ops:
+        if self.ops or self.status_stream_count:
             self.cache_timeout_set()
         else:
             del self.instances[self.db.computeJid]
+            _job_db.evict(self.db.computeJid)
 
     def cache_timeout_set(self):
         self.timer = tornado.ioloop.IOLoop.current().call_later(
@@ -466,35 +776,6 @@ class _ComputeJob(_Supervisor):
     @classmethod
     async def purge_free_simulations(cls):
         # TODO add-qcall
-        def _get_uids_and_files():
-            r = []
-            u = None
-            p = sirepo.auth_db.UserRole.uids_of_paid_users()
-            for f in pkio.sorted_glob(
-                _DB_DIR.join(
-                    "*{}".format(
-                        sirepo.const.JSON_SUFFIX,
-                    )
-                )
-            ):
-                n = sirepo.sim_data.split_jid(jid=f.purebasename).uid
-                if (
-                    n in p
-                    or f.mtime() > _too_old
-                    or f.purebasename in cls._purged_jids_cache
-                ):
-                    continue
-                if u != n:
-                    # POSIT: Uid is the first part of each db file. The files are
-                    # sorted so this should yield all of a user's files
-                    if r:
-                        yield u, r
-                    u = n
-                    r = []
-                r.append(f)
-            if r:
-                yield u, r
-
         def _purge_sim(jid):
             d = cls.__db_load(jid)
             if d.lastUpdateTime > _too_old:
@@ -504,27 +785,35 @@ class _ComputeJob(_Supervisor):
                 return
             p = sirepo.simulation_db.simulation_run_dir(d)
             pkio.unchecked_remove(p)
+            _frame_cache.invalidate(jid)
+            _result_cache.invalidate(jid)
             n = cls.__db_init_new(d, d)
             n.status = job.JOB_RUN_PURGED
-            cls.__db_write_file(n)
+            _job_db.write(n)
 
         if not _cfg.purge_non_premium_task_secs:
             return
         s = sirepo.srtime.utc_now()
         u = None
-        f = None
+        j = None
         try:
             _too_old = (
                 sirepo.srtime.utc_now_as_int() - _cfg.purge_non_premium_after_secs
             )
             with sirepo.quest.start() as qcall:
-                for u, v in _get_uids_and_files():
+                for u, v in _job_db.purge_candidates(
+                    too_old=_too_old,
+                    exclude_uids=sirepo.auth_db.UserRole.uids_of_paid_users(),
+                    exclude_jids=cls._purged_jids_cache,
+                ):
                     qcall.auth.logged_in_user_set(u)
-                    for f in v:
-                        _purge_sim(jid=f.purebasename)
+                    for j in v:
+                        _purge_sim(jid=j)
+                        if j not in cls.instances:
+                            _job_db.evict(j)
                     await tornado.gen.sleep(0)
         except Exception as e:
-            pkdlog("u={} f={} error={} stack={}", u, f, e, pkdexc())
+            pkdlog("u={} jid={} error={} stack={}", u, j, e, pkdexc())
         finally:
             tornado.ioloop.IOLoop.current().call_later(
                 _cfg.purge_non_premium_task_secs,
@@ -547,12 +836,6 @@ class _ComputeJob(_Supervisor):
             situation = f"{p}{exception}, while {s}"
         self.__db_update(jobStatusMessage=situation)
 
-    @classmethod
-    def __db_file(cls, computeJid):
-        return _DB_DIR.join(
-            computeJid + sirepo.const.JSON_SUFFIX,
-        )
-
     def __db_init(self, req, prev_db=None):
         self.db = self.__db_init_new(req.content, prev_db)
         return self.db
@@ -615,8 +898,7 @@ class _ComputeJob(_Supervisor):
     @classmethod
     def __db_load(cls, compute_jid):
         v = None
-        f = cls.__db_file(compute_jid)
-        d = pkcollections.json_load_any(f)
+        d = _job_db.load(compute_jid)
         for k in [
             "alert",
             "canceledAfterSecs",
@@ -629,7 +911,6 @@ class _ComputeJob(_Supervisor):
                 h.setdefault(k, v)
         d.pksetdefault(
             computeModel=lambda: sirepo.sim_data.split_jid(compute_jid).compute_model,
-            dbUpdateTime=lambda: f.mtime(),
         )
         if "cancelledAfterSecs" in d:
             d.canceledAfterSecs = d.pkdel("cancelledAfterSecs", default=v)
@@ -645,19 +926,17 @@ class _ComputeJob(_Supervisor):
         self.db.pkupdate(**kwargs)
         return self.__db_write()
 
-    def __db_write(self):
+    def __db_write(self, coalesce=False):
         self.db.dbUpdateTime = sirepo.srtime.utc_now_as_int()
-        self.__db_write_file(self.db)
+        _job_db.write(self.db, coalesce=coalesce)
+        self.status_changed.notify_all()
         return self
 
-    @classmethod
-    def __db_write_file(cls, db):
-        sirepo.util.json_dump(db, path=cls.__db_file(db.computeJid))
-
     def _is_running_pending(self):
         return self.db.status in (job.RUNNING, job.PENDING)
 
     def _init_db_missing_response(self, req):
+        _frame_cache.invalidate(self.db.computeJid)
         self.__db_init(req, prev_db=self.db)
         self.__db_write()
         assert self.db.status == job.MISSING, "expecting missing status={}".format(
@@ -787,6 +1066,8 @@ class _ComputeJob(_Supervisor):
                     recursion_depth + 1,
                 )
             return r
+        if not f and await self._restore_result(req):
+            return await self._receive_api_runStatus(req)
         # Forced or canceled/errored/missing/invalid so run
         o = self._create_op(
             job.OP_RUN,
@@ -796,6 +1077,7 @@ class _ComputeJob(_Supervisor):
         )
         t = sirepo.srtime.utc_now_as_int()
         d = self.db
+        _frame_cache.invalidate(d.computeJid)
         self.__db_init(req, prev_db=d)
         self.__db_update(
             computeJobQueued=t,
@@ -807,7 +1089,7 @@ class _ComputeJob(_Supervisor):
             simName=req.content.data.models.simulation.name,
             status=job.PENDING,
         )
-        self._purged_jids_cache.discard(self.__db_file(self.db.computeJid).purebasename)
+        self._purged_jids_cache.discard(self.db.computeJid)
         self.run_op = o
         r = self._status_reply(req)
         assert r
@@ -836,6 +1118,35 @@ class _ComputeJob(_Supervisor):
             return self._init_db_missing_response(req)
         return r
 
+    async def _receive_api_runStatusStream(self, req):
+        """Write status to req.handler whenever db changes
+
+        Each line is a reply like `_receive_api_runStatus` except when
+        a sequential run is complete the reply is just the state. The
+        stream ends when the job is no longer running or pending, or
+        after status_stream.max_secs so the client must call runStatus
+        to get the result or to resume.
+        """
+        e = sirepo.srtime.utc_now_as_int() + _cfg.status_stream.max_secs
+        self.status_stream_count += 1
+        try:
+            while True:
+                r = self._status_reply(req) or PKDict(state=self.db.status)
+                req.handler.write(pkjson.dump_bytes(r) + b"\n")
+                await req.handler.flush()
+                if (
+                    r.state not in (job.PENDING, job.RUNNING)
+                    or sirepo.srtime.utc_now_as_int() >= e
+                ):
+                    return None
+                await self.status_changed.wait(
+                    timeout=datetime.timedelta(
+                        seconds=_cfg.status_stream.keepalive_secs,
+                    ),
+                )
+        finally:
+            self.status_stream_count -= 1
+
     async def _receive_api_sbatchLogin(self, req):
         return await self._send_with_single_reply(job.OP_SBATCH_LOGIN, req)
 
@@ -843,9 +1154,36 @@ class _ComputeJob(_Supervisor):
         if not self._req_is_valid(req):
             sirepo.util.raise_not_found("invalid req={}", req)
         self._raise_if_purged_or_missing(req)
-        return await self._send_with_single_reply(
+        k = None
+        if self.db.status == job.COMPLETED and sirepo.sim_data.get_class(
+            self.db.simulationType
+        ).want_browser_frame_cache(req.content.data.frameReport):
+            k = _frame_cache.key(
+                self.db.computeJid,
+                self.db.computeJobSerial,
+                req.content.data,
+            )
+            r = await _frame_cache.frame_get(k)
+            if r is not None:
+                return r
+        r = await self._send_with_single_reply(
             job.OP_ANALYSIS, req, jobCmd="get_simulation_frame"
         )
+        if (
+            k
+            and r.get("state") == job.COMPLETED
+            and "error" not in r
+            # a new run may have started while waiting for the reply
+            and self.db.status == job.COMPLETED
+            and _frame_cache.key(
+                self.db.computeJid,
+                self.db.computeJobSerial,
+                req.content.data,
+            )
+            == k
+        ):
+            await _frame_cache.frame_put(k, r)
+        return r
 
     async def _receive_api_statefulCompute(self, req):
         return await self._send_simulation_compute(req)
@@ -953,7 +1291,14 @@ class _ComputeJob(_Supervisor):
                             # sequential jobs don't send this
                             self.db.lastUpdateTime = sirepo.srtime.utc_now_as_int()
                         # TODO(robnagler) will need final frame count
-                        self.__db_write()
+                        # running status and parallelStatus arrive often
+                        self.__db_write(coalesce=r.state == job.RUNNING)
+                        if r.state == job.COMPLETED and self._want_result_cache():
+                            await _result_cache.save(
+                                self.db.computeJid,
+                                self.db.computeJobHash,
+                                op.msg.runDir,
+                            )
                         if r.state in job.EXIT_STATUSES:
                             break
                     except sirepo.util.ASYNC_CANCELED_ERROR:
@@ -968,6 +1313,38 @@ class _ComputeJob(_Supervisor):
         finally:
             op.destroy(cancel=False)
 
+    async def _restore_result(self, req):
+        """Restore run dir of a previous run with the same computeJobHash"""
+        c = req.content
+        if (
+            self.ops
+            or c.isParallel
+            or c.jobRunMode != job.SEQUENTIAL
+            or not await _result_cache.restore(
+                c.computeJid,
+                c.computeJobHash,
+                c.runDir,
+                lambda: not self.ops,
+            )
+        ):
+            return False
+        pkdlog("{} restored computeJobHash={}", self, c.computeJobHash)
+        t = sirepo.srtime.utc_now_as_int()
+        _frame_cache.invalidate(self.db.computeJid)
+        self.__db_init(req, prev_db=self.db)
+        self.__db_update(
+            computeJobQueued=t,
+            computeJobSerial=t,
+            computeJobStart=t,
+            computeModel=c.computeModel,
+            jobRunMode=c.jobRunMode,
+            lastUpdateTime=t,
+            simName=c.data.models.simulation.name,
+            status=job.COMPLETED,
+        )
+        self._purged_jids_cache.discard(self.db.computeJid)
+        return True
+
     async def _send_simulation_compute(self, req):
         pkdlog("{} method={} api={}", req, req.content.data.method, req.content.api)
         f = inspect.currentframe().f_back.f_code.co_name
@@ -1000,6 +1377,9 @@ class _ComputeJob(_Supervisor):
         finally:
             o.destroy(cancel=False)
 
+    def _want_result_cache(self):
+        return not self.db.isParallel and self.db.jobRunMode == job.SEQUENTIAL
+
     def _status_reply(self, req):
         def res(**kwargs):
             r = PKDict(**kwargs)
@@ -1046,6 +1426,659 @@ class _ComputeJob(_Supervisor):
         return None
 
 
+class _FrameCache(PKDict):
+    """LRU of simulation frame replies in memory backed by disk
+
+    Keys contain computeJid and computeJobSerial so frames of an old
+    run are never returned for a new one. Replies are stored encoded
+    (`sirepo.binary_msg`) so sizes are known and callers get copies.
+    """
+
+    def __init__(self, disk_bytes, memory_bytes):
+        super().__init__(
+            _dir=None,
+            _disk=collections.OrderedDict(),
+            _disk_bytes=0,
+            _disk_max=disk_bytes,
+            _memory=collections.OrderedDict(),
+            _memory_bytes=0,
+            _memory_max=memory_bytes,
+            stats=PKDict(diskHits=0, evictions=0, memoryHits=0, misses=0),
+        )
+        if not disk_bytes:
+            return
+        self._dir = pkio.mkdir_parent(sirepo.srdb.supervisor_frame_cache_dir())
+        for f in sorted(self._dir.listdir(), key=lambda x: x.mtime()):
+            if f.basename.startswith("."):
+                # incomplete write
+                pkio.unchecked_remove(f)
+                continue
+            self._disk[f.basename] = f.size()
+            self._disk_bytes += f.size()
+        self._disk_trim()
+
+    async def frame_get(self, key):
+        """Lookup frame reply
+
+        Disk reads are off the ioloop. An entry which cannot be read
+        or decoded is removed and counted as a miss.
+
+        Args:
+            key (str): from `key`
+        Returns:
+            PKDict: reply or None if not cached
+        """
+        b = self._memory.get(key)
+        if b is not None:
+            self._memory.move_to_end(key)
+            self.stats.memoryHits += 1
+            pkdc("hit key={} stats={}", key, self.stats)
+            return sirepo.binary_msg.load_any(b)
+        if key in self._disk:
+            try:
+                b = await _io(self._dir.join(key).read_binary)
+                r = sirepo.binary_msg.load_any(b)
+            except sirepo.util.ASYNC_CANCELED_ERROR:
+                raise
+            except Exception as e:
+                pkdlog("key={} error={}", key, e)
+                self._disk_remove(key)
+            else:
+                # may have been invalidated while reading
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                    self.stats.diskHits += 1
+                    self._memory_put(key, b)
+                    pkdc("hit key={} stats={}", key, self.stats)
+                    return r
+        self.stats.misses += 1
+        pkdc("miss key={} stats={}", key, self.stats)
+        return None
+
+    async def frame_put(self, key, reply):
+        """Cache frame reply
+
+        The disk copy is written off the ioloop to a temporary file
+        which is renamed into place so a crash never leaves a
+        truncated entry.
+
+        Args:
+            key (str): from `key`
+            reply (PKDict): successful get_simulation_frame reply
+        """
+        b = sirepo.binary_msg.dump_bytes(reply, convert_lists=False)
+        self._memory_put(key, b)
+        if not self._dir or len(b) > self._disk_max:
+            return
+        try:
+            await _io(self._disk_write, key, b)
+        except sirepo.util.ASYNC_CANCELED_ERROR:
+            raise
+        except Exception as e:
+            pkdlog("key={} error={}", key, e)
+            return
+        self._disk_bytes += len(b) - self._disk.pop(key, 0)
+        self._disk[key] = len(b)
+        self._disk_trim()
+
+    def invalidate(self, compute_jid):
+        """Remove all frames for compute_jid
+
+        Args:
+            compute_jid (str): which job
+        """
+        p = compute_jid + "-"
+        for k in [k for k in self._memory if k.startswith(p)]:
+            self._memory_remove(k)
+        for k in [k for k in self._disk if k.startswith(p)]:
+            self._disk_remove(k)
+
+    @classmethod
+    def key(cls, compute_jid, compute_job_serial, frame_args):
+        """Unique key for frame of a run
+
+        Args:
+            compute_jid (str): job
+            compute_job_serial (int): run
+            frame_args (PKDict): parsed frame id
+        Returns:
+            str: key (also a file name)
+        """
+        return "{}-{}-{}".format(
+            compute_jid,
+            compute_job_serial,
+            hashlib.sha1(
+                json.dumps(frame_args, sort_keys=True).encode(),
+            ).hexdigest(),
+        )
+
+    def pkdebug_str(self):
+        return pkdformat(
+            "_FrameCache(memory={} disk={} stats={})",
+            self._memory_bytes,
+            self._disk_bytes,
+            self.stats,
+        )
+
+    def _disk_remove(self, key):
+        self._disk_bytes -= self._disk.pop(key, 0)
+        pkio.unchecked_remove(self._dir.join(key))
+
+    def _disk_trim(self):
+        while self._disk_bytes > self._disk_max:
+            self._disk_remove(next(iter(self._disk)))
+            self.stats.evictions += 1
+
+    def _disk_write(self, key, value):
+        t = self._dir.join(_tmp_basename(key))
+        try:
+            t.write_binary(value)
+            os.replace(t, self._dir.join(key))
+        except Exception:
+            pkio.unchecked_remove(t)
+            raise
+
+    def _memory_put(self, key, value):
+        if len(value) > self._memory_max:
+            return
+        self._memory_remove(key)
+        self._memory[key] = value
+        self._memory_bytes += len(value)
+        while self._memory_bytes > self._memory_max:
+            self._memory_remove(next(iter(self._memory)))
+            self.stats.evictions += 1
+
+    def _memory_remove(self, key):
+        self._memory_bytes -= len(self._memory.pop(key, b""))
+
+
+class _ResultCache(PKDict):
+    """LRU of run dirs of completed sequential runs on disk
+
+    Stored by computeJid and computeJobHash, because the hash is only
+    unique relative to the report.
+    """
+
+    def __init__(self, disk_bytes, entry_bytes):
+        super().__init__(
+            _dir=None,
+            _disk=collections.OrderedDict(),
+            _disk_bytes=0,
+            _disk_max=disk_bytes,
+            _entry_max=entry_bytes,
+            stats=PKDict(evictions=0, hits=0, misses=0),
+        )
+        if not disk_bytes:
+            return
+        self._dir = pkio.mkdir_parent(sirepo.srdb.supervisor_result_cache_dir())
+        for f in sorted(self._dir.listdir(), key=lambda x: x.mtime()):
+            if f.basename.startswith("."):
+                # incomplete save
+                pkio.unchecked_remove(f)
+                continue
+            self._disk[f.basename] = self._size(f)
+            self._disk_bytes += self._disk[f.basename]
+        self._trim()
+
+    def invalidate(self, compute_jid):
+        """Remove all results for compute_jid
+
+        Args:
+            compute_jid (str): which job
+        """
+        p = compute_jid + "-"
+        for k in [k for k in self._disk if k.startswith(p)]:
+            self._remove(k)
+
+    def pkdebug_str(self):
+        return pkdformat(
+            "_ResultCache(disk={} stats={})",
+            self._disk_bytes,
+            self.stats,
+        )
+
+    async def restore(self, compute_jid, compute_job_hash, run_dir, can_replace):
+        """Replace run_dir with cached copy
+
+        The copy is made next to run_dir off the ioloop and only
+        swapped in if `can_replace` is still true afterwards.
+
+        Args:
+            compute_jid (str): job
+            compute_job_hash (str): hash of new run
+            run_dir (str): where to copy
+            can_replace (callable): False if run_dir is in use
+        Returns:
+            bool: True if restored
+        """
+        k = self._key(compute_jid, compute_job_hash)
+        if k not in self._disk:
+            self.stats.misses += 1
+            return False
+        d = pkio.py_path(run_dir)
+        t = d.new(basename=_tmp_basename(d.basename))
+        o = None
+        try:
+            await self._copy(self._dir.join(k), t)
+            if k not in self._disk or not can_replace():
+                # evicted or run_dir in use while copying
+                pkio.unchecked_remove(t)
+                self.stats.misses += 1
+                return False
+            if d.exists():
+                o = d.new(basename=_tmp_basename(d.basename))
+                d.rename(o)
+            t.rename(d)
+            self._dir.join(k).setmtime()
+            self._disk.move_to_end(k)
+        except sirepo.util.ASYNC_CANCELED_ERROR:
+            raise
+        except Exception as e:
+            pkdlog("key={} run_dir={} error={}", k, d, e)
+            pkio.unchecked_remove(t)
+            self._remove(k)
+            self.stats.misses += 1
+            return False
+        finally:
+            if o:
+                await _io(pkio.unchecked_remove, o)
+        self.stats.hits += 1
+        pkdc("hit key={} stats={}", k, self.stats)
+        return True
+
+    async def save(self, compute_jid, compute_job_hash, run_dir):
+        """Copy run_dir off the ioloop if it is small enough
+
+        Args:
+            compute_jid (str): job
+            compute_job_hash (str): hash of completed run
+            run_dir (str): what to copy
+        """
+        if not self._dir:
+            return
+        k = self._key(compute_jid, compute_job_hash)
+        d = pkio.py_path(run_dir)
+        t = self._dir.join(_tmp_basename(k))
+        try:
+            n = await _io(self._size, d)
+            if n > self._entry_max:
+                return
+            await self._copy(d, t)
+            self._remove(k)
+            t.rename(self._dir.join(k))
+        except sirepo.util.ASYNC_CANCELED_ERROR:
+            raise
+        except Exception as e:
+            pkdlog("key={} run_dir={} error={}", k, d, e)
+            pkio.unchecked_remove(t)
+            return
+        self._disk[k] = n
+        self._disk_bytes += n
+        self._trim()
+
+    async def _copy(self, src, dst):
+        f = tornado.ioloop.IOLoop.current().run_in_executor(
+            None,
+            functools.partial(shutil.copytree, str(src), str(dst), symlinks=True),
+        )
+        try:
+            await asyncio.shield(f)
+        except sirepo.util.ASYNC_CANCELED_ERROR:
+            # copy continues in the executor so clean up when it finishes
+            f.add_done_callback(lambda _: pkio.unchecked_remove(dst))
+            raise
+
+    def _key(self, compute_jid, compute_job_hash):
+        return f"{compute_jid}-{compute_job_hash}"
+
+    def _remove(self, key):
+        self._disk_bytes -= self._disk.pop(key, 0)
+        pkio.unchecked_remove(self._dir.join(key))
+
+    def _size(self, path):
+        return sum(
+            f.size()
+            for f in path.visit(
+                fil=lambda x: x.check(file=1, link=0),
+                rec=lambda x: x.check(link=0),
+            )
+        )
+
+    def _trim(self):
+        while self._disk_bytes > self._disk_max:
+            self._remove(next(iter(self._disk)))
+            self.stats.evictions += 1
+
+
+class _JobDb(PKDict):
+    """Store of _ComputeJob.db
+
+    Writes with coalesce=True are delayed by coalesce_secs and merged,
+    so a running job is written at most once per period however often
+    it reports status. Other writes of the job go out immediately.
+    """
+
+    def __init__(self, coalesce_secs, db_dir, history_max):
+        super().__init__(
+            _coalesce_secs=coalesce_secs,
+            _dir=db_dir,
+            _dirty=PKDict(),
+            _flush_timer=None,
+            _history_max=history_max,
+        )
+
+    def flush(self):
+        """Write delayed dbs"""
+        if self._flush_timer:
+            tornado.ioloop.IOLoop.current().remove_timeout(self._flush_timer)
+            self._flush_timer = None
+        if not self._dirty:
+            return
+        d = list(self._dirty.values())
+        self._dirty = PKDict()
+        self._write(d)
+
+    def load(self, compute_jid):
+        """Read db of job
+
+        Args:
+            compute_jid (str): which job
+        Returns:
+            PKDict: db
+        Raises:
+            FileNotFoundError: if no db for compute_jid
+        """
+        if compute_jid in self._dirty:
+            self.flush()
+        return self._load(compute_jid)
+
+    def evict(self, compute_jid):
+        """Job is no longer in memory so drop state kept for it
+
+        Args:
+            compute_jid (str): which job
+        """
+        pass
+
+    def write(self, db, coalesce=False):
+        """Write db of job
+
+        Args:
+            db (PKDict): job db (not copied if coalesced)
+            coalesce (bool): delay write [False]
+        """
+        if coalesce and self._coalesce_secs:
+            self._dirty[db.computeJid] = db
+            if not self._flush_timer:
+                self._flush_timer = tornado.ioloop.IOLoop.current().call_later(
+                    self._coalesce_secs,
+                    self.flush,
+                )
+            return
+        self._dirty.pkdel(db.computeJid)
+        self._write([db])
+
+    def _not_found(self, compute_jid):
+        return FileNotFoundError(
+            errno.ENOENT,
+            "job db not found",
+            compute_jid,
+        )
+
+
+class _JsonJobDb(_JobDb):
+    """A JSON file per job in db_dir"""
+
+    def purge_candidates(self, too_old, exclude_uids, exclude_jids):
+        """Jobs not updated since too_old
+
+        Args:
+            too_old (int): time of update
+            exclude_uids (set): users to skip
+            exclude_jids (set): jobs to skip
+        Returns:
+            iterator: (uid, list of computeJid) for each user
+        """
+        r = []
+        u = None
+        for f in pkio.sorted_glob(self._dir.join("*" + sirepo.const.JSON_SUFFIX)):
+            n = sirepo.sim_data.split_jid(jid=f.purebasename).uid
+            if (
+                n in exclude_uids
+                or f.mtime() > too_old
+                or f.purebasename in exclude_jids
+            ):
+                continue
+            if u != n:
+                # POSIT: Uid is the first part of each db file. The files are
+                # sorted so this should yield all of a user's files
+                if r:
+                    yield u, r
+                u = n
+                r = []
+            r.append(f.purebasename)
+        if r:
+            yield u, r
+
+    def _load(self, compute_jid):
+        f = self._path(compute_jid)
+        return pkcollections.json_load_any(f).pksetdefault(
+            dbUpdateTime=lambda: f.mtime(),
+        )
+
+    def _path(self, compute_jid):
+        return self._dir.join(compute_jid + sirepo.const.JSON_SUFFIX)
+
+    def _write(self, dbs):
+        for d in dbs:
+            sirepo.util.json_dump(d, path=self._path(d.computeJid))
+
+
+class _SqliteJobDb(_JobDb):
+    """SQLite (WAL) store in db_dir
+
+    Columns used for queries are indexed and the rest of the db is a
+    JSON blob. History entries are rows in a separate table, so a write
+    only adds entries which are new, and at most history_max are kept.
+    JSON dbs in db_dir are imported when the store is created.
+    """
+
+    _FILE = "job.sqlite3"
+
+    _SCHEMA = (
+        """CREATE TABLE job_t (
+            compute_jid TEXT PRIMARY KEY NOT NULL,
+            uid TEXT NOT NULL,
+            status TEXT NOT NULL,
+            last_update_time INTEGER NOT NULL,
+            db_update_time INTEGER NOT NULL,
+            is_premium_user INTEGER,
+            db TEXT NOT NULL
+        )""",
+        "CREATE INDEX job_t_uid ON job_t (uid)",
+        "CREATE INDEX job_t_status ON job_t (status)",
+        "CREATE INDEX job_t_last_update_time ON job_t (last_update_time)",
+        "CREATE INDEX job_t_is_premium_user ON job_t (is_premium_user)",
+        """CREATE TABLE job_history_t (
+            compute_jid TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            entry TEXT NOT NULL,
+            PRIMARY KEY (compute_jid, seq)
+        )""",
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._conn = sqlite3.connect(
+            str(self._dir.join(self._FILE)),
+            isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        #: last history entry committed for computeJid of jobs in memory
+        self._history_last = PKDict()
+        #: _history_last of the current transaction, applied on commit
+        self._history_pending = PKDict()
+        if not self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'job_t'",
+        ).fetchone():
+            self._create()
+
+    def evict(self, compute_jid):
+        """Job is no longer in memory so drop state kept for it
+
+        Args:
+            compute_jid (str): which job
+        """
+        self._history_last.pkdel(compute_jid)
+
+    def purge_candidates(self, too_old, exclude_uids, exclude_jids):
+        """Jobs not updated since too_old
+
+        Args:
+            too_old (int): time of update
+            exclude_uids (set): users to skip
+            exclude_jids (set): jobs to skip
+        Returns:
+            iterator: (uid, list of computeJid) for each user
+        """
+        r = []
+        u = None
+        for j, n in self._conn.execute(
+            """SELECT compute_jid, uid FROM job_t
+            WHERE last_update_time <= ? AND db_update_time <= ? AND status != ?
+            ORDER BY uid, compute_jid""",
+            (too_old, too_old, job.JOB_RUN_PURGED),
+        ).fetchall():
+            if n in exclude_uids or j in exclude_jids:
+                continue
+            if u != n:
+                if r:
+                    yield u, r
+                u = n
+                r = []
+            r.append(j)
+        if r:
+            yield u, r
+
+    def _create(self):
+        with self._transaction() as c:
+            for x in self._SCHEMA:
+                c.execute(x)
+            j = _JsonJobDb(coalesce_secs=0, db_dir=self._dir, history_max=0)
+            n = 0
+            for f in pkio.sorted_glob(self._dir.join("*" + sirepo.const.JSON_SUFFIX)):
+                try:
+                    self._write_one(c, j.load(f.purebasename))
+                    n += 1
+                except Exception as e:
+                    pkdlog("skipping file={} error={}", f, e)
+        # imported jobs are not in memory
+        self._history_last = PKDict()
+        if n:
+            pkdlog("imported {} json dbs from dir={}", n, self._dir)
+
+    def _load(self, compute_jid):
+        r = self._conn.execute(
+            "SELECT db FROM job_t WHERE compute_jid = ?",
+            (compute_jid,),
+        ).fetchone()
+        if not r:
+            raise self._not_found(compute_jid)
+        res = pkjson.load_any(r[0])
+        res.history = [
+            pkjson.load_any(x[0])
+            for x in self._conn.execute(
+                "SELECT entry FROM job_history_t WHERE compute_jid = ? ORDER BY seq",
+                (compute_jid,),
+            )
+        ]
+        self._history_last[compute_jid] = res.history[-1] if res.history else None
+        return res
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self._history_pending = PKDict()
+        self._conn.execute("BEGIN")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        # after COMMIT so rolled back entries are written again
+        self._history_last.update(self._history_pending)
+
+    def _write(self, dbs):
+        with self._transaction() as c:
+            for d in dbs:
+                self._write_one(c, d)
+
+    def _write_history(self, conn, db):
+        h = db.history
+        if self._history_max and len(h) > self._history_max:
+            # in place, so the job's db stays bounded too
+            del h[: -self._history_max]
+        l = (
+            self._history_pending
+            if db.computeJid in self._history_pending
+            else self._history_last
+        ).get(db.computeJid)
+        if h and l is h[-1]:
+            return
+        # POSIT: history only grows at the end (see __db_init_history)
+        i = next((i for i in range(len(h) - 1, -1, -1) if h[i] is l), None)
+        if i is None:
+            conn.execute(
+                "DELETE FROM job_history_t WHERE compute_jid = ?",
+                (db.computeJid,),
+            )
+            s = 0
+        else:
+            s = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM job_history_t WHERE compute_jid = ?",
+                (db.computeJid,),
+            ).fetchone()[0]
+        conn.executemany(
+            "INSERT INTO job_history_t (compute_jid, seq, entry) VALUES (?, ?, ?)",
+            (
+                (db.computeJid, s + k + 1, sirepo.util.json_dump(e))
+                for k, e in enumerate(h[0 if i is None else i + 1 :])
+            ),
+        )
+        if self._history_max:
+            conn.execute(
+                """DELETE FROM job_history_t WHERE compute_jid = ? AND seq <= (
+                    SELECT MAX(seq) FROM job_history_t WHERE compute_jid = ?
+                ) - ?""",
+                (db.computeJid, db.computeJid, self._history_max),
+            )
+        self._history_pending[db.computeJid] = h[-1] if h else None
+
+    def _write_one(self, conn, db):
+        conn.execute(
+            """INSERT OR REPLACE INTO job_t
+            (compute_jid, uid, status, last_update_time, db_update_time, is_premium_user, db)
+            VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (
+                db.computeJid,
+                db.uid,
+                db.status,
+                db.lastUpdateTime or 0,
+                db.dbUpdateTime,
+                (
+                    None
+                    if db.get("isPremiumUser") is None
+                    else int(bool(db.isPremiumUser))
+                ),
+                sirepo.util.json_dump(
+                    PKDict((k, v) for k, v in db.items() if k != "history"),
+                ),
+            ),
+        )
+        self._write_history(conn, db)
+
+
 class _Op(PKDict):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1145,3 +2178,9 @@ class _Op(PKDict):
 
     def __hash__(self):
         return hash((self.opId,))
+
+
+_JOB_DBS = PKDict(
+    json=_JsonJobDb,
+    sqlite=_SqliteJobDb,
+)
@@ -3460,6 +3460,7 @@ SIREPO.app.directive('jobsList', function(requestSender, appState, $location) {
                 'lastUpdateTime',
                 'elapsedTime',
                 'statusMessage',
+                'queuePosition',
                 'queuedTime',
                 'driverDetails',
                 'isPremiumUser'
@@ -3467,7 +3468,8 @@ SIREPO.app.directive('jobsList', function(requestSender, appState, $location) {
                 'startTime',
                 'lastUpdateTime',
                 'elapsedTime',
-                'statusMessage'
+                'statusMessage',
+                'queuePosition'
             ];
 
             $scope.endSimulation = function(job) {
@@ -1345,7 +1345,8 @@ SIREPO.app.factory('frameCache', function(appState, panelState, requestSender, $
                     );
                 },
                 null,
-                onError
+                onError,
+                {acceptBinary: true}
             );
         };
         if (isHidden) {
@@ -1952,6 +1953,16 @@ SIREPO.app.factory('panelState', function(appState, requestSender, simulationQue
 
 SIREPO.app.factory('requestSender', function(cookieService, errorService, userAgent, utilities, $http, $location, $injector, $interval, $q, $rootScope, $window) {
     var self = {};
+    // see sirepo.binary_msg
+    const BINARY_ARRAY_KEY = '_srArray';
+    const BINARY_CONTENT_TYPE = 'application/x-sirepo-binary';
+    const BINARY_HEADER_LENGTH = 12;
+    const BINARY_MAGIC = 'SRB1';
+    const BINARY_TYPED_ARRAYS = {
+        '<f4': Float32Array,
+        '<f8': Float64Array,
+        '<i4': Int32Array,
+    };
     var HTML_TITLE_RE = new RegExp('>([^<]+)</', 'i');
     var IS_HTML_ERROR_RE = new RegExp('^(?:<html|<!doctype)', 'i');
     var LOGIN_ROUTE_NAME = 'login';
@@ -2031,6 +2042,52 @@ SIREPO.app.factory('requestSender', function(cookieService, errorService, userAg
         }
     }
 
+    function decodeBinaryResponse(buffer) {
+        if (! (buffer instanceof ArrayBuffer)) {
+            return buffer;
+        }
+        const b = new Uint8Array(buffer);
+        const d = new TextDecoder();
+        if (b.length < BINARY_HEADER_LENGTH || d.decode(b.subarray(0, BINARY_MAGIC.length)) !== BINARY_MAGIC) {
+            // JSON or an html error document
+            const t = d.decode(b);
+            try {
+                return JSON.parse(t);
+            }
+            catch (e) {
+                return t;
+            }
+        }
+        const v = new DataView(buffer);
+        let i = BINARY_HEADER_LENGTH;
+        const metaLength = v.getUint32(BINARY_MAGIC.length, true);
+        const valueLength = v.getUint32(BINARY_MAGIC.length + 4, true);
+        const meta = JSON.parse(d.decode(b.subarray(i, i + metaLength)));
+        i += metaLength;
+        const value = d.decode(b.subarray(i, i + valueLength));
+        i += valueLength;
+        i += (8 - i % 8) % 8;
+        const arrays = meta.map(([dtype, shape, offset]) => {
+            const a = Array.from(
+                new BINARY_TYPED_ARRAYS[dtype](buffer, i + offset, shape.reduce((x, y) => x * y, 1))
+            );
+            if (shape.length == 1) {
+                return a;
+            }
+            const res = [];
+            for (let r = 0; r < shape[0]; r++) {
+                res.push(a.slice(r * shape[1], (r + 1) * shape[1]));
+            }
+            return res;
+        });
+        return JSON.parse(value, (key, x) => {
+            if (x && typeof x === 'object' && BINARY_ARRAY_KEY in x && Object.keys(x).length === 1) {
+                return arrays[x[BINARY_ARRAY_KEY]];
+            }
+            return x;
+        });
+    }
+
     function isFirefox() {
         // https://stackoverflow.com/a/9851769
         return typeof InstallTrigger !== 'undefined';
@@ -2297,7 +2354,7 @@ SIREPO.app.factory('requestSender', function(cookieService, errorService, userAg
         sendWithSimulationFields('analysisJob', appState, callback, data);
     };
 
-    self.sendRequest = function(urlOrParams, successCallback, data, errorCallback) {
+    self.sendRequest = function(urlOrParams, successCallback, data, errorCallback, options) {
         if (! errorCallback) {
             errorCallback = logError;
         }
@@ -2315,6 +2372,11 @@ SIREPO.app.factory('requestSender', function(cookieService, errorService, userAg
             responseType: (data || {}).responseType || '',
             headers: userAgent.id ? {[userAgent.HEADER]: userAgent.id} : {}
         };
+        if ((options || {}).acceptBinary) {
+            t.responseType = 'arraybuffer';
+            t.headers.Accept = BINARY_CONTENT_TYPE + ', application/json';
+            t.transformResponse = decodeBinaryResponse;
+        }
         if (SIREPO.http_timeout > 0) {
             interval = $interval(
                 function () {
@@ -2429,6 +2491,59 @@ SIREPO.app.factory('requestSender', function(cookieService, errorService, userAg
         );
     };
 
+    self.streamRequest = function(urlOrParams, data, messageCallback, endCallback) {
+        // POSTs data and calls messageCallback for each server-sent event.
+        // endCallback(isError) is called when the stream ends unless aborted.
+        const c = new AbortController();
+        const h = {'Content-Type': 'application/json'};
+        if (userAgent.id) {
+            h[userAgent.HEADER] = userAgent.id;
+        }
+        fetch(
+            angular.isString(urlOrParams) && urlOrParams.indexOf('/') >= 0
+                ? urlOrParams
+                : self.formatUrl(urlOrParams),
+            {
+                body: JSON.stringify(data),
+                credentials: 'same-origin',
+                headers: h,
+                method: 'POST',
+                signal: c.signal,
+            }
+        ).then(async (response) => {
+            if (! response.ok || ! response.body) {
+                throw new Error(`status=${response.status}`);
+            }
+            const r = response.body.getReader();
+            const d = new TextDecoder();
+            let b = '';
+            while (true) {
+                const {value, done} = await r.read();
+                if (done) {
+                    break;
+                }
+                b += d.decode(value, {stream: true});
+                let i;
+                while ((i = b.indexOf('\n\n')) >= 0) {
+                    const e = b.slice(0, i);
+                    b = b.slice(i + 2);
+                    if (e.startsWith('data: ')) {
+                        const m = JSON.parse(e.slice(6));
+                        $rootScope.$applyAsync(() => messageCallback(m));
+                    }
+                }
+            }
+            $rootScope.$applyAsync(() => endCallback(false));
+        }).catch((e) => {
+            if (e.name === 'AbortError') {
+                return;
+            }
+            srlog('streamRequest error', e);
+            $rootScope.$applyAsync(() => endCallback(true));
+        });
+        return c;
+    };
+
     self.sendRpn = utilities.debounce(
         (appState, callback, data) => {
             data.variables = appState.models.rpnVariables;
@@ -2483,6 +2598,8 @@ SIREPO.app.factory('requestSender', function(cookieService, errorService, userAg
 SIREPO.app.factory('simulationQueue', function($rootScope, $interval, requestSender) {
     var self = {};
     var runQueue = [];
+    // fall back to polling if streams fail
+    var canStream = SIREPO.APP_SCHEMA.feature_config.run_status_stream && window.fetch;
 
     function addItem(report, models, responseHandler, qMode, forceRun) {
         models = angular.copy(models);
@@ -2514,6 +2631,10 @@ SIREPO.app.factory('simulationQueue', function($rootScope, $interval, requestSen
     }
 
     function cancelInterval(qi) {
+        if (qi.stream) {
+            qi.stream.abort();
+            qi.stream = null;
+        }
         if (! qi.interval) {
             return;
         }
@@ -2559,21 +2680,54 @@ SIREPO.app.factory('simulationQueue', function($rootScope, $interval, requestSen
     function runItem(qi) {
         var handleStatus = function(qi, resp) {
             qi.request = resp.nextRequest;
-            qi.interval = $interval(
-                function () {
-                    qi.runStatusCount++;
-                    requestSender.sendRequest(
-                        'runStatus', process, qi.request, process);
-                },
-                // Sanity check in case of defect on server
-                Math.max(1, resp.nextRequestSeconds) * 1000,
-                1
-            );
+            if (canStream) {
+                streamStatus(qi);
+            }
+            else {
+                qi.interval = $interval(
+                    function () {
+                        qi.runStatusCount++;
+                        requestSender.sendRequest(
+                            'runStatus', process, qi.request, process);
+                    },
+                    // Sanity check in case of defect on server
+                    Math.max(1, resp.nextRequestSeconds) * 1000,
+                    1
+                );
+            }
             if (qi.persistent) {
                 qi.responseHandler(resp);
             }
         };
 
+        var streamStatus = function(qi) {
+            qi.stream = requestSender.streamRequest(
+                'runStatusStream',
+                qi.request,
+                function(resp) {
+                    if (qi.qState == 'removing' || ! (resp.state == 'running' || resp.state == 'pending')) {
+                        // final result comes from runStatus below
+                        return;
+                    }
+                    qi.request = resp.nextRequest;
+                    if (qi.persistent) {
+                        qi.responseHandler(resp);
+                    }
+                },
+                function(isError) {
+                    qi.stream = null;
+                    if (qi.qState == 'removing') {
+                        return;
+                    }
+                    if (isError) {
+                        canStream = false;
+                    }
+                    qi.runStatusCount++;
+                    requestSender.sendRequest('runStatus', process, qi.request, process);
+                }
+            );
+        };
+
         var process = function(resp) {
             if (qi.qState == 'removing') {
                 return;
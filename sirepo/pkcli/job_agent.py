@@ -14,10 +14,13 @@ from sirepo.template import template_common
 import datetime
 import json
 import os
+import pwd
 import re
 import shutil
 import signal
 import sirepo.auth
+import sirepo.binary_msg
+import sirepo.pkcli.job_fork_server
 import sirepo.tornado
 import socket
 import subprocess
@@ -39,8 +42,20 @@ _RETRY_SECS = 1
 
 _IN_FILE = "in-{}.json"
 
+#: how often to log fastcgi queue depth and latency
+_FASTCGI_STATS_LOG_OPS = 100
+
+#: lib and sim db files shared by job_cmds of the user (see sirepo.agent_file_cache)
+_FILE_CACHE_SUBDIR = "agent-file-cache"
+
+#: fork server replies right after forking
+_FORK_SERVER_TIMEOUT_SECS = 5
+
 _PID_FILE = "job_agent.pid"
 
+#: backoff limit when squeue or sacct fail
+_SBATCH_POLL_MAX_SECS = 120
+
 _PY2_CODES = frozenset(())
 
 cfg = None
@@ -57,6 +72,21 @@ def start():
             pkio.py_path,
             "directory of fastcfgi socket, must be less than 50 chars",
         ),
+        fastcgi_workers=(
+            2,
+            int,
+            "job_cmd fastcgi processes, i.e. concurrent analysis and io ops",
+        ),
+        file_cache_bytes=(
+            int(1e9),
+            int,
+            "maximum size of lib and sim db files cached in the user dir",
+        ),
+        fork_server=(
+            False,
+            bool,
+            "fork sequential compute job_cmds from a process with preloaded modules",
+        ),
         start_delay=(0, pkconfig.parse_seconds, "delay startup in internal_test mode"),
         supervisor_sim_db_file_token=pkconfig.Required(
             str,
@@ -144,25 +174,42 @@ class _Dispatcher(PKDict):
     def __init__(self):
         super().__init__(
             cmds=[],
-            fastcgi_cmd=None,
             fastcgi_error_count=0,
+            fastcgi_stats=PKDict(count=0, maxDepth=0, maxSecs=0, totalSecs=0),
+            fastcgi_workers=[],
+            sbatch_poller=_SbatchPoller(),
+            _fork_server=None,
         )
 
-    def fastcgi_destroy(self):
-        self._fastcgi_file and pkio.unchecked_remove(self._fastcgi_file)
-        self._fastcgi_file = None
-        self.fastcgi_cmd = None
+    def fork_server(self, cmd):
+        """Fork server which can start cmd or None (started on first use)"""
+        if not (
+            cfg.fork_server
+            and type(cmd) is _Cmd
+            and cmd.msg.jobCmd == "compute"
+            and cmd.msg.jobRunMode == job.SEQUENTIAL
+        ):
+            return None
+        e = cmd.job_cmd_env_values()
+        if not self._fork_server:
+            # this cmd does not wait for preloading
+            self._fork_server = _ForkServer(dispatcher=self, env=e).start()
+            return None
+        return self._fork_server if self._fork_server.accepts(e) else None
 
     def format_op(self, msg, opName, **kwargs):
         if msg:
             kwargs["opId"] = msg.get("opId")
-        return pkjson.dump_bytes(
+        return sirepo.binary_msg.dump_bytes(
             PKDict(agentId=cfg.agent_id, opName=opName).pksetdefault(**kwargs),
+            want_binary=job.cfg().binary_messages,
+            # job_cmd decides which replies contain arrays
+            convert_lists=False,
         )
 
     async def job_cmd_reply(self, msg, op_name, text):
         try:
-            r = pkjson.load_any(text)
+            r = sirepo.binary_msg.load_any(text)
         except Exception:
             op_name = job.OP_ERROR
             r = PKDict(
@@ -217,7 +264,10 @@ class _Dispatcher(PKDict):
         if not self._websocket:
             return False
         try:
-            await self._websocket.write_message(msg)
+            await self._websocket.write_message(
+                msg,
+                binary=sirepo.binary_msg.is_binary(msg),
+            )
             return True
         except Exception as e:
             pkdlog("msg={} error={}", msg, e)
@@ -232,6 +282,8 @@ class _Dispatcher(PKDict):
                     c.destroy()
                 except Exception as e:
                     pkdlog("cmd={} error={} stack={}", c, e, pkdexc())
+            if self._fork_server:
+                self._fork_server.destroy()
             return None
         finally:
             tornado.ioloop.IOLoop.current().stop()
@@ -319,103 +371,26 @@ class _Dispatcher(PKDict):
                 reply=PKDict(runDirNotFound=True),
             )
         if msg.jobCmd == "fastcgi":
-            self.fastcgi_cmd = p
+            p.fastcgi_worker.cmd = p
         self.cmds.append(p)
         await p.start()
         return None
 
-    def _fastcgi_accept(self, connection, *args, **kwargs):
-        # Impedence mismatch: _fastcgi_accept cannot be async, because
-        # bind_unix_socket doesn't await the callable.
-        tornado.ioloop.IOLoop.current().add_callback(self._fastcgi_read, connection)
-
-    async def _fastcgi_handle_error(self, msg, error, stack=None):
-        async def _reply_error(msg):
-            try:
-                await self.send(
-                    self.format_op(
-                        msg,
-                        job.OP_ERROR,
-                        error=error,
-                        reply=PKDict(
-                            state=job.ERROR,
-                            error="internal error",
-                            fastCgiErrorCount=self.fastcgi_error_count,
-                        ),
-                    )
-                )
-            except Exception as e:
-                pkdlog("msg={} error={} stack={}", msg, e, pkdexc())
-
-        # destroy _fastcgi state first, then send replies to avoid
-        # asynchronous modification of _fastcgi state.
-        self.fastcgi_error_count += 1
-        self._fastcgi_remove_handler()
-        q = self._fastcgi_msg_q
-        self._fastcgi_msg_q = None
-        self.fastcgi_cmd.destroy()
-        if msg:
-            await _reply_error(msg)
-        while q.qsize() > 0:
-            await _reply_error(q.get_nowait())
-            q.task_done()
-
     async def _fastcgi_op(self, msg):
         if msg.runDir:
             _assert_run_dir_exists(pkio.py_path(msg.runDir))
-        if not self.fastcgi_cmd:
-            m = msg.copy()
-            m.jobCmd = "fastcgi"
-            self._fastcgi_file = cfg.fastcgi_sock_dir.join(
-                f"sirepo_job_cmd-{cfg.agent_id:8}.sock",
-            )
-            self._fastcgi_msg_q = sirepo.tornado.Queue(1)
-            pkio.unchecked_remove(self._fastcgi_file)
-            m.fastcgiFile = self._fastcgi_file
-            # Runs in an agent's directory and chdirs to real runDirs.
-            # Except in stateless_compute which doesn't interact with the db.
-            m.runDir = pkio.py_path()
-            # Kind of backwards, but it makes sense since we need to listen
-            # so _do_fastcgi can connect
-            self._fastcgi_remove_handler = tornado.netutil.add_accept_handler(
-                tornado.netutil.bind_unix_socket(str(self._fastcgi_file)),
-                self._fastcgi_accept,
-            )
-            # last thing, because of await: start fastcgi process
-            await self._cmd(m, send_reply=False)
-        self._fastcgi_msg_q.put_nowait(msg)
-        self.fastcgi_cmd.op_id = msg.opId
+        # pre-warm the whole pool, which also replaces crashed workers
+        while len(self.fastcgi_workers) < cfg.fastcgi_workers:
+            w = _FastCgiWorker(dispatcher=self)
+            self.fastcgi_workers.append(w)
+            try:
+                await w.start(msg)
+            except Exception:
+                w.destroy()
+                raise
+        min(self.fastcgi_workers, key=lambda x: x.depth).put(msg)
         return None
 
-    async def _fastcgi_read(self, connection):
-        s = None
-        m = None
-        try:
-            s = tornado.iostream.IOStream(
-                connection,
-                max_buffer_size=job.cfg().max_message_bytes,
-            )
-            while True:
-                m = await self._fastcgi_msg_q.get()
-                # Avoid issues with exceptions. We don't use q.join()
-                # so not an issue to call before work is done.
-                self._fastcgi_msg_q.task_done()
-                await s.write(pkjson.dump_bytes(m) + b"\n")
-                await self.job_cmd_reply(
-                    m,
-                    job.OP_ANALYSIS,
-                    await s.read_until(b"\n", job.cfg().max_message_bytes),
-                )
-        except Exception as e:
-            pkdlog("msg={} error={} stack={}", m, e, pkdexc())
-            # If self.fastcgi_cmd is None we initiated the kill so not an error
-            if not self.fastcgi_cmd:
-                return
-            await self._fastcgi_handle_error(m, e, pkdexc())
-        finally:
-            if s:
-                s.close()
-
 
 class _Cmd(PKDict):
     def __init__(self, *args, send_reply=True, **kwargs):
@@ -458,15 +433,24 @@ class _Cmd(PKDict):
         )
 
     def job_cmd_env(self, env=None):
-        return job.agent_env(
-            env=(env or PKDict()).pksetdefault(
-                SIREPO_MPI_CORES=self.msg.get("mpiCores", 1),
-                SIREPO_SIM_DATA_LIB_FILE_URI=self._lib_file_uri,
-                SIREPO_SIM_DATA_LIB_FILE_LIST=self._lib_file_list_f,
-                SIREPO_SIM_DATA_SUPERVISOR_SIM_DB_FILE_URI=cfg.supervisor_sim_db_file_uri,
-                SIREPO_SIM_DATA_SUPERVISOR_SIM_DB_FILE_TOKEN=cfg.supervisor_sim_db_file_token,
-            ),
+        return job.agent_env(env=self.job_cmd_env_values(env))
+
+    def job_cmd_env_values(self, env=None):
+        e = (env or PKDict()).pksetdefault(
+            SIREPO_MPI_CORES=self.msg.get("mpiCores", 1),
+            SIREPO_SIM_DATA_LIB_FILE_URI=self._lib_file_uri,
+            SIREPO_SIM_DATA_LIB_FILE_LIST=self._lib_file_list_f,
+            SIREPO_SIM_DATA_SUPERVISOR_SIM_DB_FILE_URI=cfg.supervisor_sim_db_file_uri,
+            SIREPO_SIM_DATA_SUPERVISOR_SIM_DB_FILE_TOKEN=cfg.supervisor_sim_db_file_token,
         )
+        if self.msg.get("userDir"):
+            e.pksetdefault(
+                SIREPO_AGENT_FILE_CACHE_DIR=pkio.py_path(self.msg.userDir).join(
+                    _FILE_CACHE_SUBDIR,
+                ),
+                SIREPO_AGENT_FILE_CACHE_MAX_BYTES=cfg.file_cache_bytes,
+            )
+        return job.agent_env_values(env=e)
 
     def job_cmd_source_bashrc(self):
         return "source $HOME/.bashrc"
@@ -497,7 +481,7 @@ class _Cmd(PKDict):
                     reply=PKDict(state=job.RUNNING, computeJobStart=self._start_time),
                 ),
             )
-        self._process.start()
+        await self._process.start()
         tornado.ioloop.IOLoop.current().add_callback(self._await_exit)
 
     def pkdebug_str(self):
@@ -574,10 +558,275 @@ class _Cmd(PKDict):
 
 class _FastCgiCmd(_Cmd):
     def destroy(self):
-        self.dispatcher.fastcgi_destroy()
+        self.fastcgi_worker.destroy()
         super().destroy()
 
 
+class _FastCgiWorker(PKDict):
+    """One job_cmd fastcgi process and the ops queued for it"""
+
+    _seq = 0
+
+    def __init__(self, **kwargs):
+        _FastCgiWorker._seq += 1
+        super().__init__(
+            cmd=None,
+            # ops queued or in progress
+            depth=0,
+            file=cfg.fastcgi_sock_dir.join(
+                f"sirepo_job_cmd-{cfg.agent_id:8}-{_FastCgiWorker._seq}.sock",
+            ),
+            msg_q=sirepo.tornado.Queue(),
+            remove_handler=None,
+            **kwargs,
+        )
+
+    def destroy(self):
+        try:
+            self.dispatcher.fastcgi_workers.remove(self)
+        except ValueError:
+            pass
+        if self.remove_handler:
+            self.remove_handler()
+            self.remove_handler = None
+        pkio.unchecked_remove(self.file)
+        self.cmd = None
+
+    async def handle_error(self, msg, error, stack=None):
+        async def _reply_error(msg):
+            try:
+                await self.dispatcher.send(
+                    self.dispatcher.format_op(
+                        msg,
+                        job.OP_ERROR,
+                        error=error,
+                        reply=PKDict(
+                            state=job.ERROR,
+                            error="internal error",
+                            fastCgiErrorCount=self.dispatcher.fastcgi_error_count,
+                        ),
+                    )
+                )
+            except Exception as e:
+                pkdlog("msg={} error={} stack={}", msg, e, pkdexc())
+
+        # destroy worker state first, then send replies to avoid
+        # asynchronous modification of worker state. Other workers
+        # are unaffected.
+        q = self.msg_q
+        self.msg_q = None
+        if self.cmd:
+            self.dispatcher.fastcgi_error_count += 1
+            self.cmd.destroy()
+        if msg:
+            await _reply_error(msg)
+        while q and q.qsize() > 0:
+            await _reply_error(q.get_nowait()[0])
+            q.task_done()
+
+    def put(self, msg):
+        self.depth += 1
+        s = self.dispatcher.fastcgi_stats
+        s.maxDepth = max(s.maxDepth, self.depth)
+        self.msg_q.put_nowait((msg, time.time()))
+
+    async def start(self, msg):
+        m = msg.copy()
+        m.jobCmd = "fastcgi"
+        pkio.unchecked_remove(self.file)
+        m.fastcgiFile = self.file
+        # Runs in an agent's directory and chdirs to real runDirs.
+        # Except in stateless_compute which doesn't interact with the db.
+        m.runDir = pkio.py_path()
+        # Kind of backwards, but it makes sense since we need to listen
+        # so _do_fastcgi can connect
+        self.remove_handler = tornado.netutil.add_accept_handler(
+            tornado.netutil.bind_unix_socket(str(self.file)),
+            self._accept,
+        )
+        # last thing, because of await: start fastcgi process
+        await self.dispatcher._cmd(m, send_reply=False, fastcgi_worker=self)
+
+    def _accept(self, connection, *args, **kwargs):
+        # Impedence mismatch: _accept cannot be async, because
+        # bind_unix_socket doesn't await the callable.
+        tornado.ioloop.IOLoop.current().add_callback(self._read, connection)
+
+    def _op_done(self, start):
+        self.depth -= 1
+        s = self.dispatcher.fastcgi_stats
+        t = time.time() - start
+        s.count += 1
+        s.totalSecs += t
+        s.maxSecs = max(s.maxSecs, t)
+        if s.count % _FASTCGI_STATS_LOG_OPS == 0:
+            pkdlog("workers={} stats={}", len(self.dispatcher.fastcgi_workers), s)
+
+    async def _read(self, connection):
+        s = None
+        m = None
+        try:
+            s = tornado.iostream.IOStream(
+                connection,
+                max_buffer_size=job.cfg().max_message_bytes,
+            )
+            while True:
+                m, t = await self.msg_q.get()
+                # Avoid issues with exceptions. We don't use q.join()
+                # so not an issue to call before work is done.
+                self.msg_q.task_done()
+                self.cmd.op_id = m.opId
+                await s.write(pkjson.dump_bytes(m) + b"\n")
+                # reply is length prefixed (see job_cmd._validate_msg_and_frame)
+                n = int(await s.read_until(b"\n", 32))
+                await self.dispatcher.job_cmd_reply(
+                    m,
+                    job.OP_ANALYSIS,
+                    await s.read_bytes(n),
+                )
+                self._op_done(t)
+                m = None
+        except Exception as e:
+            pkdlog("msg={} error={} stack={}", m, e, pkdexc())
+            # If self.cmd is None we initiated the kill (e.g. cancel of m)
+            # so m is not an error, but ops queued behind it still need replies
+            await self.handle_error(m if self.cmd else None, e, pkdexc())
+        finally:
+            if s:
+                s.close()
+
+
+class _ForkServer(PKDict):
+    """Process which forks compute job_cmds (see `sirepo.pkcli.job_fork_server`)"""
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            file=cfg.fastcgi_sock_dir.join(f"sirepo_job_fork-{cfg.agent_id:8}.sock"),
+            stats=PKDict(forks=0, savedSecs=0),
+            _subprocess=None,
+            **kwargs,
+        )
+
+    def accepts(self, env):
+        """Whether a job_cmd with env can be forked
+
+        The server's modules were configured (imported) with its env so
+        only values which the child resets may differ.
+        """
+
+        def _values(env):
+            return PKDict(
+                (k, str(v))
+                for k, v in env.items()
+                if k not in sirepo.pkcli.job_fork_server.OP_ENV
+            )
+
+        # socket exists after preloading
+        return bool(self._subprocess and self.file.exists()) and _values(
+            env
+        ) == _values(self.env)
+
+    def destroy(self):
+        if self.dispatcher._fork_server is self:
+            self.dispatcher._fork_server = None
+        p = self._subprocess
+        self._subprocess = None
+        if p:
+            try:
+                os.killpg(p.proc.pid, signal.SIGKILL)
+            except Exception as e:
+                pkdlog("{} error={}", self, e)
+        pkio.unchecked_remove(self.file)
+
+    async def fork(self, cmd, stdout, stderr):
+        """Start cmd's job_cmd in a child with stdout and stderr
+
+        The handshake with the fork server is blocking so it runs in
+        the executor, and a slow server does not stall the agent.
+
+        Returns:
+            tuple: pid (int), connection (socket) which returns the exit status
+        """
+        r, c = await tornado.ioloop.IOLoop.current().run_in_executor(
+            None,
+            self._fork,
+            pkjson.dump_bytes(
+                PKDict(
+                    cwd=str(cmd.run_dir),
+                    env=PKDict(
+                        (k, str(v)) for k, v in cmd.job_cmd_env_values().items()
+                    ),
+                    inFile=str(cmd._in_file),
+                ),
+            )
+            + b"\n",
+            stdout,
+            stderr,
+        )
+        self.stats.forks += 1
+        self.stats.savedSecs += r.preloadSecs
+        pkdlog("{} pid={} stats={}", self, r.pid, self.stats)
+        c.setblocking(False)
+        return r.pid, c
+
+    def pkdebug_str(self):
+        return pkdformat(
+            "{}(pid={} file={})",
+            self.__class__.__name__,
+            self._subprocess.proc.pid if self._subprocess else None,
+            self.file,
+        )
+
+    def start(self):
+        # sim_data reads OP_ENV at import and the lib file list is in
+        # the first cmd's run_dir so leave them unset in the server
+        e = PKDict(self.env)
+        for k in sirepo.pkcli.job_fork_server.OP_ENV:
+            e[k] = ""
+        c, s, e = job.agent_cmd_stdin_env(
+            cmd=("sirepo", "job_fork_server", str(self.file)),
+            env=job.agent_env(env=e),
+            source_bashrc="source $HOME/.bashrc",
+        )
+        pkio.unchecked_remove(self.file)
+        self._subprocess = tornado.process.Subprocess(
+            c,
+            close_fds=True,
+            cwd=str(pkio.py_path()),
+            env=e,
+            start_new_session=True,
+            stdin=s,
+        )
+        s.close()
+        self._subprocess.set_exit_callback(self._on_exit)
+        pkdlog("{}", self)
+        return self
+
+    def _fork(self, msg, stdout, stderr):
+        c = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            c.settimeout(_FORK_SERVER_TIMEOUT_SECS)
+            c.connect(str(self.file))
+            socket.send_fds(c, [msg], [stdout, stderr])
+            # read one byte at a time so the exit status stays in the socket
+            r = b""
+            while not r.endswith(b"\n"):
+                x = c.recv(1)
+                if not x:
+                    raise RuntimeError("fork server closed connection")
+                r += x
+            return pkjson.load_any(r), c
+        except Exception:
+            c.close()
+            raise
+
+    def _on_exit(self, returncode):
+        if self._subprocess:
+            pkdlog("{} returncode={}", self, returncode)
+            # started again by the next cmd
+            self.destroy()
+
+
 class _SbatchCmd(_Cmd):
     async def exited(self):
         await self._process.exit_ready()
@@ -610,6 +859,121 @@ class _SbatchCmd(_Cmd):
         return super().job_cmd_env(e)
 
 
+class _SbatchPoller(PKDict):
+    """Polls slurm for the states of all of the agent's sbatch jobs
+
+    One squeue per interval (the shortest nextRequestSeconds) and one
+    sacct for jobs which squeue no longer knows about.
+    """
+
+    def __init__(self):
+        super().__init__(
+            _cancel_ids=set(),
+            _errors=0,
+            _polling=False,
+            _runs=PKDict(),
+        )
+
+    def add(self, run):
+        self._runs[run._sbatch_id] = run
+        if not self._polling:
+            self._polling = True
+            tornado.ioloop.IOLoop.current().spawn_callback(self._poll)
+
+    def cancel(self, sbatch_id):
+        if not self._cancel_ids:
+            tornado.ioloop.IOLoop.current().spawn_callback(self._cancel)
+        self._cancel_ids.add(sbatch_id)
+
+    def remove(self, run):
+        for k, v in list(self._runs.items()):
+            if v is run:
+                del self._runs[k]
+
+    async def _cancel(self):
+        i = sorted(self._cancel_ids)
+        self._cancel_ids = set()
+        r = await _run_cmd(("scancel", "--full", "--quiet", *i))
+        if r.returncode != 0:
+            pkdlog(
+                "cancel error exit={} sbatch_ids={} stderr={} stdout={}",
+                r.returncode,
+                i,
+                r.stderr,
+                r.stdout,
+            )
+
+    def _interval(self):
+        s = min(r.msg.nextRequestSeconds for r in self._runs.values())
+        return max(s, min(s * 2**self._errors, _SBATCH_POLL_MAX_SECS))
+
+    async def _poll(self):
+        try:
+            while self._runs:
+                await tornado.gen.sleep(self._interval())
+                if not self._runs:
+                    break
+                try:
+                    s = await self._states(set(self._runs.keys()))
+                    self._errors = 0
+                except Exception as e:
+                    self._errors += 1
+                    pkdlog("errors={} error={}", self._errors, e)
+                    continue
+                for i, v in s.items():
+                    r = self._runs.get(i)
+                    if not r:
+                        continue
+                    try:
+                        await r.sbatch_state(v)
+                    except Exception as e:
+                        pkdlog("{} state={} error={} stack={}", r, v, e, pkdexc())
+        finally:
+            self._polling = False
+
+    async def _query(self, cmd, sbatch_ids, res):
+        r = await _run_cmd(cmd)
+        if r.returncode != 0:
+            raise RuntimeError(
+                f"{cmd[0]} exit={r.returncode} stderr={r.stderr} stdout={r.stdout}",
+            )
+        for l in r.stdout.splitlines():
+            x = l.split()
+            # sacct returns steps (id.batch) and "CANCELLED by <uid>"
+            if len(x) >= 2 and x[0] in sbatch_ids:
+                res[x[0]] = x[1]
+
+    async def _states(self, sbatch_ids):
+        res = PKDict()
+        # --jobs fails if any job is unknown so select by user
+        await self._query(
+            (
+                "squeue",
+                "--noheader",
+                "--format=%i %T",
+                f"--user={pwd.getpwuid(os.getuid()).pw_name}",
+            ),
+            sbatch_ids,
+            res,
+        )
+        m = sbatch_ids - set(res.keys())
+        if m:
+            # completed jobs age out of squeue
+            await self._query(
+                (
+                    "sacct",
+                    "--noheader",
+                    "--parsable2",
+                    "--delimiter= ",
+                    "--format=JobID,State",
+                    "--jobs=" + ",".join(sorted(m)),
+                ),
+                m,
+                res,
+            )
+        return res
+
+
 class _SbatchPrepareSimulationCmd(_SbatchCmd):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, send_reply=False, **kwargs)
@@ -645,7 +1009,6 @@ class _SbatchRun(_SbatchCmd):
         self.pkupdate(
             _start_time=0,
             _sbatch_id=None,
-            _status_cb=None,
             _status="PENDING",
             _stopped_sentinel=self.run_dir.join("sbatch_status_stop"),
         )
@@ -666,42 +1029,54 @@ class _SbatchRun(_SbatchCmd):
         await super().start()
 
     def destroy(self):
-        if self._status_cb:
-            self._status_cb.stop()
-            self._status_cb = None
+        self.dispatcher.sbatch_poller.remove(self)
         self._start_ready.set()
         if self._sbatch_id:
             i = self._sbatch_id
             self._sbatch_id = None
-            p = subprocess.run(
-                ("scancel", "--full", "--quiet", i),
-                close_fds=True,
-                cwd=str(self.run_dir),
-                capture_output=True,
-                text=True,
+            self.dispatcher.sbatch_poller.cancel(i)
+        super().destroy()
+
+    async def sbatch_state(self, state):
+        """Called by `_SbatchPoller` with the job's slurm state"""
+        if self._terminating:
+            return
+        self._status = state
+        if self._status in ("PENDING", "CONFIGURING"):
+            return
+        else:
+            if not self._start_ready.is_set():
+                self._start_time = int(time.time())
+                self._start_ready.set()
+            if self._status in ("COMPLETING", "RUNNING"):
+                return
+        c = self._status == "COMPLETED"
+        self._stopped_sentinel.write(job.COMPLETED if c else job.ERROR)
+        if not c:
+            # because have to await before calling destroy
+            self._terminating = True
+            pkdlog(
+                "{} sbatch_id={} unexpected state={}",
+                self,
+                self._sbatch_id,
+                self._status,
             )
-            if p.returncode != 0:
-                pkdlog(
-                    "{} cancel error exit={} sbatch={} stderr={} stdout={}",
-                    self,
-                    p.returncode,
-                    i,
-                    p.stderr,
-                    p.stdout,
+            await self.dispatcher.send(
+                self.dispatcher.format_op(
+                    self.msg,
+                    job.OP_ERROR,
+                    reply=PKDict(
+                        state=job.ERROR, error=f"sbatch status={self._status}"
+                    ),
                 )
-        super().destroy()
+            )
+            self.destroy()
 
     async def start(self):
         await self._prepare_simulation()
         if self._terminating:
             return
-        p = subprocess.run(
-            ("sbatch", self._sbatch_script()),
-            close_fds=True,
-            cwd=str(self.run_dir),
-            capture_output=True,
-            text=True,
-        )
+        p = await _run_cmd(("sbatch", str(self._sbatch_script())), cwd=self.run_dir)
         m = re.search(r"Submitted batch job (\d+)", p.stdout)
         # TODO(robnagler) if the guy is out of hours, will fail
         if not m:
@@ -724,12 +1099,8 @@ class _SbatchRun(_SbatchCmd):
             sbatchId=self._sbatch_id,
             stopSentinel=str(self._stopped_sentinel),
         )
-        self._status_cb = tornado.ioloop.PeriodicCallback(
-            self._sbatch_status,
-            self.msg.nextRequestSeconds * 1000,
-        )
         self._start_ready = sirepo.tornado.Event()
-        self._status_cb.start()
+        self.dispatcher.sbatch_poller.add(self)
         # Starting an sbatch job may involve a long wait in the queue
         # so release back to agent loop so we can process other ops
         # while we wait for the job to start running
@@ -791,66 +1162,6 @@ exec srun {m} {s} python {template_common.PARAMETERS_PYTHON_FILE}
         )
         return f
 
-    async def _sbatch_status(self):
-        if self._terminating:
-            return
-        p = subprocess.run(
-            ("scontrol", "show", "job", self.msg.sbatchId),
-            cwd=str(self.run_dir),
-            close_fds=True,
-            capture_output=True,
-            text=True,
-        )
-        if p.returncode != 0:
-            pkdlog(
-                "{} scontrol error exit={} sbatch={} stderr={} stdout={}",
-                self,
-                p.returncode,
-                self._sbatch_id,
-                p.stderr,
-                p.stdout,
-            )
-            return
-        r = re.search(r"(?<=JobState=)(\S+)(?= Reason)", p.stdout)
-        if not r:
-            pkdlog(
-                "{} failed to find JobState in sderr={} stdout={}",
-                self,
-                p.stderr,
-                p.stdout,
-            )
-            return
-        self._status = r.group()
-        if self._status in ("PENDING", "CONFIGURING"):
-            return
-        else:
-            if not self._start_ready.is_set():
-                self._start_time = int(time.time())
-                self._start_ready.set()
-            if self._status in ("COMPLETING", "RUNNING"):
-                return
-        c = self._status == "COMPLETED"
-        self._stopped_sentinel.write(job.COMPLETED if c else job.ERROR)
-        if not c:
-            # because have to await before calling destroy
-            self._terminating = True
-            pkdlog(
-                "{} sbatch_id={} unexpected state={}",
-                self,
-                self._sbatch_id,
-                self._status,
-            )
-            await self.dispatcher.send(
-                self.dispatcher.format_op(
-                    self.msg,
-                    job.OP_ERROR,
-                    reply=PKDict(
-                        state=job.ERROR, error=f"sbatch status={self._status}"
-                    ),
-                )
-            )
-            self.destroy()
-
     def _sbatch_time(self):
         return str(
             datetime.timedelta(
@@ -871,6 +1182,7 @@ class _Process(PKDict):
             stdout=None,
             cmd=cmd,
             _exit=sirepo.tornado.Event(),
+            _killed=False,
         )
         if self.cmd.msg.jobCmd not in ("prepare_simulation", "compute"):
             _assert_run_dir_exists(self.cmd.run_dir)
@@ -882,13 +1194,14 @@ class _Process(PKDict):
 
     def kill(self):
         # TODO(e-carlin): Terminate?
-        if "returncode" in self or "_subprocess" not in self:
+        # start may be waiting for the fork server
+        self._killed = True
+        if "returncode" in self or "_pid" not in self:
             return
-        p = None
         try:
             pkdlog("{}", self)
-            p = self.pkdel("_subprocess").proc.pid
-            os.killpg(p, signal.SIGKILL)
+            # forked job_cmds are session leaders, too
+            os.killpg(self.pkdel("_pid"), signal.SIGKILL)
         except Exception as e:
             pkdlog("{} error={}", self, e)
 
@@ -896,13 +1209,19 @@ class _Process(PKDict):
         return pkdformat(
             "{}(pid={} cmd={})",
             self.__class__.__name__,
-            self._subprocess.proc.pid if self.get("_subprocess") else None,
+            self.get("_pid"),
             self.cmd,
         )
 
-    def start(self):
+    async def start(self):
         # SECURITY: msg must not contain agentId
         assert not self.cmd.msg.get("agentId")
+        f = self.cmd.dispatcher.fork_server(self.cmd)
+        if f:
+            try:
+                return await self._fork(f)
+            except Exception as e:
+                pkdlog("{} {} error={}; starting subprocess", self, f, e)
         c, s, e = self.cmd.job_cmd_cmd_stdin_env()
         pkdlog("cmd={} stdin={}", c, s.read())
         s.seek(0)
@@ -917,9 +1236,48 @@ class _Process(PKDict):
             stderr=tornado.process.Subprocess.STREAM,
         )
         s.close()
+        self._pid = self._subprocess.proc.pid
         self.stdout = _ReadJsonlStream(self._subprocess.stdout, self.cmd)
         self.stderr = _ReadUntilCloseStream(self._subprocess.stderr, self.cmd)
         self._subprocess.set_exit_callback(self._on_exit)
+        if self._killed:
+            self.kill()
+        return self
+
+    async def _await_fork_exit(self, connection):
+        r = -signal.SIGKILL
+        s = tornado.iostream.IOStream(connection)
+        try:
+            r = pkjson.load_any(await s.read_until(b"\n", 1024)).returncode
+        except Exception as e:
+            # fork server exited so the status of the child is unknown
+            pkdlog("{} error={}", self, e)
+            self.kill()
+        finally:
+            s.close()
+        self._on_exit(r)
+
+    async def _fork(self, server):
+        o = os.pipe()
+        e = os.pipe()
+        try:
+            self._pid, c = await server.fork(self.cmd, o[1], e[1])
+        except Exception:
+            os.close(o[0])
+            os.close(e[0])
+            raise
+        finally:
+            # child has its own copies
+            os.close(o[1])
+            os.close(e[1])
+        self.stdout = _ReadJsonlStream(tornado.iostream.PipeIOStream(o[0]), self.cmd)
+        self.stderr = _ReadUntilCloseStream(
+            tornado.iostream.PipeIOStream(e[0]),
+            self.cmd,
+        )
+        tornado.ioloop.IOLoop.current().add_callback(self._await_fork_exit, c)
+        if self._killed:
+            self.kill()
         return self
 
     def _on_exit(self, returncode):
@@ -988,6 +1346,30 @@ class _ReadUntilCloseStream(_Stream):
         self.text.extend(t)
 
 
+async def _run_cmd(cmd, cwd=None):
+    """Run cmd without blocking the ioloop
+
+    Returns:
+        PKDict: returncode, stderr, stdout
+    """
+    p = tornado.process.Subprocess(
+        cmd,
+        close_fds=True,
+        cwd=cwd and str(cwd),
+        stdin=subprocess.DEVNULL,
+        stdout=tornado.process.Subprocess.STREAM,
+        stderr=tornado.process.Subprocess.STREAM,
+    )
+    o, e = await tornado.gen.multi(
+        [p.stdout.read_until_close(), p.stderr.read_until_close()],
+    )
+    return PKDict(
+        returncode=await p.wait_for_exit(raise_error=False),
+        stderr=e.decode("utf-8", errors="ignore"),
+        stdout=o.decode("utf-8", errors="ignore"),
+    )
+
+
 def _terminate(dispatcher):
     dispatcher.terminate()
     pkio.unchecked_remove(_PID_FILE)
@@ -14,9 +14,11 @@ from sirepo import job
 from sirepo import simulation_db
 from sirepo.template import template_common
 import contextlib
+import os
 import re
 import requests
 import signal
+import sirepo.binary_msg
 import sirepo.sim_data
 import sirepo.template
 import sirepo.util
@@ -28,6 +30,9 @@ _MAX_FASTCGI_EXCEPTIONS = 3
 
 _MAX_FASTCGI_MSG = int(1e8)
 
+#: set by sirepo.pkcli.job_fork_server in its children
+in_fork_server = False
+
 
 def default_command(in_file):
     """Reads `in_file` passes to `msg.jobCmd`
@@ -94,11 +99,7 @@ def _do_cancel(msg, template):
 def _do_compute(msg, template):
     msg.runDir = pkio.py_path(msg.runDir)
     with msg.runDir.join(template_common.RUN_LOG).open("w") as run_log:
-        p = subprocess.Popen(
-            _do_prepare_simulation(msg, template).cmd,
-            stdout=run_log,
-            stderr=run_log,
-        )
+        p = _popen(_do_prepare_simulation(msg, template).cmd, run_log)
     while True:
         for j in range(20):
             time.sleep(0.1)
@@ -195,10 +196,12 @@ def _do_fastcgi(msg, template):
     s.connect(msg.fastcgiFile)
     c = 0
     while True:
+        b = False
         try:
             m = _recv()
             if not m:
                 return
+            b = m.jobCmd == "get_simulation_frame"
             with _update_run_dir_and_maybe_chdir(m):
                 r = globals()["_do_" + m.jobCmd](
                     m, sirepo.template.import_module(m.simulationType)
@@ -213,7 +216,7 @@ def _do_fastcgi(msg, template):
             ), "too many fastgci exceptions {}. Most recent error={}".format(c, e)
             c += 1
             r = _maybe_parse_user_alert(e)
-        s.sendall(_validate_msg_and_jsonl(r))
+        s.sendall(_validate_msg_and_frame(r, want_binary=b))
 
 
 def _do_get_simulation_frame(msg, template):
@@ -330,18 +333,65 @@ def _parse_python_errors(text):
     return ""
 
 
+def _popen(cmd, run_log):
+    """Start cmd, forking pkcli commands if modules are preloaded"""
+    if in_fork_server and cmd[0] == "sirepo":
+        return _PkcliFork(cmd, run_log)
+    return subprocess.Popen(cmd, stdout=run_log, stderr=run_log)
+
+
+class _PkcliFork:
+    """Runs ``sirepo <module> <cmd>`` in a child with the same interface as Popen"""
+
+    def __init__(self, cmd, run_log):
+        import pykern.pkcli
+
+        self.returncode = None
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self.pid = os.fork()
+        if self.pid:
+            return
+        r = 1
+        try:
+            os.dup2(run_log.fileno(), 1)
+            os.dup2(run_log.fileno(), 2)
+            r = pykern.pkcli.main(cmd[0], list(cmd))
+        except SystemExit as e:
+            r = e.code if isinstance(e.code, int) else 1
+        except BaseException as e:
+            pkdlog("cmd={} error={} stack={}", cmd, e, pkdexc())
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(r or 0)
+
+    def poll(self):
+        if self.returncode is None:
+            p, s = os.waitpid(self.pid, os.WNOHANG)
+            if p:
+                self.returncode = os.waitstatus_to_exitcode(s)
+        return self.returncode
+
+
 def _validate_msg(msg):
     if len(msg) >= job.cfg().max_message_bytes:
         return PKDict(state=job.COMPLETED, error="Response is too large to send")
     return None
 
 
-def _validate_msg_and_jsonl(msg):
-    m = pkjson.dump_bytes(msg)
+def _validate_msg_and_frame(msg, want_binary):
+    """Encode msg prefixed by its length, since binary msgs may contain newlines"""
+    m = sirepo.binary_msg.dump_bytes(
+        msg,
+        want_binary=want_binary and job.cfg().binary_messages,
+    )
     r = _validate_msg(m)
     if r:
         m = pkjson.dump_bytes(r)
-    return m + b"\n"
+    return b"%d\n" % len(m) + m
 
 
 def _write_parallel_status(msg, template, is_running):
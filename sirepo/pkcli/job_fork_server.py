@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""Fork server for job_cmd compute processes started by job_agent
+
+Imports sirepo, numeric libraries, schemas and templates once and then
+forks a child for each request so sequential runs do not pay for
+interpreter startup and imports.
+
+Protocol (unix stream socket, one connection per child):
+
+    request: JSON line PKDict(cwd, env, inFile) with the child's stdout
+        and stderr fds attached (SCM_RIGHTS)
+    reply: JSON line PKDict(pid, preloadSecs) after the fork and
+        JSON line PKDict(returncode) after the child exits
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from pykern import pkio
+from pykern import pkjson
+from pykern.pkcollections import PKDict
+from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
+import importlib
+import os
+import select
+import signal
+import socket
+import sys
+import time
+
+#: env values which may differ between the server and a child (see `_child`)
+OP_ENV = frozenset(
+    (
+        "SIREPO_SIM_DATA_LIB_FILE_LIST",
+        "SIREPO_SIM_DATA_LIB_FILE_URI",
+    )
+)
+
+_MAX_REQUEST_BYTES = 1024 * 1024
+
+#: imported if installed, templates import the rest
+_PRELOAD_MODULES = (
+    "numpy",
+    "scipy",
+    "scipy.constants",
+    "h5py",
+)
+
+_REAP_SECS = 0.5
+
+
+def default_command(sock_file):
+    """Preload modules and fork children for job_agent until killed
+
+    Args:
+        sock_file (str): unix socket to listen on (created after preloading)
+    """
+    t = time.time()
+    _preload()
+    t = time.time() - t
+    pkdlog("preloadSecs={:.2f}", t)
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    pkio.unchecked_remove(sock_file)
+    s.bind(sock_file)
+    s.listen()
+    c = PKDict()
+    while True:
+        if select.select([s], [], [], _REAP_SECS)[0]:
+            x, _ = s.accept()
+            try:
+                c[_fork(x, t, [s] + list(c.values()))] = x
+            except Exception as e:
+                pkdlog("error={} stack={}", e, pkdexc())
+                x.close()
+        _reap(c)
+
+
+def _child(request, fds, sockets):
+    """Runs `job_cmd` in the child as ``sirepo job_cmd`` would"""
+    import pykern.pkcli
+    import sirepo.pkcli.job_cmd
+    import sirepo.sim_data
+
+    r = 1
+    try:
+        for x in sockets:
+            x.close()
+        os.setsid()
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.dup2(fds[0], 1)
+        os.dup2(fds[1], 2)
+        for f in fds:
+            os.close(f)
+        n = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(n, 0)
+        os.close(n)
+        os.chdir(request.cwd)
+        os.environ.update(request.env)
+        # POSIT: pkconfig values read at import only differ in OP_ENV
+        sirepo.sim_data.reset_agent_lib_files(
+            request.env.get("SIREPO_SIM_DATA_LIB_FILE_URI"),
+            request.env.get("SIREPO_SIM_DATA_LIB_FILE_LIST"),
+        )
+        sirepo.pkcli.job_cmd.in_fork_server = True
+        r = pykern.pkcli.main("sirepo", ["sirepo", "job_cmd", request.inFile])
+    except SystemExit as e:
+        r = e.code if isinstance(e.code, int) else 1
+    except BaseException as e:
+        pkdlog("error={} stack={}", e, pkdexc())
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(r or 0)
+
+
+def _fork(connection, preload_secs, sockets):
+    m, f, _, _ = socket.recv_fds(connection, _MAX_REQUEST_BYTES, 2)
+    assert len(f) == 2, f"expecting stdout and stderr fds={f}"
+    while not m.endswith(b"\n"):
+        x = connection.recv(_MAX_REQUEST_BYTES)
+        if not x or len(m) + len(x) > _MAX_REQUEST_BYTES:
+            raise RuntimeError(f"invalid request len={len(m)}")
+        m += x
+    r = pkjson.load_any(m)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    p = os.fork()
+    if p == 0:
+        _child(r, f, sockets + [connection])
+        # DOES NOT RETURN
+    for x in f:
+        os.close(x)
+    connection.sendall(
+        pkjson.dump_bytes(PKDict(pid=p, preloadSecs=preload_secs)) + b"\n",
+    )
+    pkdc("pid={} inFile={}", p, r.inFile)
+    return p
+
+
+def _preload():
+    import sirepo.feature_config
+    import sirepo.pkcli.job_cmd
+    import sirepo.simulation_db
+    import sirepo.template
+
+    for m in _PRELOAD_MODULES:
+        try:
+            importlib.import_module(m)
+        except ImportError:
+            pass
+    for t in sorted(sirepo.feature_config.cfg().sim_types):
+        try:
+            sirepo.simulation_db.get_schema(t)
+            sirepo.template.import_module(t)
+        except Exception as e:
+            # the child imports it (and reports the error) if it is used
+            pkdlog("sim_type={} error={}", t, e)
+
+
+def _reap(children):
+    while children:
+        try:
+            p, s = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if not p:
+            return
+        c = children.pkdel(p)
+        if not c:
+            continue
+        try:
+            c.sendall(
+                pkjson.dump_bytes(PKDict(returncode=os.waitstatus_to_exitcode(s)))
+                + b"\n",
+            )
+        except Exception as e:
+            # agent closed the connection
+            pkdc("pid={} error={}", p, e)
+        finally:
+            c.close()
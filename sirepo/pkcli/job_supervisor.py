@@ -14,6 +14,7 @@ import copy
 import functools
 import importlib
 import signal
+import sirepo.binary_msg
 import sirepo.const
 import sirepo.events
 import sirepo.feature_config
@@ -35,6 +36,74 @@ import tornado.websocket
 cfg = None
 
 
+def benchmark_db(db_dir, backend="sqlite", jobs=10000, updates=100000):
+    """Time the supervisor's job db operations on a scratch store
+
+    Creates jobs, sends running status updates to random jobs (coalesced
+    and flushed once per 1000 updates), finishes each job, loads every
+    job, and looks for purge candidates.
+
+    Args:
+        db_dir (str): scratch directory (must not exist)
+        backend (str): json or sqlite [sqlite]
+        jobs (int): number of jobs [10000]
+        updates (int): status updates [100000]
+    Returns:
+        str: seconds and rate of each operation
+    """
+    import random
+    import time
+
+    def _time(name, count, op):
+        t = time.time()
+        op()
+        t = time.time() - t
+        r.append(f"{name}: {count} in {t:.2f}s ({count / max(t, 1e-6):.0f}/s)")
+
+    def _finish():
+        for d in j:
+            d.status = sirepo.job.COMPLETED
+            s.write(d)
+
+    def _update():
+        for i in range(updates):
+            d = random.choice(j)
+            d.lastUpdateTime = i
+            d.parallelStatus.frameCount = i
+            s.write(d, coalesce=True)
+            if i % 1000 == 999:
+                s.flush()
+        s.flush()
+
+    d = pkio.py_path(db_dir)
+    assert not d.exists(), f"db_dir={d} must not exist"
+    s = sirepo.job_supervisor.create_job_db(backend, d, coalesce_secs=1)
+    j = [
+        PKDict(
+            computeJid=f"bench{i % 100:03d}-sim{i:06d}-animation",
+            dbUpdateTime=0,
+            history=[PKDict(status=sirepo.job.COMPLETED)],
+            isPremiumUser=False,
+            lastUpdateTime=0,
+            parallelStatus=PKDict(frameCount=0),
+            status=sirepo.job.RUNNING,
+            uid=f"bench{i % 100:03d}",
+        )
+        for i in range(jobs)
+    ]
+    r = [f"backend={backend} jobs={jobs}"]
+    _time("create", jobs, lambda: [s.write(x) for x in j])
+    _time("update", updates, _update)
+    _time("finish", jobs, _finish)
+    _time("load", jobs, lambda: [s.load(x.computeJid) for x in j])
+    _time(
+        "purge_candidates",
+        jobs,
+        lambda: list(s.purge_candidates(time.time(), set(), set())),
+    )
+    return "\n".join(r)
+
+
 def default_command():
     global cfg
 
@@ -52,6 +121,7 @@ def default_command():
             (sirepo.job.AGENT_URI, _AgentMsg),
             (sirepo.job.SERVER_URI, _ServerReq),
             (sirepo.job.SERVER_RUN_MULTI_URI, _ServerReqRunMulti),
+            (sirepo.job.SERVER_STATUS_STREAM_URI, _ServerReqStatusStream),
             (sirepo.job.SERVER_PING_URI, _ServerPing),
             (sirepo.job.SERVER_SRTIME_URI, _ServerSrtime),
             (sirepo.job.DATA_FILE_URI + "/(.*)", _DataFileReq),
@@ -127,11 +197,20 @@ class _JsonPostRequestHandler(tornado.web.RequestHandler):
     def set_default_headers(self):
         self.set_header("Content-Type", 'application/json; charset="utf-8"')
 
+    def sr_write(self, value):
+        """Write value as JSON or binary if it contains arrays"""
+        b = sirepo.binary_msg.dump_bytes(value, convert_lists=False)
+        if sirepo.binary_msg.is_binary(b):
+            self.set_header("Content-Type", sirepo.binary_msg.CONTENT_TYPE)
+        self.write(b)
+
 
 class _ServerPing(_JsonPostRequestHandler):
     async def post(self):
         r = pkjson.load_any(self.request.body)
-        self.write(r.pkupdate(state="ok"))
+        self.write(
+            r.pkupdate(state="ok", caches=sirepo.job_supervisor.cache_stats()),
+        )
 
 
 class _ServerReq(_JsonPostRequestHandler):
@@ -149,7 +228,7 @@ class _ServerReq(_JsonPostRequestHandler):
         pass
 
     async def post(self):
-        self.write(await _incoming(self.request.body, self))
+        self.sr_write(await _incoming(self.request.body, self))
 
     def sr_on_exception(self):
         self.send_error()
@@ -196,14 +275,26 @@ class _ServerReqRunMulti(_ServerReq):
             r.pkupdate(
                 data=await asyncio.gather(*futures, return_exceptions=True),
             )
-        self.write(r)
+        self.sr_write(r)
+
+
+class _ServerReqStatusStream(_ServerReq):
+    def set_default_headers(self):
+        self.set_header("Content-Type", "application/x-ndjson")
+
+    async def post(self):
+        # lines are written by _receive_api_runStatusStream
+        r = await _incoming(self.request.body, self)
+        if r is not None:
+            # error reply
+            self.write(pkjson.dump_bytes(r) + b"\n")
 
 
 async def _incoming(content, handler):
     try:
         c = content
         if not isinstance(content, dict):
-            c = pkjson.load_any(content)
+            c = sirepo.binary_msg.load_any(content)
         if c.get("api") != "api_runStatus":
             pkdc(
                 "class={} content={}",
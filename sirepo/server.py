@@ -222,9 +222,8 @@ class API(sirepo.quest.API):
         # TODO(pjm): need to unquote when redirecting from saved cookie redirect?
         simulation_name = urllib.parse.unquote(simulation_name)
         # use the existing named simulation, or copy it from the examples
-        rows = simulation_db.iterate_simulation_datafiles(
+        rows = simulation_db.list_simulations(
             req.type,
-            simulation_db.process_simulation_list,
             {
                 "simulation.name": simulation_name,
                 "simulation.isExample": True,
@@ -235,9 +234,8 @@ class API(sirepo.quest.API):
                 if s["models"]["simulation"]["name"] != simulation_name:
                     continue
                 simulation_db.save_new_example(s)
-                rows = simulation_db.iterate_simulation_datafiles(
+                rows = simulation_db.list_simulations(
                     req.type,
-                    simulation_db.process_simulation_list,
                     {
                         "simulation.name": simulation_name,
                     },
@@ -552,9 +550,8 @@ class API(sirepo.quest.API):
         req = self.parse_post()
         return self.reply_json(
             sorted(
-                simulation_db.iterate_simulation_datafiles(
+                simulation_db.list_simulations(
                     req.type,
-                    simulation_db.process_simulation_list,
                     req.req_data.get("search"),
                 ),
                 key=lambda row: row["name"],
@@ -14,6 +14,7 @@ import hashlib
 import inspect
 import re
 import requests
+import sirepo.agent_file_cache
 import sirepo.const
 import sirepo.feature_config
 import sirepo.job
@@ -666,11 +667,16 @@ class SimDataBase(object):
             # In agent
             if basename in _cfg.lib_file_list:
                 # User generated lib file
-                p = pkio.py_path(basename)
-                r = _request("GET", _cfg.lib_file_uri + basename)
-                r.raise_for_status()
-                p.write_binary(r.content)
-                return p
+                return sirepo.agent_file_cache.to_path(
+                    # lib_file_uri is unique per op
+                    f"lib/{basename}",
+                    pkio.py_path(basename),
+                    lambda headers: _request(
+                        "GET",
+                        _cfg.lib_file_uri + basename,
+                        headers=headers,
+                    ),
+                )
         elif not _cfg.lib_file_resource_only:
             # Command line utility or server
             f = sirepo.simulation_db.simulation_lib_dir(cls.sim_type()).join(basename)
@@ -786,10 +792,16 @@ class SimDataBase(object):
 
     @classmethod
     def _sim_db_file_to_run_dir(cls, uri, run_dir, is_exe=False):
-        p = run_dir.join(uri.split("/")[-1])
-        r = _request("GET", _cfg.supervisor_sim_db_file_uri + uri)
-        r.raise_for_status()
-        p.write_binary(r.content)
+        p = sirepo.agent_file_cache.to_path(
+            f"sim_db/{uri}",
+            run_dir.join(uri.split("/")[-1]),
+            lambda headers: _request(
+                "GET",
+                _cfg.supervisor_sim_db_file_uri + uri,
+                headers=headers,
+            ),
+            copy=is_exe,
+        )
         if is_exe:
             p.chmod(cls._EXE_PERMISSIONS)
         return p
@@ -819,6 +831,19 @@ class SimDbFileNotFound(Exception):
     pass
 
 
+def reset_agent_lib_files(lib_file_uri, lib_file_list):
+    """Replace lib file cfg in a child of `sirepo.pkcli.job_fork_server`
+
+    Args:
+        lib_file_uri (str): SIREPO_SIM_DATA_LIB_FILE_URI or None
+        lib_file_list (str): SIREPO_SIM_DATA_LIB_FILE_LIST or None
+    """
+    _cfg.lib_file_uri = lib_file_uri or None
+    _cfg.lib_file_list = (
+        pkio.read_text(lib_file_list).splitlines() if lib_file_list else None
+    )
+
+
 def split_jid(jid):
     """Split jid into named parts
 
@@ -835,18 +860,20 @@ def split_jid(jid):
     )
 
 
-def _request(method, uri, data=None):
+def _request(method, uri, data=None, headers=None):
     r = requests.request(
         method,
         uri,
         data=data,
         verify=sirepo.job.cfg().verify_tls,
-        headers=PKDict(
+        headers=PKDict(headers or ()).pkupdate(
             {
                 sirepo.util.AUTH_HEADER: _AUTH_HEADER_PREFIX
                 + _cfg.supervisor_sim_db_file_token,
             }
         ),
+        # GETs are streamed to disk by sirepo.agent_file_cache
+        stream=method == "GET",
     )
     if method == "GET" and r.status_code == 404:
         raise SimDbFileNotFound(f"uri={uri} not found")
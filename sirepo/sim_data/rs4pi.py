@@ -59,6 +59,16 @@ class SimData(sirepo.sim_data.SimDataBase):
             x.roiNumbers = [x.roiNumber]
             del x["roiNumber"]
         dm.dicomAnimation4.pksetdefault("doseTransparency", 56)
+        x = dm.get("dicomSeries")
+        if x and x.get("planes") and "pixelShape" not in x:
+            # c and s frame counts were swapped for non-square series
+            cls.__fixup_old_data_by_template(data)
+
+    @classmethod
+    def __fixup_old_data_by_template(cls, data):
+        import sirepo.template.rs4pi
+
+        sirepo.template.rs4pi.fixup_pixel_planes(data)
 
     @classmethod
     def _compute_job_fields(cls, data, r, compute_model):
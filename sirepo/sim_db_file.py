@@ -8,11 +8,13 @@ from __future__ import absolute_import, division, print_function
 from pykern import pkio
 from pykern.pkdebug import pkdp, pkdlog
 from pykern.pkcollections import PKDict
+import os
 import re
 import sirepo.job
 import sirepo.simulation_db
 import sirepo.tornado
 import sirepo.util
+import tornado.ioloop
 import tornado.web
 
 _AUTH_HEADER_RE = re.compile(
@@ -25,23 +27,129 @@ _AUTH_HEADER_RE = re.compile(
 
 _TOKEN_TO_UID = PKDict()
 
+_CHUNK_BYTES = 1024 * 1024
 
+#: single range only
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@tornado.web.stream_request_body
 class FileReq(tornado.web.RequestHandler):
+    """Get, put and delete sim db files for agents
+
+    Bodies are streamed in chunks with disk I/O on the default
+    executor so large files do not block the supervisor. GET supports
+    ETag/If-None-Match (see sirepo.agent_file_cache) and a single
+    byte Range so interrupted transfers can resume.
+    """
+
+    async def data_received(self, chunk):
+        if self.__put_file:
+            await _io(self.__put_file.write, chunk)
+
     def delete(self, path):
-        self.__validate_req()
         for f in pkio.sorted_glob(sirepo.srdb.root().join(path + "*")):
             pkio.unchecked_remove(f)
 
-    def get(self, path):
-        self.__validate_req()
+    async def get(self, path):
         p = sirepo.srdb.root().join(path)
-        if not p.exists():
+        try:
+            s = await _io(os.stat, p)
+        except FileNotFoundError:
             raise sirepo.tornado.error_not_found()
-        self.write(pkio.read_binary(p))
+        # cheap validator so agents can cache (see sirepo.agent_file_cache)
+        t = '"{:x}-{:x}"'.format(s.st_mtime_ns, s.st_size)
+        self.set_header("Etag", t)
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+        self.set_header("Accept-Ranges", "bytes")
+        r = self.__range(s.st_size, t)
+        if not r:
+            self.finish()
+            return
+        b, e = r
+        self.set_header("Content-Length", e - b)
+        f = await _io(open, p, "rb")
+        try:
+            await _io(f.seek, b)
+            while b < e:
+                x = await _io(f.read, min(_CHUNK_BYTES, e - b))
+                if not x:
+                    break
+                b += len(x)
+                self.write(x)
+                await self.flush()
+        finally:
+            f.close()
+
+    def initialize(self):
+        self.__put_file = None
+
+    def on_connection_close(self):
+        self.__put_remove()
 
-    def put(self, path):
+    def on_finish(self):
+        self.__put_remove()
+
+    async def prepare(self):
         self.__validate_req()
-        sirepo.srdb.root().join(path).write_binary(self.request.body)
+        if self.request.method != "PUT":
+            return
+        p = sirepo.srdb.root().join(self.path_args[0])
+        # dot file so not matched by delete
+        self.__put_tmp = p.new(basename=f".{p.basename}-{sirepo.job.unique_key()}")
+        self.__put_file = await _io(open, self.__put_tmp, "wb")
+
+    async def put(self, path):
+        f = self.__put_file
+        self.__put_file = None
+        try:
+            await _io(f.close)
+            await _io(os.replace, self.__put_tmp, sirepo.srdb.root().join(path))
+        finally:
+            # only exists if close or replace failed
+            pkio.unchecked_remove(self.__put_tmp)
+
+    def __put_remove(self):
+        f = self.__put_file
+        if not f:
+            return
+        self.__put_file = None
+        f.close()
+        pkio.unchecked_remove(self.__put_tmp)
+
+    def __range(self, size, etag):
+        """Bytes to send [begin, end) for the Range header
+
+        Multiple ranges are not supported so the whole file is sent.
+
+        Returns:
+            tuple: begin and end or None if not satisfiable (416 set)
+        """
+        r = self.request.headers.get("Range")
+        i = self.request.headers.get("If-Range")
+        if not r or (i and i != etag):
+            return 0, size
+        m = _RANGE_RE.search(r)
+        if not m or not (m.group(1) or m.group(2)):
+            return 0, size
+        b, e = m.group(1), m.group(2)
+        if b:
+            b = int(b)
+            e = min(int(e) + 1, size) if e else size
+        else:
+            # suffix
+            b = max(size - int(e), 0)
+            e = size
+        if b >= e:
+            # not HTTPError, because send_error clears headers
+            self.set_status(416)
+            self.set_header("Content-Range", f"bytes */{size}")
+            return None
+        self.set_status(206)
+        self.set_header("Content-Range", f"bytes {b}-{e - 1}/{size}")
+        return b, e
 
     def __validate_req(self):
         t = self.request.headers.get(sirepo.util.AUTH_HEADER)
@@ -68,3 +176,8 @@ def token_for_user(uid):
     k = sirepo.job.unique_key()
     _TOKEN_TO_UID[k] = uid
     return k
+
+
+async def _io(func, *args):
+    """Disk I/O off the ioloop"""
+    return await tornado.ioloop.IOLoop.current().run_in_executor(None, func, *args)
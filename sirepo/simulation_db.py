@@ -21,9 +21,11 @@ import copy
 import datetime
 import errno
 import glob
+import hashlib
 import numconv
 import os
 import os.path
+import pickle
 import random
 import re
 import sirepo.const
@@ -31,6 +33,7 @@ import sirepo.mpi
 import sirepo.resource
 import sirepo.srdb
 import sirepo.template
+import sys
 import time
 
 #: Names to display to use for jobRunMode
@@ -46,6 +49,9 @@ SIMULATION_DATA_FILE = "sirepo-data" + sirepo.const.JSON_SUFFIX
 #: where users live under db_dir
 USER_ROOT_DIR = "user"
 
+#: Per-user, per-sim_type index of simulation models, lives next to the sim dirs
+_CATALOG_FILE = "sim-catalog" + sirepo.const.JSON_SUFFIX
+
 #: Valid characters in ID
 _ID_CHARS = numconv.BASE62
 
@@ -70,9 +76,12 @@ _OLDEST_VERSION = "20140101.000001"
 #: Absolute path of rsmanifest file
 _RSMANIFEST_PATH = pkio.py_path("/rsmanifest" + sirepo.const.JSON_SUFFIX)
 
-#: Cache of schemas keyed by app name
+#: Cache of schemas keyed by app name (filled by `get_schema`)
 _SCHEMA_CACHE = PKDict()
 
+#: Compiled schemas cached in `sirepo.srdb.schema_cache_dir`
+_SCHEMA_COMPILED_SUFFIX = ".pickle"
+
 #: Special field to direct pseudo-subclassing of schema objects
 _SCHEMA_SUPERCLASS_FIELD = "_super"
 
@@ -85,6 +94,9 @@ _serial_prev = 0
 #: configuration
 _cfg = None
 
+#: Pickled schemas not yet loaded by `get_schema` (see `_init_schemas`)
+_schema_compiled = None
+
 #: version for development
 _dev_version = None
 
@@ -125,15 +137,41 @@ def default_data(sim_type):
 
     return open_json_file(
         sim_type,
-        path=sim_data.get_class(sim_type,).resource_path(
+        path=sim_data.get_class(
+            sim_type,
+        ).resource_path(
             f"default-data{sirepo.const.JSON_SUFFIX}",
         ),
     )
 
 
+def compile_schemas():
+    """Compile schemas of enabled sim types and cache them for other processes
+
+    Called at build time so that the first process does not pay for it.
+
+    Returns:
+        PKDict: compileSecs (json) and loadSecs (compiled) for all sim types
+    """
+    f = _schema_files()
+    t = time.time()
+    c = _schema_compile(f, _schema_key(f))
+    r = PKDict(compileSecs=time.time() - t)
+    _schema_compiled_write(c)
+    t = time.time()
+    c = _schema_compiled_read(c.key)
+    for x in [c.common] + list(c.schemas.values()):
+        pickle.loads(x)
+    r.loadSecs = time.time() - t
+    return r
+
+
 def delete_simulation(simulation_type, sid, uid=None):
     """Deletes the simulation's directory."""
-    pkio.unchecked_remove(simulation_dir(simulation_type, sid, uid=uid))
+    d = simulation_dir(simulation_type, sid, uid=uid)
+    with util.THREAD_LOCK:
+        pkio.unchecked_remove(d)
+        _catalog_update(d.join(SIMULATION_DATA_FILE), None)
 
 
 def delete_user(uid):
@@ -157,9 +195,8 @@ def examples(app):
 
 def find_user_simulation_copy(sim_type, sid, uid):
     """ONLY USED BY api_simulationData"""
-    rows = iterate_simulation_datafiles(
+    rows = list_simulations(
         sim_type,
-        process_simulation_list,
         PKDict({"simulation.outOfSessionSimulationId": sid}),
         uid=uid,
     )
@@ -279,7 +316,7 @@ def get_schema(sim_type):
         if sim_type is not None
         else list(feature_config.cfg().sim_types)[0]
     )
-    return _SCHEMA_CACHE[t]
+    return _SCHEMA_CACHE.get(t) or _schema_load(t)
 
 
 def generate_json(data, pretty=False):
@@ -349,6 +386,35 @@ def lib_dir_from_sim_dir(sim_dir):
     return _sim_from_path(sim_dir)[1].join(_REL_LIB_DIR)
 
 
+def list_simulations(simulation_type, search=None, uid=None):
+    """Rows (see `process_simulation_list`) for the user's simulations
+
+    Uses the per-user catalog so only simulations which changed since
+    the catalog was written are read from disk. Searches on fields
+    outside of ``models.simulation`` fall back to reading every file.
+
+    Args:
+        simulation_type (str): app
+        search (dict): field paths (e.g. "simulation.folder") to match [None]
+        uid (str): user id [logged_in_user]
+    Returns:
+        list: rows in glob order
+    """
+    if search and any(not k.startswith("simulation.") for k in search):
+        return iterate_simulation_datafiles(
+            simulation_type,
+            process_simulation_list,
+            search,
+            uid=uid,
+        )
+    res = []
+    for s, p in _catalog_refresh(simulation_type, uid):
+        if search and not _search_data(PKDict(models=PKDict(simulation=s)), search):
+            continue
+        _simulation_list_row(res, p, s)
+    return res
+
+
 def logged_in_user_path():
     """Get logged in user's simulation directory
 
@@ -477,16 +543,7 @@ def prepare_simulation(data, run_dir):
 
 
 def process_simulation_list(res, path, data):
-    sim = data["models"]["simulation"]
-    res.append(
-        PKDict(
-            simulationId=_sim_from_path(path)[0],
-            name=sim["name"],
-            folder=sim["folder"],
-            isExample=sim["isExample"] if "isExample" in sim else False,
-            simulation=sim,
-        )
-    )
+    _simulation_list_row(res, path, data["models"]["simulation"])
 
 
 def read_json(filename):
@@ -566,12 +623,14 @@ def save_simulation_json(data, fixup, do_validate=True, uid=None, modified=False
         if need_validate and do_validate:
             srschema.validate_name(
                 data,
-                iterate_simulation_datafiles(
-                    sim_type,
-                    lambda res, _, d: res.append(d),
-                    PKDict({"simulation.folder": s.folder}),
-                    uid=uid,
-                ),
+                [
+                    PKDict(models=PKDict(simulation=r.simulation))
+                    for r in list_simulations(
+                        sim_type,
+                        PKDict({"simulation.folder": s.folder}),
+                        uid=uid,
+                    )
+                ],
                 SCHEMA_COMMON.common.constants.maxSimCopies,
             )
             srschema.validate_fields(data, get_schema(data.simulationType))
@@ -582,6 +641,7 @@ def save_simulation_json(data, fixup, do_validate=True, uid=None, modified=False
         if modified:
             d.models.simulation.lastModified = srtime.utc_now_as_milliseconds()
         write_json(fn, d)
+        _catalog_update(fn, d.models.simulation)
     return data
 
 
@@ -841,6 +901,103 @@ def write_json(filename, data):
     util.json_dump(data, path=json_filename(filename), pretty=True)
 
 
+def _catalog_entry(path, simulation):
+    s = path.stat()
+    return PKDict(mtime=s.mtime_ns, size=s.size, simulation=simulation)
+
+
+def _catalog_is_current(entry, path):
+    try:
+        s = os.stat(str(path))
+    except FileNotFoundError:
+        return False
+    return entry.mtime == s.st_mtime_ns and entry.size == s.st_size
+
+
+def _catalog_read(sim_dir):
+    p = sim_dir.join(_CATALOG_FILE)
+    try:
+        c = read_json(p)
+        if c.get("version") == SCHEMA_COMMON.version:
+            return p, c
+    except Exception as e:
+        if not pkio.exception_is_not_found(e):
+            pkdlog("{}: ignoring corrupt catalog error={}", p, e)
+    # Schema upgrades may change data so all entries must be refreshed
+    return p, PKDict(version=SCHEMA_COMMON.version, sims=PKDict())
+
+
+def _catalog_refresh(simulation_type, uid):
+    """Bring the catalog in sync with the sim dirs
+
+    Only data files whose mtime or size differ from the catalog entry
+    are opened (and fixed up). Files which cannot be parsed are not
+    returned.
+
+    Returns:
+        list: (simulation model, data file path) in glob order
+    """
+    sim_dir = simulation_dir(simulation_type, uid=uid)
+    # parsing is slow so it happens outside the lock
+    _, c = _catalog_read(sim_dir)
+    f = []
+    n = PKDict()
+    for p in pkio.sorted_glob(sim_dir.join("*", SIMULATION_DATA_FILE)):
+        i = p.dirpath().basename
+        f.append((i, p))
+        x = c.sims.get(i)
+        if x is None or not _catalog_is_current(x, p):
+            try:
+                n[i] = _catalog_entry(
+                    p,
+                    open_json_file(
+                        simulation_type, path=p, fixup=True, uid=uid, save=True
+                    ).models.simulation,
+                )
+            except ValueError as e:
+                pkdlog("{}: error: {}", p, e)
+                # not listed or parsed again until the file changes
+                n[i] = _catalog_entry(p, None)
+    res = []
+    with util.THREAD_LOCK:
+        # another thread may have updated the catalog
+        p, c = _catalog_read(sim_dir)
+        m = False
+        s = PKDict()
+        for i, d in f:
+            x = c.sims.get(i)
+            if x is None or not _catalog_is_current(x, d):
+                m = True
+                x = n.get(i)
+                if x is None:
+                    continue
+            s[i] = x
+            if x.simulation is not None:
+                res.append((x.simulation, d))
+        if m or len(s) != len(c.sims):
+            c.sims = s
+            util.json_dump(c, path=p)
+    return res
+
+
+def _catalog_update(path, simulation):
+    """Update catalog entry for data file `path`
+
+    Args:
+        path (py.path): sirepo-data.json, just written or removed
+        simulation (dict): simulation model or None if deleted
+    """
+    with util.THREAD_LOCK:
+        p, c = _catalog_read(path.dirpath().dirpath())
+        i = path.dirpath().basename
+        if simulation is None:
+            if c.sims.pkdel(i) is None:
+                return
+        else:
+            c.sims[i] = _catalog_entry(path, simulation)
+        util.json_dump(c, path=p)
+
+
 def _create_lib_and_examples(user_dir, sim_type):
     # POSIT: simulation_lib_dir
     pkio.mkdir_parent(user_dir.join(sim_type).join(_LIB_DIR))
@@ -890,43 +1047,21 @@ def _init():
 
 
 def _init_schemas():
-    global SCHEMA_COMMON
-    SCHEMA_COMMON = json_load(
-        sirepo.resource.static("json", f"schema-common{sirepo.const.JSON_SUFFIX}")
-    )
-    a = SCHEMA_COMMON.appInfo
-    for t in sirepo.feature_config.cfg().sim_types:
-        s = read_json(sirepo.resource.static("json", f"{t}-schema.json"))
-        _merge_dicts(s.get("appInfo", PKDict()), a)
-        s.update(SCHEMA_COMMON)
-        s.feature_config = feature_config.for_sim_type(t)
-        s.simulationType = t
+    """Read compiled schemas or compile them if any of the sources changed
 
-        # TODO(mvk): improve merging common and local schema
-        _merge_dicts(s.common.dynamicFiles, s.dynamicFiles)
-        s.dynamicModules = _files_in_schema(s.dynamicFiles)
-        for i in [
-            "appDefaults",
-            "appModes",
-            "constants",
-            "cookies",
-            "enum",
-            "notifications",
-            "localRoutes",
-            "model",
-            "strings",
-            "view",
-        ]:
-            if i not in s:
-                s[i] = PKDict()
-            _merge_dicts(s.common[i], s[i])
-        _merge_subclasses(s, "model", extend_arrays=False)
-        _merge_subclasses(s, "view", extend_arrays=True)
-        srschema.validate(s)
-        _SCHEMA_CACHE[t] = s
-    SCHEMA_COMMON.appInfo = a
-    for s in _SCHEMA_CACHE.values():
-        s.appInfo = a
+    Schemas are unpickled by `get_schema` so a process only pays
+    for the sim types it uses.
+    """
+    global SCHEMA_COMMON, _schema_compiled
+
+    _SCHEMA_CACHE.clear()
+    f = _schema_files()
+    k = _schema_key(f)
+    _schema_compiled = _schema_compiled_read(k)
+    if not _schema_compiled:
+        _schema_compiled = _schema_compile(f, k)
+        _schema_compiled_write(_schema_compiled)
+    SCHEMA_COMMON = pickle.loads(_schema_compiled.common)
     # In development, any schema update creates a new version
     if pkconfig.channel_in("dev"):
         SCHEMA_COMMON.version = str(sirepo.srtime.utc_now_as_float())
@@ -1032,6 +1167,138 @@ def _random_id(parent_dir, simulation_type=None):
     raise RuntimeError("{}: failed to create unique directory".format(parent_dir))
 
 
+def _schema_compile(files, key):
+    """Merge and validate schema-common with each app schema
+
+    appInfo of all sim types is merged so it is set by `_schema_load`
+    along with feature_config, which is not in the source files.
+    """
+    c = json_load(files.common)
+    a = c.appInfo
+    r = PKDict()
+    for t, p in files.schemas.items():
+        s = read_json(p)
+        _merge_dicts(s.get("appInfo", PKDict()), a)
+        s.update(c)
+        s.simulationType = t
+
+        # TODO(mvk): improve merging common and local schema
+        _merge_dicts(s.common.dynamicFiles, s.dynamicFiles)
+        s.dynamicModules = _files_in_schema(s.dynamicFiles)
+        for i in [
+            "appDefaults",
+            "appModes",
+            "constants",
+            "cookies",
+            "enum",
+            "notifications",
+            "localRoutes",
+            "model",
+            "strings",
+            "view",
+        ]:
+            if i not in s:
+                s[i] = PKDict()
+            _merge_dicts(s.common[i], s[i])
+        _merge_subclasses(s, "model", extend_arrays=False)
+        _merge_subclasses(s, "view", extend_arrays=True)
+        srschema.validate(s)
+        r[t] = s
+    c.appInfo = a
+    # pickled after all merges, because schemas share (and modify) common values
+    return PKDict(
+        common=pickle.dumps(c, protocol=pickle.HIGHEST_PROTOCOL),
+        key=key,
+        schemas=PKDict(
+            (t, pickle.dumps(s, protocol=pickle.HIGHEST_PROTOCOL)) for t, s in r.items()
+        ),
+    )
+
+
+def _schema_compiled_read(key):
+    p = None
+    try:
+        p = sirepo.srdb.schema_cache_dir().join(key + _SCHEMA_COMPILED_SUFFIX)
+        with open(p, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        pkdlog("ignoring path={} error={}", p, e)
+    return None
+
+
+def _schema_compiled_write(compiled):
+    """Atomically replace compiled schemas and remove stale ones"""
+    try:
+        d = pkio.mkdir_parent(sirepo.srdb.schema_cache_dir())
+        p = d.join(compiled.key + _SCHEMA_COMPILED_SUFFIX)
+        t = d.join(f"{compiled.key}-{os.getpid()}.tmp")
+        try:
+            with open(t, "wb") as f:
+                pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(t, p)
+        finally:
+            pkio.unchecked_remove(t)
+        # only older compilations for the same python and sim types, because
+        # processes with other sim types share the directory
+        for x in d.listdir(
+            compiled.key.split("-")[0] + "-*" + _SCHEMA_COMPILED_SUFFIX,
+        ):
+            if x != p:
+                pkio.unchecked_remove(x)
+    except Exception as e:
+        # e.g. read-only srdb; every process compiles
+        pkdlog("unable to cache compiled schemas error={}", e)
+
+
+def _schema_files():
+    return PKDict(
+        common=sirepo.resource.static(
+            "json", f"schema-common{sirepo.const.JSON_SUFFIX}"
+        ),
+        schemas=PKDict(
+            (t, sirepo.resource.static("json", f"{t}-schema.json"))
+            for t in sirepo.feature_config.cfg().sim_types
+        ),
+    )
+
+
+def _schema_key(files):
+    """Changes when source files, sim types, the compiler or python change
+
+    The prefix identifies python and the sim types, so
+    `_schema_compiled_write` can tell which compilations are stale.
+    """
+    f = hashlib.sha1(sys.version.encode())
+    f.update(" ".join(sorted(files.schemas)).encode())
+    h = hashlib.sha1(sys.version.encode())
+    for t, p in [
+        ("common", files.common),
+        *files.schemas.items(),
+        ("simulation_db", __file__),
+        ("srschema", srschema.__file__),
+    ]:
+        s = os.stat(p)
+        h.update(f"{t} {p} {s.st_mtime_ns} {s.st_size}\n".encode())
+    return f.hexdigest()[:16] + "-" + h.hexdigest()
+
+
+def _schema_load(sim_type):
+    with util.THREAD_LOCK:
+        # another thread may have loaded it
+        s = _SCHEMA_CACHE.get(sim_type)
+        if s:
+            return s
+        s = pickle.loads(_schema_compiled.schemas[sim_type])
+        s.appInfo = SCHEMA_COMMON.appInfo
+        s.feature_config = feature_config.for_sim_type(sim_type)
+        _SCHEMA_CACHE[sim_type] = s
+        # no longer needed once cached
+        _schema_compiled.schemas.pkdel(sim_type)
+    return s
+
+
 def _search_data(data, search):
     for field, expect in search.items():
         path = field.split(".")
@@ -1071,6 +1338,18 @@ def _serial_new():
     return res
 
 
+def _simulation_list_row(res, path, sim):
+    res.append(
+        PKDict(
+            simulationId=_sim_from_path(path)[0],
+            name=sim["name"],
+            folder=sim["folder"],
+            isExample=sim["isExample"] if "isExample" in sim else False,
+            simulation=sim,
+        )
+    )
+
+
 def _sim_from_path(path):
     prev = None
     p = path
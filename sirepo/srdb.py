@@ -24,10 +24,19 @@ _cfg = None
 #: subdir of where proprietary codes live
 _PROPRIETARY_CODE_DIR = "proprietary_code"
 
+#: where simulation_db caches compiled schemas under srdb.root
+_SCHEMA_CACHE_SUBDIR = "schema-cache"
+
 
 #: where job db is stored under srdb.root
 _SUPERVISOR_DB_SUBDIR = "supervisor-job"
 
+#: where supervisor caches simulation frames under srdb.root
+_SUPERVISOR_FRAME_CACHE_SUBDIR = "supervisor-frame-cache"
+
+#: where supervisor caches sequential results under srdb.root
+_SUPERVISOR_RESULT_CACHE_SUBDIR = "supervisor-result-cache"
+
 
 def proprietary_code_dir(sim_type):
     """Directory for proprietary code binaries
@@ -42,12 +51,30 @@ def root():
     return _root or _init_root()
 
 
+def schema_cache_dir():
+    """Directory for compiled schemas"""
+
+    return root().join(_SCHEMA_CACHE_SUBDIR)
+
+
 def supervisor_dir():
     """Directory for supervisor job db"""
 
     return root().join(_SUPERVISOR_DB_SUBDIR)
 
 
+def supervisor_frame_cache_dir():
+    """Directory for supervisor simulation frame cache"""
+
+    return root().join(_SUPERVISOR_FRAME_CACHE_SUBDIR)
+
+
+def supervisor_result_cache_dir():
+    """Directory for supervisor sequential result cache"""
+
+    return root().join(_SUPERVISOR_RESULT_CACHE_SUBDIR)
+
+
 def _init_root():
     global _cfg, _root
 
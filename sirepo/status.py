@@ -12,6 +12,7 @@ from sirepo import simulation_db
 import datetime
 import random
 import re
+import sirepo.job_api
 import sirepo.quest
 import time
 
@@ -41,6 +42,10 @@ class API(sirepo.quest.API):
         return self.reply_ok(
             {
                 "datetime": datetime.datetime.utcnow().isoformat(),
+                "jobApiLatency": sirepo.job_api.latency_histograms(),
+                "supervisorCaches": simulation_db.json_load(
+                    self.call_api("jobSupervisorPing").data,
+                ).get("caches"),
             }
         )
 
@@ -10,6 +10,7 @@ from pykern.pkdebug import pkdc, pkdlog, pkdp
 from sirepo.template import lattice
 from sirepo.template import template_common
 import ast
+import functools
 import inspect
 import math
 import operator
@@ -36,6 +37,12 @@ class CodeVar:
         self.variables = self.__variables_by_name(variables)
         self.postfix_variables = self.__variables_to_postfix(self.variables)
         self.evaluator = evaluator
+        # variable name to the variables its postfix expr references directly
+        self._depends = PKDict(
+            (k, self.__expr_variables(v)) for k, v in self.postfix_variables.items()
+        )
+        # variable name to (value, err), filled on demand by __var_value
+        self._values = PKDict()
 
     def canonicalize(self, expr):
         if self.case_insensitive:
@@ -56,11 +63,13 @@ class CodeVar:
         if not self.is_var_value(expr):
             return expr, None
         expr = self.infix_to_postfix(self.canonicalize(expr))
-        return self.evaluator.eval_var(
-            expr,
-            self.get_expr_dependencies(expr),
-            self.postfix_variables,
-        )
+        v = PKDict()
+        for d in self.__expr_variables(expr):
+            x, err = self.__var_value(d)
+            if err:
+                return None, err
+            v[d] = x
+        return self.evaluator.eval_var(expr, [], v)
 
     def eval_var_with_assert(self, expr):
         (v, err) = self.eval_var(expr)
@@ -238,6 +247,43 @@ class CodeVar:
         )
         return " ".join(_do(tree))
 
+    def __eval_node(self, name):
+        v = PKDict()
+        for d in self._depends[name]:
+            # a dependency without a value is still being evaluated
+            x, err = self._values.get(d, (None, f"circular dependency: {d}"))
+            if err:
+                return None, err
+            v[d] = x
+        return self.evaluator.eval_postfix(self.postfix_variables[name], v)
+
+    def __expr_variables(self, expr):
+        res = []
+        for v in str(expr).split(" "):
+            if v in self.postfix_variables and v not in res:
+                res.append(v)
+        return res
+
+    def __var_value(self, name):
+        """Evaluate name after the variables it depends on, each once"""
+        if name in self._values:
+            return self._values[name]
+        # iterative so long chains of variables do not hit the recursion limit
+        s = [(name, iter(self._depends[name]))]
+        p = set([name])
+        while s:
+            n, i = s[-1]
+            for d in i:
+                if d not in self._values and d not in p:
+                    s.append((d, iter(self._depends[d])))
+                    p.add(d)
+                    break
+            else:
+                s.pop()
+                p.remove(n)
+                self._values[n] = self.__eval_node(n)
+        return self._values[name]
+
     def __variables_by_name(self, variables):
         res = PKDict()
         for v in variables:
@@ -359,6 +405,17 @@ class PurePythonEval:
             variables[d] = v
         return self.__eval_python_stack(expr, variables)
 
+    def eval_postfix(self, expr, variables):
+        """Evaluate expr with variables already evaluated
+
+        Args:
+            expr (str): postfix expr
+            variables (dict): variable name to value
+        Returns:
+            tuple: (value, err)
+        """
+        return PurePythonEval.__eval_python_stack(self, expr, variables)
+
     @classmethod
     def postfix_to_infix(cls, expr):
         if not CodeVar.is_var_value(expr):
@@ -422,5 +479,6 @@ class PurePythonEval:
         return stack[-1], None
 
 
+@functools.lru_cache(maxsize=1024)
 def _get_arg_count(fn):
     return len(inspect.signature(fn).parameters)
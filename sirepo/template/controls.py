@@ -5,6 +5,7 @@
 :license: http://www.apache.org/licenses/LICENSE-2.0.html
 """
 from __future__ import absolute_import, division, print_function
+from pykern import pkcompat
 from pykern import pkio
 from pykern import pkjson
 from pykern.pkcollections import PKDict
@@ -24,6 +25,9 @@ import socket
 
 _SIM_DATA, SIM_TYPE, SCHEMA = sirepo.sim_data.template_globals()
 _SUMMARY_CSV_FILE = "summary.csv"
+#: end offsets of the lines in summary.csv, the first is the header's
+_SUMMARY_INDEX_FILE = "summary.index"
+_SUMMARY_INDEX_BYTES = 8
 _PTC_TRACK_COLUMNS_FILE = "ptc_track_columns.txt"
 _PTC_TRACK_FILE = "track.tfs"
 
@@ -154,31 +158,13 @@ def read_summary_line(run_dir, line_count=None):
     path = run_dir.join(_SUMMARY_CSV_FILE)
     if not path.exists():
         return None, None
-    header = None
-    rows = []
-    with open(str(path)) as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if header == None:
-                header = row
-                if not line_count:
-                    break
-            else:
-                rows.append(row)
-                if len(rows) > line_count:
-                    rows.pop(0)
-    res = None
-    if line_count:
-        res = []
-        for row in rows:
-            if len(header) == len(row):
-                res.append(PKDict(zip(header, row)))
-    else:
-        line = template_common.read_last_csv_line(path)
-        if header and line:
-            line = line.split(",")
-            if len(header) == len(line):
-                res = [PKDict(zip(header, line))]
+    header, rows = _read_summary_rows(run_dir, line_count or 1)
+    res = []
+    for row in rows:
+        if len(header) == len(row):
+            res.append(PKDict(zip(header, row)))
+    if not line_count and not res:
+        res = None
     return res, int(path.mtime() * 1000)
 
 
@@ -346,13 +332,14 @@ def _extract_report_elementAnimation(frame_args, run_dir, filename):
         frame_args.horizontalSize = frame_args.particlePlotSize
         frame_args.horizontalOffset = 0
     i, x = _get_target_info(a, frame_args)
-    t = madx_parser.parse_tfs_file(run_dir.join(filename), want_page=x)
+    t = madx_parser.read_tfs_columns(
+        run_dir.join(filename),
+        columns=(frame_args.x, frame_args.y1),
+        want_page=x,
+    )
     data.models[frame_args.frameReport] = frame_args
     return template_common.heatmap(
-        [
-            sirepo.template.madx.to_floats(t[frame_args.x]),
-            sirepo.template.madx.to_floats(t[frame_args.y1]),
-        ],
+        [t[frame_args.x], t[frame_args.y1]],
         frame_args,
         PKDict(
             x_label=sirepo.template.madx.field_label(frame_args.x),
@@ -376,6 +363,8 @@ def _generate_parameters_file(data):
         _validate_process_variables(v, data)
     v.optimizerTargets = data.models.optimizerSettings.targets
     v.summaryCSV = _SUMMARY_CSV_FILE
+    v.summaryIndex = _SUMMARY_INDEX_FILE
+    v.summaryIndexBytes = _SUMMARY_INDEX_BYTES
     v.ptcTrackColumns = _PTC_TRACK_COLUMNS_FILE
     v.ptcTrackFile = _PTC_TRACK_FILE
     if data.get("report") == "initialMonitorPositionsReport":
@@ -577,6 +566,46 @@ def _log_file_values(models, index, lib_file):
         return res
 
 
+def _read_summary_rows(run_dir, count):
+    """Header and last rows of summary.csv
+
+    The rows are located with summary.index, so the cost does not grow
+    with the number of optimizer steps. Rows are only visible once
+    indexed, which means a row being written is never returned.
+
+    Args:
+        run_dir (py.path): directory with summary.csv
+        count (int): maximum number of rows
+    Returns:
+        tuple: header and rows (lists of str)
+    """
+    p = run_dir.join(_SUMMARY_INDEX_FILE)
+    if not p.exists():
+        # run from before the index
+        with open(run_dir.join(_SUMMARY_CSV_FILE)) as f:
+            r = list(csv.reader(f))
+        return (r[0], r[1:][-count:]) if r else ([], [])
+
+    def _offset(f, index):
+        f.seek(index * _SUMMARY_INDEX_BYTES)
+        return int.from_bytes(f.read(_SUMMARY_INDEX_BYTES), "little")
+
+    with open(p, "rb") as f:
+        # ignores a partially written offset
+        n = os.fstat(f.fileno()).st_size // _SUMMARY_INDEX_BYTES
+        if n == 0:
+            return [], []
+        h = _offset(f, 0)
+        s = _offset(f, max(n - 1 - count, 0))
+        e = _offset(f, n - 1)
+    with open(run_dir.join(_SUMMARY_CSV_FILE), "rb") as f:
+        b = f.read(h)
+        f.seek(s)
+        b += f.read(e - s)
+    r = list(csv.reader(pkcompat.from_bytes(b).splitlines()))
+    return r[0], r[1:]
+
+
 def _validate_process_variables(v, data):
     settings = data.models.controlSettings
     if not settings.deviceServerURL:
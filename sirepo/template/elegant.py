@@ -1163,29 +1163,26 @@ def _extract_report_data(xFilename, frame_args, page_count=0):
     x = x_col["values"]
     if not _is_histogram_file(xFilename, x_col["column_names"]):
         # parameter plot
-        plots = []
-        filename = PKDict(
-            y1=xFilename,
-            # TODO(pjm): y2Filename, y3Filename are not currently used. Would require rescaling x value across files.
-            y2=xFilename,
-            y3=xFilename,
-        )
+        # TODO(pjm): y2Filename, y3Filename are not currently used. Would require rescaling x value across files.
+        yfields = []
         for f in ("y1", "y2", "y3"):
             if (
                 re.search(r"^none$", frame_args[f], re.IGNORECASE)
                 or frame_args[f] == " "
             ):
                 continue
-            yfield = frame_args[f]
-            y_col = sdds_util.extract_sdds_column(filename[f], yfield, page_index)
-            if y_col["err"]:
-                return y_col["err"]
-            y = y_col["values"]
+            yfields.append(frame_args[f])
+        # all y columns come from the same page, read them in one pass
+        y_cols = sdds_util.extract_sdds_columns(xFilename, yfields, page_index)
+        if y_cols.err:
+            return y_cols.err
+        plots = []
+        for yfield in yfields:
             plots.append(
                 PKDict(
                     field=yfield,
-                    points=y,
-                    label=_label(yfield, y_col["column_def"][1]),
+                    points=y_cols.columns[yfield].tolist(),
+                    label=_label(yfield, y_cols.column_defs[yfield][1]),
                 )
             )
         title = ""
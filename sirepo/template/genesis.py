@@ -10,6 +10,7 @@ from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdp, pkdc, pkdlog
 from sirepo.template import template_common
 import numpy as np
+import os
 import re
 import sirepo.job
 import sirepo.sim_data
@@ -124,8 +125,12 @@ def python_source_for_model(data, model):
 
 
 def sim_frame_fieldDistributionAnimation(frame_args):
-    r = _get_field_distribution(frame_args.sim_in)
-    d = np.abs(r[int(frame_args.frameIndex), 0, :, :])
+    r = _get_field_distribution(
+        frame_args.run_dir,
+        frame_args.sim_in,
+        int(frame_args.frameIndex),
+    )
+    d = np.abs(r[0, :, :])
     s = d.shape[0]
     return PKDict(
         title=_z_title_at_frame(frame_args, frame_args.sim_in.models.io.ipradi),
@@ -173,20 +178,17 @@ def sim_frame_particleAnimation(frame_args):
             f"No column={SCHEMA.enum.ParticleColumn} with key={col_key}",
         )
 
-    n = frame_args.sim_in.models.electronBeam.npart
-    d = np.fromfile(_PARTICLE_OUTPUT_FILENAME, dtype=np.float64)
-    b = d.reshape(
-        int(len(d) / len(SCHEMA.enum.ParticleColumn) / n),
-        len(SCHEMA.enum.ParticleColumn),
-        n,
-    )
+    b = _read_records(
+        frame_args.run_dir.join(_PARTICLE_OUTPUT_FILENAME),
+        (
+            len(SCHEMA.enum.ParticleColumn),
+            frame_args.sim_in.models.electronBeam.npart,
+        ),
+    )[int(frame_args.frameIndex)]
     x = _get_col(frame_args.x)
     y = _get_col(frame_args.y)
     return template_common.heatmap(
-        [
-            b[int(frame_args.frameIndex), x[0], :].tolist(),
-            b[int(frame_args.frameIndex), y[0], :].tolist(),
-        ],
+        [b[x[0]].tolist(), b[y[0]].tolist()],
         frame_args.sim_in.models.particleAnimation.pkupdate(frame_args),
         PKDict(
             title=_z_title_at_frame(frame_args, frame_args.sim_in.models.io.ippart),
@@ -245,38 +247,50 @@ def _genesis_success_exit(run_dir):
     return run_dir.join(_OUTPUT_FILENAME).exists()
 
 
-def _get_field_distribution(data):
+def _get_field_distribution(run_dir, data, frame):
     n = 1  # TODO(e-carlin): Will be different for time dependent
     p = data.models.mesh.ncar
-    d = np.fromfile(_FIELD_DISTRIBUTION_OUTPUT_FILENAME, dtype=np.float64)
-    # Divide by 2 to combine real and imaginary parts which are written separately
-    s = int(d.shape[0] / (n * p * p) / 2)
-    d = d.reshape(s, n, 2, p, p)
+    # real and imaginary parts are written separately
+    d = _read_records(
+        run_dir.join(_FIELD_DISTRIBUTION_OUTPUT_FILENAME),
+        (n, 2, p, p),
+    )[frame]
     # recombine as a complex number
-    return d[:, :, 0, :, :] + 1.0j * d[:, :, 1, :, :]
+    return d[:, 0, :, :] + 1.0j * d[:, 1, :, :]
 
 
 def _get_lattice_and_slice_data(run_dir):
     def _reshape_and_persist(data, cols, filename):
         d = data.reshape(int(data.size / len(cols)), len(cols))
-        np.save(filename, d)
+        t = run_dir.join(f"{filename}-{sirepo.job.unique_key()}")
+        try:
+            with open(t, "wb") as f:
+                np.save(f, d)
+            os.replace(t, run_dir.join(filename))
+        finally:
+            pkio.unchecked_remove(t)
         return d
 
     f = run_dir.join(_LATTICE_DATA_FILENAME)
     if f.exists():
-        return np.load(str(f)), np.load(str(run_dir.join(_SLICE_DATA_FILENAME)))
-    o = pkio.read_text(_OUTPUT_FILENAME)
+        return (
+            np.load(str(f), mmap_mode="r"),
+            np.load(str(run_dir.join(_SLICE_DATA_FILENAME)), mmap_mode="r"),
+        )
+    o = pkio.read_text(run_dir.join(_OUTPUT_FILENAME))
+    # POSIT: lattice is written last, because its existence validates the cache
+    s = _reshape_and_persist(
+        np.fromstring(_SLICE_RE.search(o)[1], sep="\t"),
+        _SLICE_COLS,
+        _SLICE_DATA_FILENAME,
+    )
     return (
         _reshape_and_persist(
             np.fromstring(_LATTICE_RE.search(o)[1], sep="\t"),
             _LATTICE_COLS,
             _LATTICE_DATA_FILENAME,
         ),
-        _reshape_and_persist(
-            np.fromstring(_SLICE_RE.search(o)[1], sep="\t"),
-            _SLICE_COLS,
-            _SLICE_DATA_FILENAME,
-        ),
+        s,
     )
 
 
@@ -290,7 +304,7 @@ def _get_frame_counts(run_dir):
             m = re.match("^\s*(\d+) (\w+): records in z", line)
             if m:
                 res[m.group(2)] = int(m.group(1))
-                if m.group(1) == "field":
+                if m.group(2) == "field":
                     break
     return res
 
@@ -352,6 +366,21 @@ def _parse_namelist(data, text):
     return data
 
 
+def _read_records(path, shape):
+    """Memory map the complete float64 records of shape in path
+
+    Indexing a record only reads its bytes.
+
+    Returns:
+        ndarray: (record, *shape)
+    """
+    n = int(np.prod(shape)) * np.dtype(np.float64).itemsize
+    c = os.path.getsize(path) // n
+    if not c:
+        return np.zeros((0,) + tuple(shape))
+    return np.memmap(str(path), dtype=np.float64, mode="r", shape=(c,) + tuple(shape))
+
+
 def _z_title_at_frame(frame_args, nth):
     _, s = _get_lattice_and_slice_data(frame_args.run_dir)
     step = frame_args.frameIndex * nth
@@ -18,7 +18,6 @@ import numpy as np
 import os.path
 import py.path
 import re
-import sdds
 import sirepo.sim_data
 
 _SIM_DATA, SIM_TYPE, SCHEMA = sirepo.sim_data.template_globals()
@@ -352,16 +351,12 @@ def _compute_range_across_files(run_dir, data):
         res[_map_field_name(v[0])] = []
     for v in SCHEMA.enum.CoolingRatesColumn:
         res[_map_field_name(v[0])] = []
-    sdds_util.process_sdds_page(
-        str(run_dir.join(_BEAM_EVOLUTION_OUTPUT_FILENAME)), 0, _compute_sdds_range, res
-    )
+    _compute_sdds_range(res, run_dir.join(_BEAM_EVOLUTION_OUTPUT_FILENAME))
     if run_dir.join(_FORCE_TABLE_FILENAME).exists():
         res2 = PKDict()
         for v in SCHEMA.enum.ForceTableColumn:
             res2[_map_field_name(v[0])] = []
-            sdds_util.process_sdds_page(
-                str(run_dir.join(_FORCE_TABLE_FILENAME)), 0, _compute_sdds_range, res2
-            )
+        _compute_sdds_range(res2, run_dir.join(_FORCE_TABLE_FILENAME))
         res.update(res2)
     # TODO(pjm): particleAnimation dp/p collides with beamEvolutionAnimation dp/p
     ion_files = _ion_files(run_dir)
@@ -370,7 +365,7 @@ def _compute_range_across_files(run_dir, data):
         for v in SCHEMA.enum.ParticleColumn:
             res2[_map_field_name(v[0])] = []
         for filename in ion_files:
-            sdds_util.process_sdds_page(filename, 0, _compute_sdds_range, res2)
+            _compute_sdds_range(res2, filename)
         res.update(res2)
     # reverse field mapping back to enum values
     for k in _FIELD_MAP:
@@ -381,15 +376,20 @@ def _compute_range_across_files(run_dir, data):
     return res
 
 
-def _compute_sdds_range(res, sdds_index=0):
-    column_names = sdds.sddsdata.GetColumnNames(sdds_index)
+def _compute_sdds_range(res, filename):
+    c = sdds_util.extract_sdds_columns(filename, list(res.keys()), 0)
+    if c.err:
+        return
     for field in res:
-        values = sdds.sddsdata.GetColumn(sdds_index, column_names.index(field))
+        values = c.columns[field]
         if res[field]:
-            res[field][0] = _safe_sdds_value(min(min(values), res[field][0]))
-            res[field][1] = _safe_sdds_value(max(max(values), res[field][1]))
+            res[field][0] = _safe_sdds_value(min(float(values.min()), res[field][0]))
+            res[field][1] = _safe_sdds_value(max(float(values.max()), res[field][1]))
         else:
-            res[field] = [_safe_sdds_value(min(values)), _safe_sdds_value(max(values))]
+            res[field] = [
+                _safe_sdds_value(float(values.min())),
+                _safe_sdds_value(float(values.max())),
+            ]
 
 
 def _field_description(field, data):
@@ -258,9 +258,9 @@ def extract_parameter_report(
         assert (
             run_dir and filename
         ), f"must supply either results or run_dir={run_dir} and filename={filename}"
-    t = results or madx_parser.parse_tfs_file(run_dir.join(filename))
-    plots = []
     m = data.models[data.report]
+    t = results or madx_parser.read_tfs_columns(run_dir.join(filename))
+    plots = []
     for f in ("y1", "y2", "y3"):
         if m[f] == "None":
             continue
@@ -284,14 +284,14 @@ def extract_parameter_report(
     )
     if filename == _TWISS_OUTPUT_FILE and not results:
         res.initialTwissParameters = PKDict(
-            betx=t.betx[0],
-            bety=t.bety[0],
-            alfx=t.alfx[0],
-            alfy=t.alfy[0],
-            x=t.x[0],
-            y=t.y[0],
-            px=t.px[0],
-            py=t.py[0],
+            betx=float(t.betx[0]),
+            bety=float(t.bety[0]),
+            alfx=float(t.alfx[0]),
+            alfy=float(t.alfy[0]),
+            x=float(t.x[0]),
+            y=float(t.y[0]),
+            px=float(t.px[0]),
+            py=float(t.py[0]),
         )
     return res
 
@@ -697,11 +697,15 @@ def _extract_report_elementAnimation(data, run_dir, filename):
     if is_parameter_report_file(filename):
         return extract_parameter_report(data, run_dir, filename)
     m = data.models[data.report]
-    t = madx_parser.parse_tfs_file(run_dir.join(filename), want_page=m.frameIndex)
+    t = madx_parser.read_tfs_columns(
+        run_dir.join(filename),
+        columns=(m.x, m.y1),
+        want_page=m.frameIndex,
+    )
     info = madx_parser.parse_tfs_page_info(run_dir.join(filename))[m.frameIndex]
 
     return template_common.heatmap(
-        [to_floats(t[m.x]), to_floats(t[m.y1])],
+        [t[m.x], t[m.y1]],
         m,
         PKDict(
             x_label=field_label(m.x),
@@ -795,17 +799,15 @@ def field_label(field):
 def file_info(filename, run_dir, file_id):
     path = str(run_dir.join(filename))
     plottable = []
-    tfs = madx_parser.parse_tfs_file(path)
+    tfs = madx_parser.read_tfs_columns(path)
     for f in tfs:
-        if f in _ALPHA_COLUMNS:
+        if f in _ALPHA_COLUMNS or tfs[f].dtype.kind != "f":
             continue
-        v = to_floats(tfs[f])
-        if np.any(v):
+        if np.any(tfs[f]):
             plottable.append(f)
     count = 1
     if "turn" in tfs:
-        info = madx_parser.parse_tfs_page_info(path)
-        count = len(info)
+        count = len(madx_parser.tfs_index(path).pages)
     return PKDict(
         modelKey="elementAnimation{}".format(file_id),
         filename=filename,
@@ -6,12 +6,31 @@
 """
 from __future__ import absolute_import, division, print_function
 from pykern import pkio
+from pykern import pkjson
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdlog, pkdp
 from sirepo.template import lattice
+import numpy as np
+import os
 import re
 import sirepo.sim_data
 
+#: data rows start with blanks
+_TFS_DATA_RE = re.compile(rb"^\s+\S")
+
+#: segment index of a TFS file next to it (see `tfs_index`)
+_TFS_INDEX_SUFFIX = ".index.json"
+
+_TFS_INDEX_CACHE_MAX = 32
+
+#: smaller files are indexed faster than the index is read
+_TFS_INDEX_SIDECAR_MIN_BYTES = 1024 * 1024
+
+_TFS_SEGMENT_RE = re.compile(rb"^#.*$", re.MULTILINE)
+
+#: per process, keyed by path (see `tfs_index`)
+_tfs_index_cache = PKDict()
+
 
 class MadXParser(lattice.LatticeParser):
     def __init__(self):
@@ -192,65 +211,177 @@ def parse_file(lattice_text, downcase_variables=False):
 
 
 def parse_tfs_page_info(tfs_file):
-    # returns an array of page info: name, turn, s
-    col_names = parse_tfs_file(tfs_file, header_only=True)
-    turn_idx = col_names.index("turn")
-    s_idx = col_names.index("s")
-    res = []
-    mode = "segment"
-    with pkio.open_text(tfs_file) as f:
-        for line in f:
-            if mode == "segment" and re.search(r"^\#segment\s", line):
-                name = re.split(r"\s+", line.strip())[-1]
-                res.append(
-                    PKDict(
-                        name=name,
-                    )
-                )
-                mode = "data"
-            elif mode == "data" and re.search(r"^\s+\S", line):
-                data = re.split(r"\s+", line.strip())
-                res[-1].update(
-                    PKDict(
-                        turn=data[turn_idx],
-                        s=data[s_idx],
-                    )
-                )
-                mode = "segment"
-    return res
+    """Name, turn and s of each segment (page) of a TFS file
+
+    Uses the file's segment index (see `tfs_index`) so the data is not
+    scanned again.
+
+    Returns:
+        list: PKDict(name, turn, s) values are strings
+    """
+    return [
+        PKDict(name=p.name, turn=p.get("turn"), s=p.get("s"))
+        for p in tfs_index(tfs_file).pages
+    ]
 
 
 def parse_tfs_file(tfs_file, header_only=False, want_page=-1):
-    mode = "header"
-    col_names = []
-    rows = []
-    current_page = -1
-    with pkio.open_text(tfs_file) as f:
-        for line in f:
-            if mode == "header":
-                # header row starts with *
-                if re.search(r"^\*\s", line):
-                    col_names = re.split(r"\s+", line.strip())
-                    col_names = col_names[1:]
-                    mode = "data"
-                    if header_only:
-                        return [x.lower() for x in col_names]
-            elif mode == "data":
-                # data rows after header, start with blank
-                if re.search(r"^\s+\S", line) and want_page == current_page:
-                    data = re.split(r"\s+", line.strip())
-                    rows.append(data)
-                elif want_page >= 0 and re.search(r"^\#segment\s", line):
-                    current_page += 1
-    res = PKDict(map(lambda x: (x.lower(), []), col_names))
-    for i in range(len(col_names)):
-        name = col_names[i].lower()
-        if name:
-            for row in rows:
-                res[name].append(row[i])
+    """Read columns of a TFS file as lists of strings
+
+    See `read_tfs_columns` for numeric columns as arrays.
+
+    Args:
+        tfs_file (py.path): TFS file
+        header_only (bool): only return the lower case column names [False]
+        want_page (int): segment to read or all rows if < 0 [-1]
+    Returns:
+        object: PKDict of column lists or list of column names
+    """
+    i = tfs_index(tfs_file)
+    if header_only:
+        return list(i.columns)
+    r = _tfs_rows(tfs_file, i, want_page)
+    return PKDict(
+        (n, [x.decode() for x in r[:, c]] if len(r) else [])
+        for c, n in enumerate(i.columns)
+        if n
+    )
+
+
+def read_tfs_columns(tfs_file, columns=None, want_page=-1):
+    """Read selected columns of a TFS file into numpy arrays
+
+    Only the bytes of want_page are read. Numeric columns are float
+    arrays, string columns (``%s``) are arrays of str with the quotes
+    as in the file.
+
+    Args:
+        tfs_file (py.path): TFS file
+        columns (iterable): lower case column names [all]
+        want_page (int): segment to read or all rows if < 0 [-1]
+    Returns:
+        PKDict: column name to array
+    """
+    i = tfs_index(tfs_file)
+    r = _tfs_rows(tfs_file, i, want_page)
+    res = PKDict()
+    for n in i.columns if columns is None else columns:
+        if not n or n not in i.columns:
+            continue
+        c = i.columns.index(n)
+        v = r[:, c] if len(r) else np.array([], dtype=bytes)
+        res[n] = v.astype(float) if i.numeric[c] else v.astype(str)
+    return res
+
+
+def tfs_index(tfs_file):
+    """Column names and byte offsets of the pages of a TFS file
+
+    The index is built with one pass over the file and cached in
+    memory and, for large files, next to the file (`_TFS_INDEX_SUFFIX`).
+    Both are valid as long as the file's mtime and size are unchanged.
+
+    Returns:
+        PKDict: columns, numeric, start, end, pages (name, start, end, turn, s)
+    """
+    p = pkio.py_path(tfs_file)
+    s = os.stat(p)
+    k = f"{p}:{s.st_mtime_ns}:{s.st_size}"
+    res = _tfs_index_cache.get(str(p))
+    if res and res.key == k:
+        return res
+    if s.st_size < _TFS_INDEX_SIDECAR_MIN_BYTES:
+        res = _tfs_index_build(p, k)
+    else:
+        res = _tfs_index_read(p, k)
+    if len(_tfs_index_cache) >= _TFS_INDEX_CACHE_MAX:
+        _tfs_index_cache.clear()
+    _tfs_index_cache[str(p)] = res
     return res
 
 
+def _tfs_index_build(path, key):
+    res = PKDict(
+        columns=[],
+        end=0,
+        key=key,
+        numeric=[],
+        pages=[],
+        start=0,
+    )
+    t = None
+    o = 0
+    with open(path, "rb") as f:
+        for l in f:
+            n = o
+            o += len(l)
+            if l.startswith(b"*"):
+                res.columns = [x.lower() for x in l.decode().split()[1:]]
+                res.start = o
+            elif l.startswith(b"$"):
+                res.numeric = [not x.endswith("s") for x in l.decode().split()[1:]]
+                res.start = o
+            elif l.startswith(b"#segment"):
+                if res.pages:
+                    res.pages[-1].end = n
+                res.pages.append(PKDict(name=l.decode().split()[-1], start=o))
+                t = res.pages[-1]
+            elif t and _TFS_DATA_RE.search(l):
+                # first row has the turn and s of the page
+                d = l.split()
+                for c in "turn", "s":
+                    if c in res.columns:
+                        t[c] = d[res.columns.index(c)].decode()
+                t = None
+    if res.pages:
+        res.pages[-1].end = o
+    res.end = o
+    if not res.numeric:
+        res.numeric = [True] * len(res.columns)
+    return res
+
+
+def _tfs_index_read(path, key):
+    x = path.new(basename=path.basename + _TFS_INDEX_SUFFIX)
+    try:
+        res = pkjson.load_any(pkio.read_text(x))
+        if res.key == key:
+            return res
+    except Exception:
+        # missing or being written
+        pass
+    res = _tfs_index_build(path, key)
+    t = path.new(basename=f"{x.basename}-{os.getpid()}")
+    try:
+        pkio.write_text(t, pkjson.dump_pretty(res, pretty=False))
+        os.replace(t, x)
+    except Exception as e:
+        pkdlog("unable to write index={} error={}", x, e)
+    finally:
+        pkio.unchecked_remove(t)
+    return res
+
+
+def _tfs_rows(tfs_file, index, want_page):
+    if want_page < 0:
+        s, e = index.start, index.end
+    elif want_page < len(index.pages):
+        s, e = index.pages[want_page].start, index.pages[want_page].end
+    else:
+        s = e = 0
+    with open(tfs_file, "rb") as f:
+        f.seek(s)
+        b = f.read(e - s)
+    if want_page < 0 and index.pages:
+        b = _TFS_SEGMENT_RE.sub(b"", b)
+    r = b.split()
+    n = len(index.columns)
+    assert (
+        n and len(r) % n == 0
+    ), f"rows do not match columns={index.columns} tfs_file={tfs_file}"
+    return np.array(r, dtype=bytes).reshape(-1, n)
+
+
 _TWISS_VARS = PKDict(
     sr_twiss_beta_x="betx",
     sr_twiss_beta_y="bety",
@@ -910,23 +910,7 @@ def _bunch_plot(report, run_dir, idx, filename=_OPAL_H5_FILE):
 
 
 def _compute_range_across_frames(run_dir, data):
-    def _walk_file(h5file, key, step, res):
-        if key:
-            for field in res:
-                v = np.array(h5file["/{}/{}".format(key, field)])
-                min1, max1 = v.min(), v.max()
-                if res[field]:
-                    if res[field][0] > min1:
-                        res[field][0] = min1
-                    if res[field][1] < max1:
-                        res[field][1] = max1
-                else:
-                    res[field] = [min1, max1]
-
-    res = PKDict()
-    for v in SCHEMA.enum.PhaseSpaceCoordinate:
-        res[v[0]] = None
-    return _iterate_hdf5_steps(run_dir.join(_OPAL_H5_FILE), _walk_file, res)
+    return template_common.merge_step_ranges(_read_step_ranges(run_dir).steps)
 
 
 def _column_data(col, col_names, rows):
@@ -1163,17 +1147,34 @@ def _read_data_file(path):
 
 
 def _read_frame_count(run_dir):
-    def _walk_file(h5file, key, step, res):
-        if key:
-            res[0] = step + 1
-
     try:
-        return _iterate_hdf5_steps(run_dir.join(_OPAL_H5_FILE), _walk_file, [0])[0]
+        return len(_read_step_ranges(run_dir).steps)
     except IOError:
         pass
     return 0
 
 
+def _read_step_ranges(run_dir):
+    def _extend(path, index):
+        # the last step may have been written partially
+        index.steps = _iterate_hdf5_steps(path, _walk_file, index.steps[:-1])
+
+    def _walk_file(h5file, key, step, res):
+        if not key or step != len(res):
+            return
+        r = PKDict()
+        for v in SCHEMA.enum.PhaseSpaceCoordinate:
+            k = "/{}/{}".format(key, v[0])
+            if k not in h5file:
+                return
+            x = np.array(h5file[k])
+            if x.size:
+                r[v[0]] = [float(x.min()), float(x.max())]
+        res.append(r)
+
+    return template_common.read_step_ranges(run_dir.join(_OPAL_H5_FILE), _extend)
+
+
 def _units_from_hdf5(h5file, field):
     return _field_units(
         pkcompat.from_bytes(h5file.attrs["{}Unit".format(field.name)]), field
@@ -9,7 +9,7 @@ from __future__ import absolute_import, division, print_function
 from pykern.pkcollections import PKDict
 from pykern import pkio
 from pykern import pkjinja
-from pykern.pkdebug import pkdc, pkdp
+from pykern.pkdebug import pkdc, pkdlog, pkdp
 from scipy.ndimage.interpolation import zoom
 from sirepo import simulation_db
 from sirepo.template import template_common
@@ -24,7 +24,6 @@ import py.path
 import re
 import sirepo.sim_data
 import sirepo.util
-import struct
 import time
 import werkzeug
 import zipfile
@@ -55,9 +54,9 @@ _DICOM_MIN_VALUE = -1000
 _DOSE_DICOM_FILE = RTDOSE_EXPORT_FILENAME
 _DOSE_FILE = "dose3d.dat"
 _EXPECTED_ORIENTATION = np.array([1, 0, 0, 0, 1, 0])
-# using np.float32 for pixel storage
-_FLOAT_SIZE = 4
 _PIXEL_FILE = "pixels3d.dat"
+# axis of the plane's slices in the pixel volume (z, y, x)
+_PLANE_AXIS = PKDict(t=0, c=1, s=2)
 _RADIASOFT_ID = "RadiaSoft"
 _ROI_FILE_NAME = "rs4pi-roi-data.json"
 _TMP_INPUT_FILE_FIELD = "tmpDicomFilePath"
@@ -91,6 +90,50 @@ def copy_related_files(data, source_path, target_path):
         py.path.local(f).copy(dicom_dir)
 
 
+def fixup_pixel_planes(data):
+    """Correct c and s frame counts of series imported before pixelShape
+
+    Those stored the number of columns as the c frame count and rows
+    as the s frame count, and wrote c and s frame info for that
+    geometry. This only differs from (t, c, s) for non-square series.
+
+    Args:
+        data (dict): simulation, modified in place
+    """
+    series = data["models"]["dicomSeries"]
+    simulation = data["models"]["simulation"]
+    try:
+        frame0 = simulation_db.read_json(_dicom_path(simulation, "t", 0))
+    except Exception as e:
+        # not imported into this sim dir (yet), left for next fixup
+        pkdlog("sid={} no t frame info error={}", simulation["simulationId"], e)
+        return
+    rows, cols = series["pixelShape"] = list(frame0["shape"])
+    planes = series["planes"]
+    if planes["c"]["frameCount"] == rows and planes["s"]["frameCount"] == cols:
+        return
+    planes["c"] = _frame_info(rows)
+    planes["s"] = _frame_info(cols)
+    d = py.path.local(_sim_file(simulation["simulationId"], _DICOM_DIR))
+    for p in "c", "s":
+        pkio.unchecked_remove(
+            # transposed copy was made with the old geometry
+            _pixel_plane_filename(_pixel_filename(simulation), p),
+            *pkio.sorted_glob(d.join(p + "*")),
+        )
+    frame1 = simulation_db.read_json(_dicom_path(simulation, "t", 1))
+    _summarize_dicom_planes(
+        simulation,
+        frame0,
+        planes["t"]["frameCount"],
+        (rows, cols),
+        abs(
+            float(frame0["ImagePositionPatient"][2])
+            - float(frame1["ImagePositionPatient"][2])
+        ),
+    )
+
+
 def generate_rtdose_file(data, run_dir):
     dose_hd5 = str(run_dir.join(DOSE_CALC_OUTPUT))
     dicom_series = data["models"]["dicomSeries"]
@@ -571,58 +614,70 @@ def _read_dose_frame(idx, data):
     if idx >= dicom_dose["frameCount"]:
         return res
     shape = dicom_dose["shape"]
-    with open(_dose_filename(data["models"]["simulation"]), "rb") as f:
-        f.seek(idx * _FLOAT_SIZE * shape[0] * shape[1], 1)
-        for r in range(shape[0]):
-            row = []
-            res.append(row)
-            for c in range(shape[1]):
-                row.append(struct.unpack("f", f.read(_FLOAT_SIZE))[0])
-    return res
+    return np.memmap(
+        _dose_filename(data["models"]["simulation"]),
+        dtype=np.float32,
+        mode="r",
+        shape=(dicom_dose["frameCount"], shape[0], shape[1]),
+    )[idx].tolist()
+
+
+def _pixel_plane_filename(filename, plane):
+    p = py.path.local(filename)
+    return p.new(purebasename=f"{p.purebasename}-{plane}")
+
+
+def _pixel_volume(filename, shape, plane):
+    """Pixels with the plane's slices contiguous (first axis)
+
+    The pixel file is (z, y, x), that is (t, c, s) frames, so c and s
+    slices would read every page of it. Those are read from a
+    transposed copy, which is created on first use.
+    """
+    v = np.memmap(filename, dtype=np.float32, mode="r", shape=shape)
+    a = _PLANE_AXIS[plane]
+    if not a:
+        return v
+    p = _pixel_plane_filename(filename, plane)
+    if not p.check() or p.mtime() < os.path.getmtime(filename):
+        t = p.new(basename=f"{p.basename}-{os.getpid()}.tmp")
+        try:
+            o = np.memmap(
+                str(t),
+                dtype=np.float32,
+                mode="w+",
+                shape=(shape[a],) + tuple(x for i, x in enumerate(shape) if i != a),
+            )
+            o[:] = np.moveaxis(v, a, 0)
+            o.flush()
+            del o
+            os.replace(t, p)
+        finally:
+            pkio.unchecked_remove(t)
+    return np.memmap(
+        str(p),
+        dtype=np.float32,
+        mode="r",
+        shape=np.moveaxis(v, a, 0).shape,
+    )
 
 
 def _read_pixel_plane(plane, idx, data):
     plane_info = data["models"]["dicomSeries"]["planes"]
-    size = [
-        plane_info["c"]["frameCount"],
-        plane_info["s"]["frameCount"],
-        plane_info["t"]["frameCount"],
-    ]
-    frame = []
-    # pixels = np.array(all_frame_pixels)[:, idx]
-    # pixels = np.array(all_frame_pixels)[:, :, idx]
-    with open(_pixel_filename(data["models"]["simulation"]), "rb") as f:
-        if plane == "t":
-            if idx > 0:
-                f.seek(idx * _FLOAT_SIZE * size[0] * size[1], 1)
-            for r in range(size[1]):
-                row = []
-                frame.append(row)
-                for v in range(size[0]):
-                    row.append(struct.unpack("f", f.read(_FLOAT_SIZE))[0])
-        elif plane == "c":
-            if idx > 0:
-                f.seek(idx * _FLOAT_SIZE * size[0], 1)
-            for r in range(size[2]):
-                row = []
-                frame.append(row)
-                for v in range(size[0]):
-                    row.append(struct.unpack("f", f.read(_FLOAT_SIZE))[0])
-                f.seek(_FLOAT_SIZE * (size[0] - 1) * size[1], 1)
-            frame = np.flipud(frame).tolist()
-        elif plane == "s":
-            if idx > 0:
-                f.seek(idx * _FLOAT_SIZE, 1)
-            for r in range(size[2]):
-                row = []
-                frame.append(row)
-                for v in range(size[1]):
-                    row.append(struct.unpack("f", f.read(_FLOAT_SIZE))[0])
-                    f.seek(_FLOAT_SIZE * (size[0] - 1), 1)
-            frame = np.flipud(frame).tolist()
-        else:
-            raise RuntimeError("plane not supported: {}".format(plane))
-    return frame
+    if plane not in _PLANE_AXIS:
+        raise RuntimeError("plane not supported: {}".format(plane))
+    v = _pixel_volume(
+        _pixel_filename(data["models"]["simulation"]),
+        (
+            plane_info["t"]["frameCount"],
+            plane_info["c"]["frameCount"],
+            plane_info["s"]["frameCount"],
+        ),
+        plane,
+    )[idx]
+    if plane == "t":
+        return v.tolist()
+    return np.flipud(v).tolist()
 
 
 def _read_roi_file(sim_id):
@@ -668,10 +723,12 @@ def _summarize_dicom_files(data, dicom_dir):
         "description": info["description"],
         "pixelSpacing": info["pixelSpacing"],
         "studyInstanceUID": info["StudyInstanceUID"],
+        "pixelShape": list(frames[0]["pixels"].shape),
         "planes": {
             "t": _frame_info(len(frames)),
-            "s": _frame_info(len(frames[0]["pixels"])),
-            "c": _frame_info(len(frames[0]["pixels"][0])),
+            # coronal slices are rows, sagittal slices are columns
+            "c": _frame_info(frames[0]["pixels"].shape[0]),
+            "s": _frame_info(frames[0]["pixels"].shape[1]),
         },
     }
     time_stamp = int(time.time())
@@ -699,29 +756,20 @@ def _summarize_dicom_files(data, dicom_dir):
     _compute_histogram(simulation, frames)
 
 
-def _summarize_dicom_series(simulation, frames):
-    idx = 0
-    z_space = abs(
-        float(frames[0]["ImagePositionPatient"][2])
-        - float(frames[1]["ImagePositionPatient"][2])
-    )
-    os.mkdir(_sim_file(simulation["simulationId"], _DICOM_DIR))
-    for frame in frames:
-        res = {
-            "shape": frame["shape"],
-            "ImagePositionPatient": frame["ImagePositionPatient"],
-            "PixelSpacing": frame["PixelSpacing"],
-            "domain": _calculate_domain(frame),
-            "frameId": frame["frameId"],
-        }
-        filename = _dicom_path(simulation, "t", idx)
-        simulation_db.write_json(filename, res)
-        idx += 1
+def _summarize_dicom_planes(simulation, frame0, count, pixel_shape, z_space):
+    """Write c and s frame info
 
-    frame0 = frames[0]
+    Args:
+        simulation (dict): model
+        frame0 (dict): first t frame with ImagePositionPatient and PixelSpacing
+        count (int): number of t frames
+        pixel_shape (tuple): rows and columns of a t frame
+        z_space (float): distance between t frames
+    """
+    rows, cols = pixel_shape
     shape = [
-        len(frames),
-        len(frame0["pixels"][0]),
+        count,
+        cols,
     ]
     res = {
         "shape": shape,
@@ -735,7 +783,7 @@ def _summarize_dicom_series(simulation, frames):
             z_space,
         ],
     }
-    for idx in range(len(frame0["pixels"][0])):
+    for idx in range(rows):
         res["ImagePositionPatient"][2] = str(
             float(frame0["ImagePositionPatient"][1])
             + idx * float(frame0["PixelSpacing"][0])
@@ -745,8 +793,8 @@ def _summarize_dicom_series(simulation, frames):
         simulation_db.write_json(filename, res)
 
     shape = [
-        len(frames),
-        len(frame0["pixels"][1]),
+        count,
+        rows,
     ]
     res = {
         "shape": shape,
@@ -760,7 +808,7 @@ def _summarize_dicom_series(simulation, frames):
             z_space,
         ],
     }
-    for idx in range(len(frame0["pixels"][0])):
+    for idx in range(cols):
         res["ImagePositionPatient"][2] = str(
             float(frame0["ImagePositionPatient"][0])
             + idx * float(frame0["PixelSpacing"][1])
@@ -768,6 +816,35 @@ def _summarize_dicom_series(simulation, frames):
         res["domain"] = _calculate_domain(res)
         filename = _dicom_path(simulation, "s", idx)
         simulation_db.write_json(filename, res)
+
+
+def _summarize_dicom_series(simulation, frames):
+    idx = 0
+    z_space = abs(
+        float(frames[0]["ImagePositionPatient"][2])
+        - float(frames[1]["ImagePositionPatient"][2])
+    )
+    os.mkdir(_sim_file(simulation["simulationId"], _DICOM_DIR))
+    for frame in frames:
+        res = {
+            "shape": frame["shape"],
+            "ImagePositionPatient": frame["ImagePositionPatient"],
+            "PixelSpacing": frame["PixelSpacing"],
+            "domain": _calculate_domain(frame),
+            "frameId": frame["frameId"],
+        }
+        filename = _dicom_path(simulation, "t", idx)
+        simulation_db.write_json(filename, res)
+        idx += 1
+
+    frame0 = frames[0]
+    _summarize_dicom_planes(
+        simulation,
+        frame0,
+        len(frames),
+        frame0["pixels"].shape,
+        z_space,
+    )
     spacing = frame0["PixelSpacing"]
     return _string_list([spacing[0], spacing[1], z_space])
 
@@ -6,11 +6,12 @@
 """
 from __future__ import absolute_import, division, print_function
 from pykern import pkio
-from pykern import pksubprocess
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdexc, pkdlog, pkdp
-from sirepo.template import elegant_common
+import collections
 import math
+import numpy
+import os
 import re
 import sdds
 import threading
@@ -35,15 +36,78 @@ _ELEGANT_TO_MADX_COLUMNS = [
 
 MADX_TWISS_COLUMS = map(lambda row: row[1], _ELEGANT_TO_MADX_COLUMNS)
 
+# MAD-X mu columns computed from elegant psi columns
+_PSI_FOR_MU = PKDict(mux="psix", muy="psiy")
+
 # start SDDS index at 1, leave 0 for others
 _SDDS_INDEX = 1
 _MAX_SDDS_INDEX = 19
 _sdds_lock = threading.RLock()
 
+#: Max SDDS inputs left open between reads (each holds an sdds index)
+_MAX_OPEN_INPUTS = 4
+
+#: Max (file, page, columns) results kept in memory
+_MAX_PAGE_CACHE = 32
+
+#: SDDS indexes in use by open inputs, skipped by _next_index
+_held_indexes = set()
+
+#: filename -> _Input, least recently used first
+_open_inputs = collections.OrderedDict()
+
+#: (filename, mtime, size, page_index, columns) -> PKDict, least recently used first
+_page_cache = collections.OrderedDict()
+
 
 def extract_sdds_column(filename, field, page_index):
     """Returns values from one column on one page."""
-    return process_sdds_page(filename, page_index, _sdds_column, field)
+    r = extract_sdds_columns(filename, [field], page_index)
+    if r.err:
+        return r
+    return PKDict(
+        values=r.columns[field].tolist(),
+        column_names=r.column_names,
+        column_def=r.column_defs[field],
+        err=None,
+    )
+
+
+def extract_sdds_columns(filename, fields, page_index):
+    """Read several columns from one page in one pass
+
+    The input stays open between calls, positioned after the last
+    page read, so reading frames in increasing order does not reread
+    the preceding pages. The result is cached by file mtime and size.
+
+    Args:
+        filename (str): sdds file
+        fields (iterable): column names
+        page_index (int): zero-based page
+    Returns:
+        PKDict: columns (name -> numpy array; inf/nan replaced with 0),
+            column_names, column_defs (name -> definition), err
+    """
+    f = str(filename)
+    c = tuple(fields)
+    with _sdds_lock:
+        try:
+            s = os.stat(f)
+        except FileNotFoundError:
+            # In normal execution, the file may not yet be available over NFS
+            pkdlog("{}: cannot access", f)
+            return PKDict(err=PKDict(error="Output file is not yet available."))
+        k = (f, s.st_mtime_ns, s.st_size, page_index, c)
+        if k in _page_cache:
+            _page_cache.move_to_end(k)
+            return _page_cache[k]
+        r = _read_page(f, (s.st_mtime_ns, s.st_size), page_index, c)
+        if r.err:
+            return r
+        _page_cache[k] = r
+        while len(_page_cache) > _MAX_PAGE_CACHE:
+            _page_cache.popitem(last=False)
+        return r
 
 
 def process_sdds_page(filename, page_index, callback, *args, **kwargs):
@@ -108,46 +172,143 @@ def read_sdds_pages(filename, column_names, group_by_page_number=False):
 
 
 def twiss_to_madx(elegant_twiss_file, madx_twiss_file):
-    outfile = "sdds_output.txt"
-    twiss_file = "twiss-with-mu.sdds"
-    # convert elegant psix to mad-x MU, rad --> rad / 2pi
-    pksubprocess.check_call_with_signals(
-        [
-            "sddsprocess",
-            elegant_twiss_file,
-            "-define=column,mux,psix 2 pi * /",
-            "-define=column,muy,psiy 2 pi * /",
-            twiss_file,
-        ],
-        output=outfile,
-        env=elegant_common.subprocess_env(),
-    )
-    pksubprocess.check_call_with_signals(
-        [
-            "sdds2stream",
-            twiss_file,
-            "-columns={}".format(
-                ",".join(map(lambda x: x[0], _ELEGANT_TO_MADX_COLUMNS))
-            ),
-        ],
-        output=outfile,
-        env=elegant_common.subprocess_env(),
+    def _format(value):
+        if isinstance(value, str):
+            return '"{}"'.format(value) if re.search(r"\s", value) else value
+        return "{:.15g}".format(value)
+
+    r = extract_sdds_columns(
+        elegant_twiss_file,
+        [_PSI_FOR_MU.get(x[0], x[0]) for x in _ELEGANT_TO_MADX_COLUMNS],
+        0,
     )
-    lines = pkio.read_text(outfile).split("\n")
-    header = "* {}\n$ \n".format(
-        " ".join(map(lambda x: x[1], _ELEGANT_TO_MADX_COLUMNS))
+    if r.err:
+        raise AssertionError(
+            "{}: cannot read twiss file error={}".format(
+                elegant_twiss_file, r.err.error
+            )
+        )
+    c = []
+    for x in _ELEGANT_TO_MADX_COLUMNS:
+        if x[0] in _PSI_FOR_MU:
+            # convert elegant psix to mad-x MU, rad --> rad / 2pi
+            c.append(r.columns[_PSI_FOR_MU[x[0]]] / (2 * math.pi))
+        else:
+            c.append(r.columns[x[0]])
+    pkio.write_text(
+        madx_twiss_file,
+        "* {}\n$ \n".format(" ".join(map(lambda x: x[1], _ELEGANT_TO_MADX_COLUMNS)))
+        + "".join(
+            " ".join(_format(v) for v in row) + "\n"
+            for row in zip(*[x.tolist() for x in c])
+        ),
     )
-    pkio.write_text(madx_twiss_file, header + "\n".join(lines) + "\n")
+
+
+class _Input:
+    """An SDDS input left open between reads"""
+
+    def __init__(self, filename, key):
+        self.filename = filename
+        self.key = key
+        self.sdds_index = _next_index()
+        _held_indexes.add(self.sdds_index)
+        self.page = -1
+        if sdds.sddsdata.InitializeInput(self.sdds_index, filename) != 1:
+            self.destroy()
+            raise IOError("{}: cannot access".format(filename))
+        self.column_names = sdds.sddsdata.GetColumnNames(self.sdds_index)
+
+    def destroy(self):
+        try:
+            sdds.sddsdata.Terminate(self.sdds_index)
+        except Exception:
+            pass
+        _held_indexes.discard(self.sdds_index)
+
+    def goto_page(self, page_index):
+        # TODO(robnagler) SDDS_GotoPage not in sddsdata, why?
+        while self.page < page_index:
+            if sdds.sddsdata.ReadPage(self.sdds_index) <= 0:
+                return False
+            self.page += 1
+        return True
+
+    def read_columns(self, fields):
+        res = PKDict()
+        for f in fields:
+            assert f in self.column_names, "field not in sdds columns: {}: {}".format(
+                f, self.column_names
+            )
+            v = numpy.array(
+                sdds.sddsdata.GetColumn(self.sdds_index, self.column_names.index(f))
+            )
+            if v.dtype.kind == "f":
+                v = numpy.nan_to_num(v, nan=0, posinf=0, neginf=0)
+            res[f] = v
+        return res
 
 
 def _next_index():
     global _SDDS_INDEX
     with _sdds_lock:
-        sdds_index = _SDDS_INDEX
-        _SDDS_INDEX += 1
-        if _SDDS_INDEX > _MAX_SDDS_INDEX:
-            _SDDS_INDEX = 1
-    return sdds_index
+        while True:
+            sdds_index = _SDDS_INDEX
+            _SDDS_INDEX += 1
+            if _SDDS_INDEX > _MAX_SDDS_INDEX:
+                _SDDS_INDEX = 1
+            if sdds_index not in _held_indexes:
+                return sdds_index
+
+
+def _page_error(filename, page_index):
+    pkdlog("{}: page not found in {}".format(page_index, filename))
+    return PKDict(
+        err=PKDict(
+            error="Output page {} not found".format(page_index)
+            if page_index
+            else "No output was generated for this report.",
+        ),
+    )
+
+
+def _read_page(filename, key, page_index, fields):
+    i = _open_inputs.pop(filename, None)
+    if i and (i.key != key or i.page > page_index):
+        i.destroy()
+        i = None
+    if not i:
+        try:
+            i = _Input(filename, key)
+        except IOError:
+            pkdlog("{}: cannot access", filename)
+            # In normal execution, the file may not yet be available over NFS
+            return PKDict(err=PKDict(error="Output file is not yet available."))
+        while len(_open_inputs) >= _MAX_OPEN_INPUTS:
+            _open_inputs.popitem(last=False)[1].destroy()
+    try:
+        if not i.goto_page(page_index):
+            i.destroy()
+            return _page_error(filename, page_index)
+        r = PKDict(
+            columns=i.read_columns(fields),
+            column_names=i.column_names,
+            column_defs=PKDict(
+                {
+                    f: sdds.sddsdata.GetColumnDefinition(i.sdds_index, f)
+                    for f in fields
+                }
+            ),
+            err=None,
+        )
+    except SystemError:
+        i.destroy()
+        return _page_error(filename, page_index)
+    except Exception:
+        i.destroy()
+        raise
+    _open_inputs[filename] = i
+    return r
 
 
 def _safe_sdds_value(v):
@@ -156,24 +317,6 @@ def _safe_sdds_value(v):
     return v
 
 
-def _sdds_column(field, sdds_index=0):
-    column_names = sdds.sddsdata.GetColumnNames(sdds_index)
-    assert field in column_names, "field not in sdds columns: {}: {}".format(
-        field, column_names
-    )
-    column_def = sdds.sddsdata.GetColumnDefinition(sdds_index, field)
-    values = sdds.sddsdata.GetColumn(
-        sdds_index,
-        column_names.index(field),
-    )
-    return PKDict(
-        values=[_safe_sdds_value(v) for v in values],
-        column_names=column_names,
-        column_def=column_def,
-        err=None,
-    )
-
-
 def _sdds_error(sdds_idx, error_text="invalid data file"):
     sdds.sddsdata.Terminate(sdds_idx)
     return PKDict(
@@ -13,6 +13,7 @@ from sirepo import simulation_db
 from sirepo.template import srw_common
 from sirepo.template import template_common
 import array
+import collections
 import copy
 import math
 import numpy as np
@@ -143,6 +144,9 @@ _LOG_DIR = "__srwl_logs__"
 
 _JSON_MESSAGE_EXPANSION = 20
 
+# z_matrix is sent as float32 (see sirepo.binary_msg)
+_BINARY_MESSAGE_EXPANSION = 4
+
 _RSOPT_PARAMS = {
     i
     for sublist in [
@@ -156,10 +160,25 @@ _RSOPT_PARAMS = {
 }
 _RSOPT_PARAMS_NO_ROT = [p for p in _RSOPT_PARAMS if p != "rotation"]
 
+#: 3d reports which extract_report_data reads with file_load without fixups
+_PREPARE_SIDECAR_REPORTS = frozenset(("multiElectronAnimation",))
+
 _PROGRESS_LOG_DIR = "__srwl_logs__"
 
+#: resized and rotated 3d reports which are shown again, e.g. in fastcgi
+_REMAP_CACHE_MAX = 8
+
+#: binary copy of a 3d report file next to it (see `_load_report_data`)
+_REPORT_SIDECAR_SUFFIX = ".npy"
+
+#: least recently used last (see `_remap_3d`)
+_remap_cache = collections.OrderedDict()
+
 _TABULATED_UNDULATOR_DATA_DIR = "tabulatedUndulator"
 
+#: appended to by beamlineAnimation runs as each wavefront pickle is written
+_WAVEFRONT_MANIFEST_FILENAME = "wavefront-manifest.jsonl"
+
 _USER_MODEL_LIST_FILENAME = PKDict(
     electronBeam="_user_beam_list.json",
     tabulatedUndulator="_user_undulator_list.json",
@@ -405,7 +424,7 @@ def extract_report_data(sim_in):
         out.units[1] = "[m]"
     else:
         out.units[1] = "({})".format(out.units[1])
-    data, _, allrange, _, _ = uti_plot_com.file_load(out.filename)
+    data, allrange, k = _load_report_data(out.filename, out.dimensions)
     res = PKDict(
         title=out.title,
         subtitle=out.get("subtitle", ""),
@@ -428,7 +447,7 @@ def extract_report_data(sim_in):
         ),
     )
     if out.dimensions == 3:
-        res = _remap_3d(res, allrange, out, dm[r])
+        res = _remap_3d(res, allrange, out, dm[r], cache_key=k)
     return res
 
 
@@ -829,6 +848,17 @@ def run_epilogue():
             # this sim creates _really_ large intermediate files which should get removed
             for p in pkio.sorted_glob("*_mi.h5"):
                 p.remove()
+        if sim_in.report not in _PREPARE_SIDECAR_REPORTS:
+            return
+        o = _OUTPUT_FOR_MODEL[sim_in.report]
+        if not os.path.exists(o.filename):
+            return
+        try:
+            # so the first frame is not parsed in a request
+            _load_report_data(_best_data_file(o.filename), o.dimensions)
+        except Exception as e:
+            # the run succeeded, the first frame request parses the file
+            pkdlog("report={} error={}", sim_in.report, e)
 
     sirepo.mpi.restrict_op_to_first_rank(_op)
 
@@ -1083,10 +1113,16 @@ def _beamline_animation_percent_complete(run_dir, res):
                 )
             )
     count = 0
+    done = _read_wavefront_manifest(run_dir)
     for info in res.outputInfo:
+        if done is not None:
+            if info.id not in done:
+                break
+            count += 1
+            continue
+        # run_dir from before the manifest existed
         try:
-            with open(info.filename, "rb") as f:
-                # TODO(pjm): instead look at last byte == pickle.STOP, see template_common.read_last_csv_line()
+            with open(run_dir.join(info.filename), "rb") as f:
                 wfr = pickle.load(f)
                 count += 1
         except Exception as e:
@@ -1887,8 +1923,11 @@ def _generate_srw_main(data, plot_reports, beamline_info):
             content.append("v.si = True")
             content.append("op = None")
         content.append("v.ws_fne = '{}'".format(_wavefront_pickle_filename(0)))
+        content.append("wavefront_manifest([])")
         prev_wavefront = None
         names = []
+        # watchpoints written by the next calc_all
+        wids = [0]
         for n in beamline_info.names:
             names.append(n)
             if n in beamline_info.watches:
@@ -1898,10 +1937,13 @@ def _generate_srw_main(data, plot_reports, beamline_info):
                 if prev_wavefront:
                     content.append("v.ws_fnei = '{}'".format(prev_wavefront))
                 prev_wavefront = _wavefront_pickle_filename(beamline_info.watches[n])
+                wids.append(beamline_info.watches[n])
                 content.append("v.ws_fnep = '{}'".format(prev_wavefront))
                 content.append("op = set_optics(v, names, {})".format(is_last_watch))
                 if not is_last_watch:
                     content.append("srwl_bl.SRWLBeamline(_name=v.name).calc_all(v, op)")
+                    content.append(_wavefront_manifest_call(wids))
+                    wids = []
     elif run_all or (
         _SIM_DATA.srw_is_beamline_report(report) and len(data.models.beamline)
     ):
@@ -1954,6 +1996,8 @@ def _generate_srw_main(data, plot_reports, beamline_info):
             if plot_reports:
                 content.append("v.tr_pl = 'xz'")
     content.append("srwl_bl.SRWLBeamline(_name=v.name).calc_all(v, op)")
+    if report == "beamlineAnimation" and wids:
+        content.append(_wavefront_manifest_call(wids))
     return "\n".join(
         [f"    {x}" for x in content] + [""] + ([] if is_for_rsopt else ["main()", ""])
     )
@@ -2003,6 +2047,50 @@ def _is_for_rsopt(report):
     return report == _SIM_DATA.EXPORT_RSOPT
 
 
+def _load_report_data(filename, dimensions):
+    """Read report data, for 3d reports from a memory mapped sidecar
+
+    The sidecar is written on the first read and is valid as long as
+    the mtime and size of filename are unchanged.
+
+    Returns:
+        tuple: data, allrange, key of the file's content (or None)
+    """
+    if dimensions != 3:
+        data, _, allrange, _, _ = uti_plot_com.file_load(filename)
+        return data, allrange, None
+    p = pkio.py_path(filename)
+    s = os.stat(p)
+    k = f"{p}:{s.st_mtime_ns}:{s.st_size}"
+    d = p.new(basename=p.basename + _REPORT_SIDECAR_SUFFIX)
+    m = d.new(ext=".json")
+    try:
+        x = pykern.pkjson.load_any(pkio.read_text(m))
+        if x.key == k:
+            return np.asarray(np.load(str(d), mmap_mode="r")), x.allrange, k
+    except Exception:
+        # missing or being written
+        pass
+    data, _, allrange, _, _ = uti_plot_com.file_load(filename)
+    data = np.asarray(data)
+    t = p.new(basename=f"{p.basename}-{sirepo.job.unique_key()}")
+    try:
+        with open(t, "wb") as f:
+            np.save(f, data)
+        os.replace(t, d)
+        # written last, because it validates the data
+        pkio.write_text(
+            t,
+            pykern.pkjson.dump_pretty(PKDict(allrange=allrange, key=k)),
+        )
+        os.replace(t, m)
+    except Exception as e:
+        pkdlog("unable to write sidecar={} error={}", d, e)
+    finally:
+        pkio.unchecked_remove(t)
+    return data, allrange, k
+
+
 def _load_user_model_list(model_name):
     f = _SIM_DATA.lib_file_write_path(_USER_MODEL_LIST_FILENAME[model_name])
     try:
@@ -2111,22 +2199,61 @@ def _process_rsopt_elements(els):
     return x
 
 
-def _remap_3d(info, allrange, out, report):
-    x_range = [allrange[3], allrange[4], allrange[5]]
-    y_range = [allrange[6], allrange[7], allrange[8]]
-    ar2d = info.points
-    totLen = int(x_range[2] * y_range[2])
-    n = len(ar2d) if totLen > len(ar2d) else totLen
-    ar2d = np.reshape(ar2d[0:n], (int(y_range[2]), int(x_range[2])))
+def _read_wavefront_manifest(run_dir):
+    """Watchpoint ids of completely written wavefronts
 
-    if report.get("usePlotRange", "0") == "1":
-        ar2d, x_range, y_range = _update_report_range(report, ar2d, x_range, y_range)
-    if report.get("useIntensityLimits", "0") == "1":
-        ar2d[ar2d < report.minIntensityLimit] = report.minIntensityLimit
-        ar2d[ar2d > report.maxIntensityLimit] = report.maxIntensityLimit
-    ar2d, x_range, y_range = _resize_report(report, ar2d, x_range, y_range)
-    if report.get("rotateAngle", 0):
-        ar2d, x_range, y_range = _rotate_report(report, ar2d, x_range, y_range, info)
+    Returns:
+        set: ids or None if the run does not write a manifest
+    """
+    try:
+        with open(run_dir.join(_WAVEFRONT_MANIFEST_FILENAME), "r") as f:
+            l = f.readlines()
+    except FileNotFoundError:
+        return None
+    res = set()
+    for x in l:
+        # a line without a newline is still being written
+        if x.endswith("\n"):
+            res.add(pykern.pkjson.load_any(x).id)
+    return res
+
+
+def _remap_3d(info, allrange, out, report, cache_key=None):
+    def _remap():
+        x_range = [allrange[3], allrange[4], allrange[5]]
+        y_range = [allrange[6], allrange[7], allrange[8]]
+        ar2d = info.points
+        totLen = int(x_range[2] * y_range[2])
+        n = len(ar2d) if totLen > len(ar2d) else totLen
+        ar2d = np.reshape(ar2d[0:n], (int(y_range[2]), int(x_range[2])))
+
+        if report.get("usePlotRange", "0") == "1":
+            ar2d, x_range, y_range = _update_report_range(
+                report, ar2d, x_range, y_range
+            )
+        if report.get("useIntensityLimits", "0") == "1":
+            # not in place, because ar2d may be memory mapped
+            ar2d = np.clip(ar2d, report.minIntensityLimit, report.maxIntensityLimit)
+        ar2d, x_range, y_range = _resize_report(report, ar2d, x_range, y_range)
+        if report.get("rotateAngle", 0):
+            ar2d, x_range, y_range = _rotate_report(report, ar2d, x_range, y_range)
+        return ar2d, x_range, y_range
+
+    if cache_key is None:
+        ar2d, x_range, y_range = _remap()
+    else:
+        k = (cache_key, _remap_cache_params(report))
+        if k in _remap_cache:
+            _remap_cache.move_to_end(k)
+        else:
+            _remap_cache[k] = _remap()
+            if len(_remap_cache) > _REMAP_CACHE_MAX:
+                _remap_cache.popitem(last=False)
+        ar2d, x_range, y_range = _remap_cache[k]
+        x_range = list(x_range)
+        y_range = list(y_range)
+    if report.get("rotateAngle", 0) and info.title != "Power Density":
+        info.subtitle = info.subtitle + " Image Rotate {}^0".format(report.rotateAngle)
     if out.units[2]:
         out.labels[2] = "{} [{}]".format(out.labels[2], out.units[2])
     if report.get("useIntensityLimits", "0") == "1":
@@ -2147,16 +2274,41 @@ def _remap_3d(info, allrange, out, report):
     )
 
 
+def _remap_cache_params(report):
+    return pykern.pkjson.dump_pretty(
+        PKDict(
+            (k, report.get(k))
+            for k in (
+                "horizontalOffset",
+                "horizontalSize",
+                "intensityPlotsWidth",
+                "maxIntensityLimit",
+                "minIntensityLimit",
+                "rotateAngle",
+                "rotateReshape",
+                "useIntensityLimits",
+                "usePlotRange",
+                "verticalOffset",
+                "verticalSize",
+            )
+        ),
+        pretty=False,
+    )
+
+
 def _resize_report(report, ar2d, x_range, y_range):
     width_pixels = int(report.intensityPlotsWidth)
     if not width_pixels:
         # upper limit is browser's max html canvas size
         width_pixels = _CANVAS_MAX_SIZE
     # roughly 20x size increase for json
-    if ar2d.size * _JSON_MESSAGE_EXPANSION > sirepo.job.cfg().max_message_bytes:
-        max_width = int(
-            math.sqrt(sirepo.job.cfg().max_message_bytes / _JSON_MESSAGE_EXPANSION)
-        )
+    e = (
+        _BINARY_MESSAGE_EXPANSION
+        if sirepo.job.cfg().binary_messages
+        else _JSON_MESSAGE_EXPANSION
+    )
+    if ar2d.size * e > sirepo.job.cfg().max_message_bytes:
+        max_width = int(math.sqrt(sirepo.job.cfg().max_message_bytes / e))
         if max_width < width_pixels:
             pkdc(
                 "auto scaling dimensions to fit message size. size: {}, max_width: {}",
@@ -2188,7 +2340,7 @@ def _resize_report(report, ar2d, x_range, y_range):
     return ar2d, x_range, y_range
 
 
-def _rotate_report(report, ar2d, x_range, y_range, info):
+def _rotate_report(report, ar2d, x_range, y_range):
     from scipy import ndimage
 
     rotate_angle = report.rotateAngle
@@ -2222,8 +2374,6 @@ def _rotate_report(report, ar2d, x_range, y_range, info):
 
     x_range[2] = ar2d.shape[1]
     y_range[2] = ar2d.shape[0]
-    if info.title != "Power Density":
-        info.subtitle = info.subtitle + " Image Rotate {}^0".format(rotate_angle)
     return ar2d, x_range, y_range
 
 
@@ -2324,6 +2474,7 @@ def _set_parameters(v, data, plot_reports, run_dir):
     v[report] = 1
     for k in _OUTPUT_FOR_MODEL:
         v["{}Filename".format(k)] = _OUTPUT_FOR_MODEL[k].filename
+    v.wavefrontManifestFilename = _WAVEFRONT_MANIFEST_FILENAME
     v.setupMagneticMeasurementFiles = (
         plot_reports or is_for_rsopt
     ) and _SIM_DATA.srw_uses_tabulated_zipfile(data)
@@ -2565,6 +2716,14 @@ def _validate_safe_zip(zip_file_name, target_dir=".", *args):
         )
 
 
+def _wavefront_manifest_call(watchpoint_ids):
+    return "wavefront_manifest([{}])".format(
+        ", ".join(
+            f"({i}, '{_wavefront_pickle_filename(i)}')" for i in watchpoint_ids
+        ),
+    )
+
+
 def _wavefront_pickle_filename(el_id):
     if el_id:
         return f"wid-{el_id}.pkl"
@@ -7,12 +7,14 @@
 from pykern import pkcompat
 from pykern import pkio
 from pykern import pkjinja
+from pykern import pkjson
 from pykern.pkcollections import PKDict
 from pykern.pkdebug import pkdc, pkdlog, pkdp, pkdexc
 from sirepo.template import code_variable
 import math
 import os
 import re
+import sirepo.binary_msg
 import sirepo.const
 import sirepo.sim_data
 import sirepo.template
@@ -54,6 +56,9 @@ _PLOT_LINE_COLOR = [
     "#17becf",
 ]
 
+#: per step field ranges next to an output file (see `read_step_ranges`)
+_STEP_RANGES_SUFFIX = ".ranges.json"
+
 
 class ModelUnits:
     """Convert model fields from native to sirepo format, or from sirepo to native format.
@@ -507,6 +512,24 @@ def jinja_filename(filename):
     return filename + ".jinja"
 
 
+def merge_step_ranges(steps):
+    """Combine per step field ranges into one range per field
+
+    Args:
+        steps (list): PKDict(field=[min, max]) per step
+    Returns:
+        PKDict: field to [min, max]
+    """
+    res = PKDict()
+    for s in steps:
+        for f, r in s.items():
+            if f in res:
+                res[f] = [min(res[f][0], r[0]), max(res[f][1], r[1])]
+            else:
+                res[f] = list(r)
+    return res
+
+
 def parameter_plot(x, plots, model, plot_fields=None, plot_colors=None):
     res = PKDict(
         x_points=x,
@@ -586,6 +609,48 @@ def read_sequential_result(run_dir):
     )
 
 
+def read_step_ranges(path, extend):
+    """Per step field ranges of an output file which grows step by step
+
+    The ranges are stored next to path (`_STEP_RANGES_SUFFIX`) with
+    path's mtime and size. If path changed, extend is called to append
+    the new steps to ``index.steps``. It may keep where it left off in
+    ``index.state``. The sidecar is not written if it cannot be.
+
+    Args:
+        path (py.path): output file
+        extend (callable): extend(path, index) updates index
+    Returns:
+        PKDict: steps (list of PKDict(field=[min, max])) and state
+    """
+    p = pkio.py_path(path)
+    s = os.stat(p)
+    k = f"{s.st_mtime_ns}:{s.st_size}"
+    x = p.new(basename=p.basename + _STEP_RANGES_SUFFIX)
+    res = None
+    try:
+        res = pkjson.load_any(pkio.read_text(x))
+        if res.key == k:
+            return res
+    except Exception:
+        # missing or being written
+        pass
+    if not res:
+        res = PKDict(state=PKDict(), steps=[])
+    extend(p, res)
+    # key is from before extend so changes during extend are picked up later
+    res.key = k
+    t = p.new(basename=f"{x.basename}-{os.getpid()}")
+    try:
+        pkio.write_text(t, pkjson.dump_pretty(res, pretty=False))
+        os.replace(t, x)
+    except Exception as e:
+        pkdlog("unable to write step ranges={} error={}", x, e)
+    finally:
+        pkio.unchecked_remove(t)
+    return res
+
+
 def render_jinja(sim_type, v, name=PARAMETERS_PYTHON_FILE, jinja_env=None):
     """Render the values into a jinja template.
 
@@ -623,7 +688,18 @@ def sim_frame(frame_id, op, qcall):
             e,
             pkdexc(),
         )
-    r = qcall.reply_json(x)
+    if sirepo.binary_msg.accepts(qcall.sreq.header_uget("Accept")):
+        b = sirepo.binary_msg.dump_bytes(x)
+        r = qcall.reply(
+            b,
+            content_type=sirepo.binary_msg.CONTENT_TYPE
+            if sirepo.binary_msg.is_binary(b)
+            else http_reply.MIME_TYPE.json,
+        )
+    else:
+        r = qcall.reply_json(sirepo.binary_msg.to_lists(x))
+    # browser cache must distinguish binary from JSON replies
+    r.headers["Vary"] = "Accept"
     if "error" not in x and s.want_browser_frame_cache(s.frameReport):
         r.headers["Cache-Control"] = "private, max-age=31536000"
     else:
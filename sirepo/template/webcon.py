@@ -13,6 +13,8 @@ from pykern.pkdebug import pkdp, pkdc, pkdlog
 from sirepo import simulation_db
 from sirepo.template import template_common
 import copy
+import datetime
+import fcntl
 import numpy
 import os
 import re
@@ -59,6 +61,18 @@ STEERING_FILE = "steering.json"
 
 _DIM_PLOT_COLORS = ["#d0c383", "#9400d3"]
 
+_MONITOR_LINE_RE = re.compile(r"(\S+)(.*?)\s([\d\.e\-\+]+)\s*$")
+
+#: readings (time, field index, value) of the run, see `_monitor_store`
+_MONITOR_STORE_FILE = "monitor-store.npy"
+
+#: oldest readings are overwritten, so memory and disk are bounded
+_MONITOR_STORE_CAPACITY = 2**20
+
+_MONITOR_STORE_HEADER_FILE = "monitor-store.json"
+
+_MONITOR_STORE_LOCK_FILE = "monitor-store.lock"
+
 _MONITOR_TO_MODEL_FIELDS = pkcollections.Dict()
 
 _SETTINGS_PLOT_COLORS = [
@@ -85,12 +99,12 @@ def background_percent_complete(report, run_dir, is_running):
     if report == "epicsServerAnimation" and is_running:
         monitor_file = run_dir.join(MONITOR_LOGFILE)
         if monitor_file.exists():
-            values, count, start_time = _read_monitor_file(monitor_file)
+            s = _monitor_store(monitor_file)
             return PKDict(
                 percentComplete=0,
-                frameCount=count,
+                frameCount=s.count,
                 summaryData=PKDict(
-                    monitorValues=values,
+                    monitorValues=s.latest,
                     optimizationValues=_optimization_values(run_dir),
                 ),
             )
@@ -98,12 +112,15 @@ def background_percent_complete(report, run_dir, is_running):
         # pkdlog('background_percent_complete for correctorSettingAnimation')
         monitor_file = run_dir.join(MONITOR_LOGFILE)
         if monitor_file.exists():
-            values, count, start_time = _read_monitor_file(monitor_file, True)
+            s = _monitor_store(monitor_file)
             return PKDict(
                 percentComplete=0,
-                frameCount=count,
+                frameCount=s.count,
                 summaryData=PKDict(
-                    monitorValues=values,
+                    monitorValues=PKDict(
+                        (k, PKDict(vals=v.vals.tolist(), times=v.times.tolist()))
+                        for k, v in _monitor_history(s).items()
+                    ),
                 ),
             )
     return PKDict(
@@ -147,9 +164,11 @@ def get_analysis_report(run_dir, data):
             PKDict(
                 points=(y * col_info["scale"][y_idx]).tolist(),
                 label=_label(col_info, y_idx),
-                style="line"
-                if "action" in report and report.action == "fft"
-                else "scatter",
+                style=(
+                    "line"
+                    if "action" in report and report.action == "fft"
+                    else "scatter"
+                ),
             )
         )
     return template_common.parameter_plot(
@@ -182,11 +201,11 @@ def get_beam_pos_report(run_dir, data):
         return PKDict(
             error="no beam position history",
         )
-    history, num_records, start_time = _read_monitor_file(monitor_file, True)
+    history = _monitor_history(_monitor_store(monitor_file))
     if len(history) <= 0:
         raise sirepo.util.UserAlert("no beam position history", "history length <= 0")
     x_label = "z [m]"
-    x, plots, colors = _beam_pos_plots(data, history, start_time)
+    x, plots, colors = _beam_pos_plots(data, history)
     if not plots:
         raise sirepo.util.UserAlert("no beam position history", "no plots")
     return template_common.parameter_plot(
@@ -310,14 +329,14 @@ def get_settings_report(run_dir, data):
         return PKDict(
             error="no settings history",
         )
-    history, num_records, start_time = _read_monitor_file(monitor_file, True)
+    history = _monitor_history(_monitor_store(monitor_file))
     o = data.models.correctorSettingReport.plotOrder
     plot_order = o if o is not None else "time"
     if plot_order == "time":
-        x, plots, colors = _setting_plots_by_time(data, history, start_time)
+        x, plots, colors = _setting_plots_by_time(data, history)
         x_label = "t [s]"
     else:
-        x, plots, colors = _setting_plots_by_position(data, history, start_time)
+        x, plots, colors = _setting_plots_by_position(data, history)
         x_label = "z [m]"
     if not plots:
         return PKDict(
@@ -630,11 +649,13 @@ def _analysis_data_path(data):
     return _SIM_DATA.webcon_analysis_data_file(data)
 
 
-def _beam_pos_plots(data, history, start_time):
+def _beam_pos_plots(data, history):
     plots = []
     c = []
 
-    bpms = _bpm_readings_for_plots(data, history, start_time)
+    bpms = _bpm_readings_for_plots(data, history)
+    if not bpms:
+        return numpy.array([]), plots, c
     for t_idx, t in enumerate(bpms["t"]):
         for d_idx, dim in enumerate(["x", "y"]):
             c.append(_DIM_PLOT_COLORS[d_idx % len(_DIM_PLOT_COLORS)])
@@ -659,80 +680,61 @@ def _beam_pos_plots(data, history, start_time):
 
 
 # arrange historical data for ease of plotting
-def _bpm_readings_for_plots(data, history, start_time):
-
-    bpms = _monitor_data_for_plots(data, history, start_time, "WATCH")
-    all_times = numpy.array([])
-    z = numpy.array([])
+def _bpm_readings_for_plots(data, history):
+    bpms = _monitor_data_for_plots(data, history, "WATCH")
+    z = []
     bpm_sorted = []
-    for element_name in sorted([b for b in bpms]):
-        if element_name not in [bpm[0] for bpm in bpm_sorted]:
-            bpm_sorted.append((element_name, []))
+    for element_name in sorted(bpms):
+        bpm_sorted.append((element_name, []))
         b_readings = bpms[element_name]
-        for reading_name in sorted([r for r in b_readings]):
+        for reading_name in sorted(b_readings):
             pos = b_readings[reading_name]["position"][0]
             if pos not in z:
-                z = numpy.append(z, pos)
+                z.append(pos)
+            # stable, so the last of readings at the same time is used
+            o = numpy.argsort(b_readings[reading_name]["times"], kind="stable")
             bpm_sorted[-1][1].append(
                 PKDict(
                     reading=reading_name,
-                    vals=b_readings[reading_name]["vals"],
-                    times=b_readings[reading_name]["times"],
+                    vals=b_readings[reading_name]["vals"][o],
+                    times=b_readings[reading_name]["times"][o],
                 ),
             )
-            all_times = numpy.append(all_times, b_readings[reading_name]["times"])
-
-    all_times = numpy.sort(numpy.unique(all_times))
-
-    for bpm in bpm_sorted:
-        for reading in bpm[1]:
-            # fill in missing times - use previous monitor values
-            v = numpy.array(reading["vals"])
-            t = numpy.array(reading["times"])
-            for a_t_idx, a_t in enumerate(all_times):
-                if a_t in t:
-                    continue
-                d_ts = a_t - t
-                deltas = [dt for dt in (a_t - t) if dt > 0]
-                if not deltas:
-                    return None
-                prev_dt = min(deltas)
-                dt_idx = numpy.where(d_ts == prev_dt)[0][0] + 1
-                if dt_idx < numpy.alen(t):
-                    t = numpy.insert(t, dt_idx, a_t)
-                    v = numpy.insert(v, dt_idx, v[dt_idx - 1])
-                else:
-                    t = numpy.append(t, a_t)
-                    v = numpy.append(v, v[dt_idx - 1])
-            reading["vals"] = v.tolist()
-
-    x = []
-    y = []
-    t = []
+    if not bpm_sorted:
+        return None
+    all_times = numpy.unique(
+        numpy.concatenate([r.times for b in bpm_sorted for r in b[1]]),
+    )
     time_window = data.models.beamPositionReport.numHistory
     period = data.models.beamPositionReport.samplePeriod
     current_time = all_times[-1]
-
-    t_indexes = numpy.where(
+    t = all_times[
         (
             (all_times > current_time - time_window)
             if time_window > 0
             else (all_times >= 0)
         )
         & (all_times % period == 0)
-    )
-    for t_idx in t_indexes[0]:
-        time = all_times[t_idx]
-        t.append(time)
+    ]
+    for bpm in bpm_sorted:
+        for reading in bpm[1]:
+            # fill in missing times - use previous monitor values
+            i = numpy.searchsorted(reading.times, t, side="right") - 1
+            if numpy.any(i < 0):
+                return None
+            reading.vals = reading.vals[i]
+    x = []
+    y = []
+    for t_idx in range(len(t)):
         xt = []
         yt = []
-        for z_idx, zz in enumerate(z):
+        for z_idx in range(len(z)):
             readings = bpm_sorted[z_idx][1]
-            xt.append(readings[0]["vals"][t_idx])
-            yt.append(readings[1]["vals"][t_idx])
+            xt.append(float(readings[0].vals[t_idx]))
+            yt.append(float(readings[1].vals[t_idx]))
         x.append(xt)
         y.append(yt)
-    return PKDict(x=x, y=y, z=z.tolist(), t=t)
+    return PKDict(x=x, y=y, z=z, t=t.tolist())
 
 
 def _build_monitor_to_model_fields(data):
@@ -1118,8 +1120,8 @@ def _is_data(row):
 
 
 # arrange historical data for ease of plotting
-def _kicker_settings_for_plots(data, history, start_time):
-    return _monitor_data_for_plots(data, history, start_time, "KICKER")
+def _kicker_settings_for_plots(data, history):
+    return _monitor_data_for_plots(data, history, "KICKER")
 
 
 def _label(col_info, idx):
@@ -1152,7 +1154,7 @@ def _load_file_with_history(report, path, col_info):
     return res
 
 
-def _monitor_data_for_plots(data, history, start_time, type):
+def _monitor_data_for_plots(data, history, type):
     m_data = PKDict()
     _build_monitor_to_model_fields(data)
     for mon_setting in history:
@@ -1165,17 +1167,142 @@ def _monitor_data_for_plots(data, history, start_time, type):
             m_data[el_name] = PKDict()
         el_setting = s_map.setting
         h = history[mon_setting]
-        t_deltas = [
-            round(((dt.days * 86400) + dt.seconds + (dt.microseconds / 1000000)))
-            for dt in [t - start_time for t in h.times]
-        ]
-        pos = numpy.full(len(t_deltas), _position_of_element(data, el["_id"]))
+        pos = numpy.full(len(h.times), _position_of_element(data, el["_id"]))
         m_data[el_name][el_setting] = PKDict(
-            vals=h.vals, times=t_deltas, position=pos.tolist()
+            vals=h.vals, times=h.times, position=pos.tolist()
         )
     return m_data
 
 
+def _monitor_history(store):
+    """Readings by field in arrival order
+
+    Times are whole seconds since the earliest reading.
+
+    Returns:
+        PKDict: field to PKDict(vals, times) arrays
+    """
+    r = _monitor_records(store)
+    t = numpy.round(r[:, 0] - store.minTime)
+    res = PKDict()
+    for i, f in enumerate(store.fields):
+        m = r[:, 1] == i
+        if numpy.any(m):
+            res[f] = PKDict(vals=r[m, 2], times=t[m])
+    return res
+
+
+def _monitor_records(store):
+    """Readings of `_monitor_store` in arrival order
+
+    Copies the ring buffer once it has wrapped, so only called when
+    the history is needed.
+
+    Returns:
+        ndarray: (time, field index, value) rows
+    """
+    r = store.ring
+    n = len(r)
+    if store.count <= n:
+        return r[: store.count]
+    i = store.count % n
+    return numpy.concatenate((r[i:], r[:i]))
+
+
+def _monitor_store(monitor_path):
+    """Append new camonitor log lines to the run's ring buffer
+
+    Readings are stored as (time, field index, value) rows in a
+    preallocated .npy of `_MONITOR_STORE_CAPACITY` rows next to the
+    log. The header records how much of the log has been read, so each
+    call parses only new lines. Once full, the oldest readings are
+    overwritten.
+
+    Returns:
+        PKDict: header (count, fields, latest, minTime) and ring
+            (memory mapped buffer, see `_monitor_records`)
+    """
+    p = pkio.py_path(monitor_path)
+    f = p.new(basename=_MONITOR_STORE_FILE)
+    h = p.new(basename=_MONITOR_STORE_HEADER_FILE)
+    with open(p.new(basename=_MONITOR_STORE_LOCK_FILE), "a") as l:
+        fcntl.flock(l, fcntl.LOCK_EX)
+        s = os.stat(p)
+        res = None
+        if h.exists() and f.exists():
+            res = simulation_db.read_json(h)
+            if res.inode != s.st_ino or res.offset > s.st_size:
+                # log was replaced
+                res = None
+        w = not res
+        if res:
+            r = numpy.lib.format.open_memmap(str(f), mode="r+")
+        else:
+            res = PKDict(
+                base=None,
+                count=0,
+                fields=[],
+                inode=s.st_ino,
+                latest=PKDict(),
+                minTime=0,
+                offset=0,
+            )
+            r = numpy.lib.format.open_memmap(
+                str(f),
+                mode="w+",
+                dtype=numpy.float64,
+                shape=(_MONITOR_STORE_CAPACITY, 3),
+            )
+        with open(p, "rb") as x:
+            x.seek(res.offset)
+            b = x.read(s.st_size - res.offset)
+        # complete lines only, the rest is read on the next call
+        b = b[: b.rfind(b"\n") + 1]
+        if b:
+            w = True
+            res.offset += len(b)
+            a = _monitor_store_parse(res, b.decode())
+            if len(a):
+                n = len(r)
+                res.count += len(a)
+                # only the last n fit
+                a = a[-n:]
+                i = (res.count - len(a)) % n
+                k = min(len(a), n - i)
+                r[i : i + k] = a[:k]
+                r[: len(a) - k] = a[k:]
+                r.flush()
+        if w:
+            simulation_db.write_json(h, res)
+    res.ring = r
+    return res
+
+
+def _monitor_store_parse(store, text):
+    res = []
+    for line in text.split("\n"):
+        m = _MONITOR_LINE_RE.match(line)
+        if not m:
+            continue
+        t = (
+            datetime.datetime.strptime(m.group(2).strip(), "%Y-%m-%d %H:%M:%S.%f")
+            - datetime.datetime(1970, 1, 1)
+        ).total_seconds()
+        if store.base is None:
+            store.base = t
+        # relative to the first reading to keep sub-second precision
+        t -= store.base
+        store.minTime = min(store.minTime, t)
+        n = re.sub(r"^sr_epics:", "", m.group(1))
+        n = re.sub(r":", "_", n)
+        if n not in store.fields:
+            store.fields.append(n)
+        v = float(m.group(3))
+        store.latest[n] = v
+        res.append((t, store.fields.index(n), v))
+    return numpy.array(res, dtype=numpy.float64).reshape(-1, 3)
+
+
 def _optimization_values(run_dir):
     opt_file = run_dir.join(OPTIMIZER_RESULT_FILE)
     res = None
@@ -1201,35 +1328,6 @@ def _read_epics_kickers(data):
     )
 
 
-def _read_monitor_file(monitor_path, history=False):
-    from datetime import datetime
-
-    monitor_values = PKDict()
-    count = 0
-    min_time = datetime.max
-    # TODO(pjm): currently reading entire file to get list of current values (most recent at bottom)
-    for line in pkio.read_text(str(monitor_path)).split("\n"):
-        m = re.match(r"(\S+)(.*?)\s([\d\.e\-\+]+)\s*$", line)
-        if not m:
-            continue
-        var_name = m.group(1)
-        timestamp = m.group(2)
-        t = datetime.strptime(timestamp.strip(), "%Y-%m-%d %H:%M:%S.%f")
-        min_time = min(min_time, t)
-        var_value = m.group(3)
-        var_name = re.sub(r"^sr_epics:", "", var_name)
-        var_name = re.sub(r":", "_", var_name)
-        if not history:
-            monitor_values[var_name] = float(var_value)
-        else:
-            if var_name not in monitor_values:
-                monitor_values[var_name] = PKDict(vals=[], times=[])
-            monitor_values[var_name].vals.append(float(var_value))
-            monitor_values[var_name].times.append(t)
-        count += 1
-    return monitor_values, count, min_time
-
-
 def _report_info(run_dir, data):
     report = data.models[data.report]
     path = str(run_dir.join(_analysis_data_path(data)))
@@ -1245,11 +1343,11 @@ def _set_index_within_cols(col_info, idx):
     return idx
 
 
-def _setting_plots_by_position(data, history, start_time):
+def _setting_plots_by_position(data, history):
     plots = []
     all_z = numpy.array([0.0])
     c = []
-    kickers = _kicker_settings_for_plots(data, history, start_time)
+    kickers = _kicker_settings_for_plots(data, history)
     k_sorted = []
     for k_name in sorted([k for k in kickers]):
         if k_name not in [kk[0] for kk in k_sorted]:
@@ -1300,11 +1398,11 @@ def _setting_plots_by_position(data, history, start_time):
     return numpy.array([0.0, _element_positions(data)[-1]]), plots, c
 
 
-def _setting_plots_by_time(data, history, start_time):
+def _setting_plots_by_time(data, history):
     plots = []
     current_time = 0
     c = []
-    kickers = _kicker_settings_for_plots(data, history, start_time)
+    kickers = _kicker_settings_for_plots(data, history)
     k_sorted = []
     for k_name in sorted([k for k in kickers]):
         if k_name not in [kk[0] for kk in k_sorted]:
@@ -8,8 +8,9 @@ from __future__ import absolute_import, division, print_function
 from pykern import pkcompat
 from pykern import pkio
 from pykern import pkjinja
+from pykern import pkjson
 from pykern.pkcollections import PKDict
-from pykern.pkdebug import pkdc, pkdp
+from pykern.pkdebug import pkdc, pkdlog, pkdp
 from sirepo import simulation_db
 from sirepo.template import lattice, template_common, zgoubi_importer, zgoubi_parser
 import copy
@@ -18,9 +19,11 @@ import jinja2
 import locale
 import math
 import numpy as np
+import os
 import py.path
 import re
 import sirepo.sim_data
+import tempfile
 import werkzeug
 import zipfile
 
@@ -43,6 +46,14 @@ _TUNES_FILE = "tunesFromFai_spctra.Out"
 
 _ZGOUBI_COMMAND_FILE = "zgoubi.dat"
 
+#: typed columns of a data file, one .npy per column (see `_read_columns`)
+_COLUMNS_SUFFIX = ".columns"
+
+_COLUMNS_INDEX_FILE = "index.json"
+
+#: comment and blank lines between data rows
+_COLUMNS_SKIP_RE = re.compile(r"^\s*(?:#.*)?\n", flags=re.MULTILINE)
+
 _ZGOUBI_FAI_DATA_FILE = "zgoubi.fai"
 
 _ZGOUBI_FIT_VALUES_FILE = "zgoubi.FITVALS.out"
@@ -492,11 +503,8 @@ def python_source_for_model(data, model=None):
 
 
 def read_frame_count(run_dir):
-    data_file = run_dir.join(_ZGOUBI_FAI_DATA_FILE)
-    if data_file.exists():
-        col_names, rows = _read_data_file(data_file)
-        ipasses = _ipasses_for_data(col_names, rows)
-        return len(ipasses) + 1
+    if run_dir.join(_ZGOUBI_FAI_DATA_FILE).exists():
+        return len(_read_step_ranges(run_dir).steps) + 1
     return 0
 
 
@@ -554,10 +562,12 @@ def save_sequential_report_data(data, run_dir):
         )
     elif "bunchReport" in report_name:
         report = data.models[report_name]
-        col_names, rows = _read_data_file(
-            py.path.local(run_dir).join(_ZGOUBI_FAI_DATA_FILE)
+        res = _extract_heatmap_data(
+            report,
+            _read_columns(py.path.local(run_dir).join(_ZGOUBI_FAI_DATA_FILE)),
+            slice(None),
+            "",
         )
-        res = _extract_heatmap_data(report, col_names, rows, "")
         summary_file = py.path.local(run_dir).join(BUNCH_SUMMARY_FILE)
         if summary_file.exists():
             res.summaryData = PKDict(bunch=simulation_db.read_json(summary_file))
@@ -592,28 +602,19 @@ def write_parameters(
 
 
 def _compute_range_across_frames(run_dir, data):
+    r = template_common.merge_step_ranges(_read_step_ranges(run_dir).steps)
     res = PKDict()
-    for v in SCHEMA.enum.PhaseSpaceCoordinate:
-        res[v[0]] = []
-    for v in SCHEMA.enum.EnergyPlotVariable:
-        res[v[0]] = []
-    col_names, rows = _read_data_file(
-        py.path.local(run_dir).join(_ZGOUBI_FAI_DATA_FILE)
-    )
-    for field in res:
-        values = column_data(field, col_names, rows)
+    for field in _step_range_fields(initial=False):
+        res[field] = r[field]
         initial_field = _initial_phase_field(field)
-        if initial_field in col_names:
-            values += column_data(initial_field, col_names, rows)
-        if res[field]:
-            res[field][0] = min(min(values), res[field][0])
-            res[field][1] = max(max(values), res[field][1])
-        else:
-            res[field] = [min(values), max(values)]
+        if initial_field in r:
+            res[field] = [
+                min(res[field][0], r[initial_field][0]),
+                max(res[field][1], r[initial_field][1]),
+            ]
     for field in list(res.keys()):
         factor = _ANIMATION_FIELD_INFO[field][1]
-        res[field][0] *= factor
-        res[field][1] *= factor
+        res[field] = [res[field][0] * factor, res[field][1] * factor]
         res[_initial_phase_field(field)] = res[field]
     return res
 
@@ -649,38 +650,27 @@ def _extract_animation(frame_args):
                 frame_args[f] = _initial_phase_field(frame_args[f])
             frame_index = 1
     model.update(frame_args)
-    if r == "elementStepAnimation":
-        col_names, all_rows = _read_data_file(
-            frame_args.run_dir.join(_ZGOUBI_PLT_DATA_FILE)
+    d = _read_columns(
+        frame_args.run_dir.join(
+            _ZGOUBI_PLT_DATA_FILE
+            if r == "elementStepAnimation"
+            else _ZGOUBI_FAI_DATA_FILE
         )
-    else:
-        col_names, all_rows = _read_data_file(
-            frame_args.run_dir.join(_ZGOUBI_FAI_DATA_FILE)
-        )
-    ipasses = _ipasses_for_data(col_names, all_rows)
-    ipass = int(ipasses[frame_index - 1])
-    rows = []
-    ipass_index = int(col_names.index("IPASS"))
-    it_index = int(col_names.index("IT"))
-    kex_index = int(col_names.index("KEX"))
+    )
+    ipass = d.ipasses[frame_index - 1]
     it_filter = None
     if _particle_count(frame_args.sim_in) <= SCHEMA.constants.maxFilterPlotParticles:
         if frame_args.particleSelector != "all":
             it_filter = frame_args.particleSelector
-
-    count = 0
-    el_names = []
-    for row in all_rows:
-        if not is_frame_0:
-            if row[kex_index] != "1":
-                # particle isn't active
-                continue
-        if frame_args.showAllFrames == "1":
-            if it_filter and row[it_index] != it_filter:
-                continue
-            rows.append(row)
-        elif int(row[ipass_index]) == ipass:
-            rows.append(row)
+    if frame_args.showAllFrames == "1":
+        rows = np.arange(len(d.columns[0]) if d.columns else 0)
+        if it_filter:
+            rows = rows[_column(d, "IT", rows) == float(it_filter)]
+    else:
+        rows = _ipass_rows(d, ipass)
+    if not is_frame_0:
+        # only active particles
+        rows = rows[_column(d, "KEX", rows) == 1]
     if frame_args.showAllFrames == "1":
         title = "All Frames"
         if it_filter:
@@ -691,15 +681,15 @@ def _extract_animation(frame_args):
     else:
         title = "Initial Distribution" if is_frame_0 else "Pass {}".format(ipass)
     if frame_args.get("plotType") == "particle":
-        return _extract_particle_data(model, col_names, rows, title)
-    return _extract_heatmap_data(model, col_names, rows, title)
+        return _extract_particle_data(model, d, rows, title)
+    return _extract_heatmap_data(model, d, rows, title)
 
 
-def _extract_heatmap_data(report, col_names, rows, title):
+def _extract_heatmap_data(report, data, rows, title):
     x_info = _ANIMATION_FIELD_INFO[report.x]
     y_info = _ANIMATION_FIELD_INFO[report.y]
-    x = np.array(column_data(report.x, col_names, rows)) * x_info[1]
-    y = np.array(column_data(report.y, col_names, rows)) * y_info[1]
+    x = _column(data, report.x, rows) * x_info[1]
+    y = _column(data, report.y, rows) * y_info[1]
     return template_common.heatmap(
         [x, y],
         report,
@@ -712,15 +702,15 @@ def _extract_heatmap_data(report, col_names, rows, title):
     )
 
 
-def _extract_particle_data(report, col_names, rows, title):
+def _extract_particle_data(report, data, rows, title):
     x_info = _ANIMATION_FIELD_INFO[report.x]
     y_info = _ANIMATION_FIELD_INFO[report.y]
-    x = np.array(column_data(report.x, col_names, rows)) * x_info[1]
-    y = np.array(column_data(report.y, col_names, rows)) * y_info[1]
-    it = column_data("IT", col_names, rows)
+    x = (_column(data, report.x, rows) * x_info[1]).tolist()
+    y = (_column(data, report.y, rows) * y_info[1]).tolist()
+    it = _column(data, "IT", rows).tolist()
     x_points = []
     points = []
-    if "ENEKI" in col_names:
+    if "ENEKI" in data.colNames:
         # zgoubi.fai
         points_by_num = {}
         for idx in range(len(x)):
@@ -734,21 +724,17 @@ def _extract_particle_data(report, col_names, rows, title):
             points.append(points_by_num[num][1])
     else:
         # zgoubi.plt
-        kley_index = col_names.index("KLEY")
-        label_index = col_names.index("LABEL1")
-        ipass_index = col_names.index("IPASS")
+        kley = _column(data, "KLEY", rows).tolist()
+        label = _column(data, "LABEL1", rows).tolist()
+        ipasses = _column(data, "IPASS", rows).tolist()
         names = []
         current_it = None
         current_ipass = None
         for idx in range(len(x)):
-            ipass = rows[idx][ipass_index]
+            ipass = ipasses[idx]
             if current_it != it[idx] or current_ipass != ipass:
-                el_type = re.sub(r"\'", "", rows[idx][kley_index])
-                name = (
-                    _ELEMENT_NAME_MAP.get(el_type, el_type)
-                    + " "
-                    + rows[idx][label_index]
-                )
+                el_type = re.sub(r"\'", "", str(kley[idx]))
+                name = _ELEMENT_NAME_MAP.get(el_type, el_type) + " " + str(label[idx])
                 if name not in names:
                     names.append(name)
                 current_it = it[idx]
@@ -770,29 +756,26 @@ def _extract_particle_data(report, col_names, rows, title):
 
 
 def _extract_spin_3d(frame_args):
-    col_names, all_rows = _read_data_file(
-        frame_args.run_dir.join(_ZGOUBI_FAI_DATA_FILE)
-    )
-    x_idx = col_names.index("SX")
-    y_idx = col_names.index("SY")
-    z_idx = col_names.index("SZ")
-    points = []
-    it_idx = int(col_names.index("IT"))
+    d = _read_columns(frame_args.run_dir.join(_ZGOUBI_FAI_DATA_FILE))
+    rows = slice(None)
     it_filter = None
     if frame_args.particleSelector != "all":
         it_filter = frame_args.particleSelector
-    for row in all_rows:
-        if it_filter and it_filter != row[it_idx]:
-            continue
-        points.append(row[x_idx])
-        points.append(row[y_idx])
-        points.append(row[z_idx])
+        rows = _column(d, "IT") == float(it_filter)
     return PKDict(
         title="Particle {}".format(it_filter) if it_filter else "All Particles",
-        points=points,
+        points=np.column_stack(
+            [_column(d, x, rows) for x in ("SX", "SY", "SZ")],
+        )
+        .ravel()
+        .tolist(),
     )
 
 
+def _column(data, name, rows=slice(None)):
+    return data.columns[data.colNames.index(name)][rows]
+
+
 def _format_exp(v):
     res = "{:.4e}".format(v)
     res = re.sub(r"e\+00$", "", res)
@@ -910,13 +893,74 @@ def _initial_phase_field(field):
     return _INITIAL_PHASE_MAP.get(field, "{}o".format(field))
 
 
-def _ipasses_for_data(col_names, rows):
-    res = []
-    ipass_index = col_names.index("IPASS")
-    for row in rows:
-        ipass = row[ipass_index]
-        if ipass not in res:
-            res.append(ipass)
+def _ipass_rows(data, ipass):
+    if data.ipassRows:
+        return np.arange(*data.ipassRows[data.ipasses.index(ipass)])
+    return np.flatnonzero(_column(data, "IPASS") == ipass)
+
+
+def _parse_columns(path):
+    t = pkio.read_text(path)
+    col_names = []
+    mode = "title"
+    o = 0
+    for l in io.StringIO(t):
+        o += len(l)
+        col_names, _, mode = _read_data_lines([l], mode, col_names)
+        if mode == "data":
+            break
+    # same clean up as _read_data_lines, but on all data lines at once
+    t = re.sub(r"\![ \t]", "", t[o:] if mode == "data" else "")
+    t = re.sub(r"'(\S*)[ \t]*'", r"'\1'", t)
+    t = _COLUMNS_SKIP_RE.sub("", t)
+    try:
+        r = _parse_columns_loadtxt(t)
+    except ValueError:
+        # uneven rows or a non-numeric value in a numeric column
+        r = [x.split() for x in t.splitlines()]
+        w = max(map(len, r), default=0)
+        r = np.array([x + [""] * (w - len(x)) for x in r], dtype=str).reshape(-1, w)
+        r = [r[:, i] for i in range(w)]
+    res = PKDict(colNames=col_names, columnCount=len(r), columns=[])
+    for c in r:
+        if c.dtype.kind != "f":
+            try:
+                c = c.astype(float)
+            except ValueError:
+                pass
+        res.columns.append(c)
+    res.ipasses = []
+    res.ipassRows = None
+    if "IPASS" in col_names and res.columns:
+        p = _column(res, "IPASS")
+        u, f, n = np.unique(p, return_index=True, return_counts=True)
+        o = np.argsort(f)
+        res.ipasses = [int(x) for x in u[o]]
+        if np.count_nonzero(p[1:] != p[:-1]) == len(u) - 1:
+            # each pass is contiguous
+            res.ipassRows = [[int(f[i]), int(f[i] + n[i])] for i in o]
+    return res
+
+
+def _parse_columns_loadtxt(text):
+    # column types are from the first row
+    v = text[: text.find("\n")].split()
+    if not v:
+        return []
+    c = PKDict({float: [], str: []})
+    for i, x in enumerate(v):
+        try:
+            float(x)
+            c[float].append(i)
+        except ValueError:
+            c[str].append(i)
+    res = [None] * len(v)
+    for t, u in c.items():
+        if not u:
+            continue
+        a = np.loadtxt(io.StringIO(text), dtype=t, comments=None, usecols=u, ndmin=2)
+        for i, x in enumerate(u):
+            res[x] = a[:, i]
     return res
 
 
@@ -988,32 +1032,139 @@ def _prepare_tosca_element(el):
         )
 
 
+def _read_columns(path):
+    """Typed columns of zgoubi.fai or zgoubi.plt
+
+    The text is parsed once into one .npy per column in a generation
+    directory <path>.columns/<mtime_ns>-<size>, so a changed file gets
+    a new generation. Generations are written to a temporary directory
+    and renamed into place, which means readers never see a partial
+    generation. Columns are memory mapped, so the rows of one pass are
+    read with a slice (see `_ipass_rows`).
+
+    Returns:
+        PKDict: colNames, columns, ipasses (in file order), ipassRows
+    """
+    p = pkio.py_path(path)
+    s = os.stat(p)
+    d = p.new(basename=p.basename + _COLUMNS_SUFFIX)
+    g = d.join(f"{s.st_mtime_ns}-{s.st_size}")
+    try:
+        res = pkjson.load_any(pkio.read_text(g.join(_COLUMNS_INDEX_FILE)))
+        res.columns = [
+            np.load(str(g.join(f"{x}.npy")), mmap_mode="r")
+            for x in range(res.columnCount)
+        ]
+        return res
+    except Exception:
+        # missing or removed by a newer generation
+        pass
+    res = _parse_columns(p)
+    t = None
+    try:
+        # dot prefix so not removed as a stale generation
+        t = pkio.py_path(tempfile.mkdtemp(dir=pkio.mkdir_parent(d), prefix="."))
+        for x, c in enumerate(res.columns):
+            np.save(str(t.join(f"{x}.npy")), c)
+        pkio.write_text(
+            t.join(_COLUMNS_INDEX_FILE),
+            pkjson.dump_pretty(
+                PKDict({x: v for x, v in res.items() if x != "columns"}),
+                pretty=False,
+            ),
+        )
+        try:
+            os.rename(t, g)
+        except OSError:
+            if not g.exists():
+                raise
+            # another process wrote the same generation
+        for x in d.listdir():
+            if x != g and not x.basename.startswith("."):
+                pkio.unchecked_remove(x)
+    except Exception as e:
+        pkdlog("unable to write columns={} error={}", g, e)
+    finally:
+        if t:
+            pkio.unchecked_remove(t)
+    return res
+
+
 def _read_data_file(path, mode="title"):
+    with pkio.open_text(str(path)) as f:
+        col_names, rows, _ = _read_data_lines(f, mode, [])
+    return col_names, rows
+
+
+def _read_data_lines(lines, mode, col_names):
     # mode: title -> header -> data
-    col_names = []
     rows = []
-    with pkio.open_text(str(path)) as f:
-        for line in f:
-            if mode == "title":
-                if not re.search(r"^\@", line):
-                    mode = "header"
+    for line in lines:
+        if mode == "title":
+            if not re.search(r"^\@", line):
+                mode = "header"
+            continue
+        # work-around odd header/value "! optimp.f" int twiss output
+        line = re.sub(r"\!\s", "", line)
+        # remove space from quoted values
+        line = re.sub(r"'(\S*)\s*'", r"'\1'", line)
+        if mode == "header":
+            # header row starts with '# <letter>'
+            if re.search(r"^\s*#\s+[a-zA-Z]", line):
+                col_names = re.split(r"\s+", line)
+                col_names = [re.sub(r"\W|_", "", x) for x in col_names[1:]]
+                mode = "data"
+        elif mode == "data":
+            if re.search(r"^\s*#", line):
                 continue
-            # work-around odd header/value "! optimp.f" int twiss output
-            line = re.sub(r"\!\s", "", line)
-            # remove space from quoted values
-            line = re.sub(r"'(\S*)\s*'", r"'\1'", line)
-            if mode == "header":
-                # header row starts with '# <letter>'
-                if re.search(r"^\s*#\s+[a-zA-Z]", line):
-                    col_names = re.split(r"\s+", line)
-                    col_names = [re.sub(r"\W|_", "", x) for x in col_names[1:]]
-                    mode = "data"
-            elif mode == "data":
-                if re.search(r"^\s*#", line):
-                    continue
-                row = re.split(r"\s+", re.sub(r"^\s+", "", line))
-                rows.append(row)
-    return col_names, rows
+            row = re.split(r"\s+", re.sub(r"^\s+", "", line))
+            rows.append(row)
+    return col_names, rows, mode
+
+
+def _read_step_ranges(run_dir):
+    """Ranges of the animation fields by IPASS in zgoubi.fai"""
+
+    def _extend(path, index):
+        if path.size() < index.state.get("offset", 0):
+            index.steps = []
+            index.state = PKDict()
+        s = index.state.pksetdefault(colNames=[], ipasses=[], mode="title", offset=0)
+        with open(path, "rb") as f:
+            f.seek(s.offset)
+            b = f.read()
+        # complete lines only, the rest is read when the file grows
+        b = b[: b.rfind(b"\n") + 1]
+        s.offset += len(b)
+        s.colNames, rows, s.mode = _read_data_lines(
+            pkcompat.from_bytes(b).splitlines(True),
+            s.mode,
+            s.colNames,
+        )
+        if not rows:
+            return
+        f = [x for x in _step_range_fields() if x in s.colNames]
+        v = np.array(
+            [[r[s.colNames.index(x)] for x in f] for r in rows],
+            dtype=float,
+        )
+        i = np.array([r[s.colNames.index("IPASS")] for r in rows])
+        p = PKDict((x, n) for n, x in enumerate(s.ipasses))
+        for x in dict.fromkeys(i.tolist()):
+            if x not in p:
+                p[x] = len(s.ipasses)
+                s.ipasses.append(x)
+                index.steps.append(PKDict())
+            a = v[i == x]
+            r = index.steps[p[x]]
+            for n, k in enumerate(f):
+                m = [float(a[:, n].min()), float(a[:, n].max())]
+                r[k] = [min(m[0], r[k][0]), max(m[1], r[k][1])] if k in r else m
+
+    return template_common.read_step_ranges(
+        py.path.local(run_dir).join(_ZGOUBI_FAI_DATA_FILE),
+        _extend,
+    )
 
 
 def _read_twiss_header(run_dir):
@@ -1042,3 +1193,12 @@ def _read_twiss_header(run_dir):
     res.append(["FIT2 FINAL Y", "Closed Orbit Y [m]", float(rows[0][idx]) / 1e2])
     res.append(["FIT2 FINAL Y'", "Closed Orbit Y' [rad]", float(rows[1][idx]) / 1e3])
     return res
+
+
+def _step_range_fields(initial=True):
+    res = PKDict()
+    for v in SCHEMA.enum.PhaseSpaceCoordinate + SCHEMA.enum.EnergyPlotVariable:
+        res[v[0]] = True
+        if initial:
+            res[_initial_phase_field(v[0])] = True
+    return list(res.keys())
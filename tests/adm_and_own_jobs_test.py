@@ -23,6 +23,13 @@ def test_adm_jobs(auth_fc):
     def _op(fc, sim_type):
         r = fc.sr_post("admJobs", PKDict(simulationType=sim_type))
         pkunit.pkeq("srw", r.jobs[0].simulationType)
+        # running so not waiting for a slot
+        pkunit.pkeq("", r.jobs[0].queuePosition)
+        pkunit.pkok(
+            r.slotWaits.run.count > 0,
+            "expecting run slotWaits={}",
+            r.slotWaits,
+        )
 
     _run_sim(auth_fc, _op)
 
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""test sirepo.binary_msg
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+
+
+def test_round_trip():
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from sirepo import binary_msg
+    import numpy
+
+    v = PKDict(
+        title="t",
+        x_points=list(range(1000)),
+        z_matrix=[[float(i * j) for j in range(30)] for i in range(20)],
+        small=[1.5, 2.5],
+        plots=[PKDict(points=[0.5] * 300, label="p")],
+    )
+    b = binary_msg.dump_bytes(v)
+    pkunit.pkok(binary_msg.is_binary(b), "expecting binary msg")
+    r = binary_msg.load_any(b)
+    pkunit.pkeq("t", r.title)
+    pkunit.pkeq(numpy.dtype("<i4"), r.x_points.dtype)
+    pkunit.pkeq(numpy.dtype("<f4"), r.z_matrix.dtype)
+    pkunit.pkeq((20, 30), r.z_matrix.shape)
+    pkunit.pkeq([1.5, 2.5], r.small)
+    pkunit.pkeq(v, binary_msg.to_lists(r))
+    pkunit.pkeq(
+        v.small,
+        binary_msg.load_any(binary_msg.dump_bytes(PKDict(small=v.small))).small,
+    )
+    pkunit.pkok(
+        not binary_msg.is_binary(binary_msg.dump_bytes(v, want_binary=False)),
+        "expecting JSON when want_binary=False",
+    )
+    pkunit.pkok(
+        not binary_msg.is_binary(binary_msg.dump_bytes(v, convert_lists=False)),
+        "expecting JSON when no numpy arrays and convert_lists=False",
+    )
+    pkunit.pkok(
+        binary_msg.is_binary(binary_msg.dump_bytes(r, convert_lists=False)),
+        "expecting binary with numpy arrays",
+    )
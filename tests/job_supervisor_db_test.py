@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""test job_supervisor job db backends
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from __future__ import absolute_import, division, print_function
+import pytest
+
+
+def test_sqlite_job_db():
+    from pykern import pkio, pkunit
+    from pykern.pkcollections import PKDict
+    import sirepo.job_supervisor
+
+    def _db(uid, status="completed", history=0):
+        return PKDict(
+            computeJid=f"{uid}-sim1-animation",
+            dbUpdateTime=100,
+            history=[PKDict(n=i) for i in range(history)],
+            isPremiumUser=False,
+            lastUpdateTime=100,
+            status=status,
+            uid=uid,
+        )
+
+    d = pkunit.empty_work_dir()
+    sirepo.job_supervisor.create_job_db("json", d).write(_db("u1", history=2))
+    s = sirepo.job_supervisor.create_job_db("sqlite", d, history_max=3)
+    # json dbs are imported
+    pkunit.pkeq(2, len(s.load("u1-sim1-animation").history))
+    with pkunit.pkexcept(FileNotFoundError):
+        s.load("u2-sim1-animation")
+    s.write(_db("u2", status="job_run_purged"))
+    pkunit.pkeq(
+        [("u1", ["u1-sim1-animation"])],
+        list(s.purge_candidates(100, set(), set())),
+    )
+    pkunit.pkeq([], list(s.purge_candidates(100, {"u1"}, set())))
+    x = s.load("u1-sim1-animation")
+    for i in range(2, 5):
+        x = PKDict(x, history=x.history + [PKDict(n=i)])
+        s.write(x)
+    pkunit.pkeq([2, 3, 4], [h.n for h in s.load("u1-sim1-animation").history])
+    # rolled back history entries are written by the next write
+    x = PKDict(x, history=x.history + [PKDict(n=5)])
+    with pkunit.pkexcept(Exception):
+        s._write([x, PKDict(_db("u3"), uid=None)])
+    s.write(x)
+    pkunit.pkeq([3, 4, 5], [h.n for h in s.load("u1-sim1-animation").history])
+    s.evict("u1-sim1-animation")
+    pkunit.pkeq(False, "u1-sim1-animation" in s._history_last)
+    s.write(PKDict(x, history=x.history + [PKDict(n=6)]))
+    pkunit.pkeq([4, 5, 6], [h.n for h in s.load("u1-sim1-animation").history])
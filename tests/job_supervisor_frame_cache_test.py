@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""test job_supervisor simulation frame cache
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from __future__ import absolute_import, division, print_function
+import pytest
+
+_JID = "HsCFbRrQ-RrCoL7rQ-animation"
+
+
+def test_frame_cache(monkeypatch):
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from pykern.pkunit import pkeq
+    from sirepo import job
+    import contextlib
+    import sirepo.auth_db
+    import sirepo.job_supervisor
+    import sirepo.quest
+    import sirepo.sim_data
+    import sirepo.simulation_db
+    import sirepo.srtime
+    import tornado.ioloop
+    import tornado.locks
+
+    sirepo.srtime.init_module()
+    s = sirepo.job_supervisor
+    d = pkunit.empty_work_dir()
+    c = s._FrameCache(disk_bytes=0, memory_bytes=10**6)
+    monkeypatch.setattr(s, "_frame_cache", c)
+    monkeypatch.setattr(s, "_job_db", s.create_job_db("json", d))
+    monkeypatch.setattr(s, "_result_cache", s._ResultCache(0, 0))
+    monkeypatch.setattr(
+        s,
+        "_cfg",
+        PKDict(purge_non_premium_after_secs=-10, purge_non_premium_task_secs=1000),
+    )
+    monkeypatch.setattr(
+        s,
+        "_NEXT_REQUEST_SECONDS",
+        PKDict({job.SEQUENTIAL: 1}),
+    )
+    monkeypatch.setattr(
+        sirepo.sim_data,
+        "get_class",
+        lambda sim_type: PKDict(want_browser_frame_cache=lambda report: True),
+    )
+
+    @contextlib.contextmanager
+    def _quest_start():
+        yield PKDict(auth=PKDict(logged_in_user_set=lambda uid: None))
+
+    monkeypatch.setattr(sirepo.quest, "start", _quest_start)
+    monkeypatch.setattr(
+        sirepo.auth_db,
+        "UserRole",
+        PKDict(uids_of_paid_users=lambda: set()),
+    )
+    monkeypatch.setattr(
+        sirepo.simulation_db,
+        "simulation_run_dir",
+        lambda data: d.join("run"),
+    )
+    sent = []
+
+    class _Job(s._ComputeJob):
+        def __init__(self, req):
+            PKDict.__init__(
+                self,
+                db=self._ComputeJob__db_init_new(req.content),
+                ops=[],
+                status_changed=tornado.locks.Condition(),
+            )
+            self.db.pkupdate(computeJobSerial=1, status=job.COMPLETED)
+
+        def _create_op(self, opName, req, **kwargs):
+            return PKDict(driver=PKDict(driver_details=PKDict()))
+
+        def _raise_if_purged_or_missing(self, req):
+            pass
+
+        def _req_is_valid(self, req):
+            return True
+
+        async def _run(self, *args):
+            pass
+
+        async def _send_with_single_reply(self, opName, req, **kwargs):
+            sent.append(req.content.data.frameIndex)
+            return PKDict(state=job.COMPLETED, frame=req.content.data.frameIndex)
+
+        def _status_reply(self, req):
+            return PKDict(state=self.db.status)
+
+    def _req(**kwargs):
+        return PKDict(
+            content=PKDict(
+                api="api_runSimulation",
+                computeJid=_JID,
+                computeJobHash="h1",
+                computeModel="animation",
+                data=PKDict(
+                    forceRun=True,
+                    frameReport="animation",
+                    models=PKDict(simulation=PKDict(name="sim1")),
+                    **kwargs,
+                ),
+                isParallel=False,
+                jobRunMode=job.SEQUENTIAL,
+                simulationId="RrCoL7rQ",
+                simulationType="srw",
+                uid="HsCFbRrQ",
+            ),
+        )
+
+    async def _frame(index):
+        return await j._receive_api_simulationFrame(_req(frameIndex=index))
+
+    async def _test():
+        pkeq(0, (await _frame(0)).frame)
+        pkeq(0, (await _frame(0)).frame)
+        pkeq(1, (await _frame(1)).frame)
+        # second request for frame 0 did not send an op
+        pkeq([0, 1], sent)
+        pkeq(PKDict(diskHits=0, evictions=0, memoryHits=1, misses=2), c.stats)
+        k = c.key(_JID, j.db.computeJobSerial, _req(frameIndex=0).content.data)
+        await j._receive_api_runSimulation(_req())
+        pkeq(job.PENDING, j.db.status)
+        pkeq(None, await c.frame_get(k))
+        pkeq(0, c._memory_bytes)
+        # new run completes
+        j.db.pkupdate(status=job.COMPLETED, lastUpdateTime=1)
+        s._job_db.write(j.db)
+        pkeq(0, (await _frame(0)).frame)
+        pkeq(0, (await _frame(0)).frame)
+        pkeq([0, 1, 0], sent)
+        pkeq(2, c.stats.memoryHits)
+        await s._ComputeJob.purge_free_simulations()
+        pkeq(job.JOB_RUN_PURGED, s._job_db.load(_JID).status)
+        pkeq(0, c._memory_bytes)
+
+    j = _Job(_req())
+    tornado.ioloop.IOLoop.current().run_sync(_test, timeout=10)
+
+
+def test_frame_cache_disk(monkeypatch):
+    from pykern import pkio
+    from pykern import pkunit
+    from pykern.pkcollections import PKDict
+    from pykern.pkunit import pkeq
+    import sirepo.job_supervisor
+    import sirepo.srdb
+    import tornado.ioloop
+
+    d = pkunit.empty_work_dir().join("frame_cache")
+    monkeypatch.setattr(sirepo.srdb, "supervisor_frame_cache_dir", lambda: d)
+    s = sirepo.job_supervisor
+    pkio.mkdir_parent(d).join(".incomplete").write_binary(b"x")
+    c = s._FrameCache(disk_bytes=10**6, memory_bytes=10**6)
+    # incomplete write removed on start
+    pkeq([], d.listdir())
+    k = c.key(_JID, 1, PKDict(frameIndex=0))
+
+    async def _test():
+        await c.frame_put(k, PKDict(frame=0))
+        pkeq([k], [x.basename for x in d.listdir()])
+        # disk hit after restart
+        n = s._FrameCache(disk_bytes=10**6, memory_bytes=10**6)
+        pkeq(0, (await n.frame_get(k)).frame)
+        pkeq(1, n.stats.diskHits)
+        # truncated entry is removed and is a miss
+        b = d.join(k).read_binary()
+        d.join(k).write_binary(b[: len(b) // 2])
+        n = s._FrameCache(disk_bytes=10**6, memory_bytes=10**6)
+        pkeq(None, await n.frame_get(k))
+        pkeq(PKDict(diskHits=0, evictions=0, memoryHits=0, misses=1), n.stats)
+        pkeq([], d.listdir())
+
+    tornado.ioloop.IOLoop.current().run_sync(_test, timeout=10)
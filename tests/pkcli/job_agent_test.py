@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""test job_agent without a supervisor
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from __future__ import absolute_import, division, print_function
+import pytest
+
+
+def test_sbatch_poller(monkeypatch):
+    from pykern import pkio, pkunit
+    from pykern.pkcollections import PKDict
+    import os
+    import sirepo.pkcli.job_agent
+    import tornado.gen
+    import tornado.ioloop
+
+    d = pkunit.empty_work_dir()
+    for n, o in (
+        ("squeue", "11 RUNNING\n13 PENDING"),
+        ("sacct", "12 COMPLETED\n12.batch COMPLETED"),
+    ):
+        f = d.join(n)
+        pkio.write_text(
+            f,
+            f"""#!/bin/bash
+echo "$@" >> '{d.join(n + ".log")}'
+cat <<'EOF'
+{o}
+EOF
+""",
+        )
+        f.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{d}:{os.environ['PATH']}")
+    p = sirepo.pkcli.job_agent._SbatchPoller()
+
+    class _Run(PKDict):
+        async def sbatch_state(self, state):
+            self.states.append(state)
+            p.remove(self)
+
+    r = [
+        _Run(_sbatch_id=i, msg=PKDict(nextRequestSeconds=0), states=[])
+        for i in ("11", "12")
+    ]
+
+    async def _main():
+        for x in r:
+            p.add(x)
+        while p._polling:
+            await tornado.gen.sleep(0.01)
+
+    tornado.ioloop.IOLoop.current().run_sync(_main, timeout=10)
+    pkunit.pkeq(["RUNNING"], r[0].states)
+    pkunit.pkeq(["COMPLETED"], r[1].states)
+    # one query for all jobs
+    pkunit.pkeq(1, len(pkio.read_text(d.join("squeue.log")).splitlines()))
+    pkunit.pkre("--jobs=12$", pkio.read_text(d.join("sacct.log")).strip())
+
+
+def test_fork_server_handshake():
+    from pykern import pkjson, pkunit
+    from pykern.pkcollections import PKDict
+    import os
+    import socket
+    import sirepo.pkcli.job_agent
+    import threading
+    import time
+    import tornado.gen
+    import tornado.ioloop
+
+    d = pkunit.empty_work_dir()
+    f = d.join("fork.sock")
+    l = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    l.bind(str(f))
+    l.listen(1)
+    m = PKDict()
+
+    def _server():
+        c, _ = l.accept()
+        b, x, _, _ = socket.recv_fds(c, 1024, 2)
+        m.pkupdate(msg=pkjson.load_any(b), fds=len(x))
+        for i in x:
+            os.close(i)
+        # slow fork server
+        time.sleep(0.5)
+        c.sendall(pkjson.dump_bytes(PKDict(pid=123, preloadSecs=1)) + b"\n")
+        c.close()
+
+    threading.Thread(target=_server, daemon=True).start()
+    s = sirepo.pkcli.job_agent._ForkServer.__new__(sirepo.pkcli.job_agent._ForkServer)
+    PKDict.__init__(s, file=f, stats=PKDict(forks=0, savedSecs=0), _subprocess=None)
+    t = []
+
+    async def _tick():
+        while len(t) < 1000:
+            t.append(1)
+            await tornado.gen.sleep(0.01)
+
+    async def _main():
+        tornado.ioloop.IOLoop.current().add_callback(_tick)
+        o = os.pipe()
+        try:
+            return await s.fork(
+                PKDict(
+                    run_dir=d,
+                    job_cmd_env_values=lambda: PKDict(A=1),
+                    _in_file=d.join("in.json"),
+                ),
+                o[1],
+                o[1],
+            )
+        finally:
+            for i in o:
+                os.close(i)
+
+    p, c = tornado.ioloop.IOLoop.current().run_sync(_main, timeout=10)
+    c.close()
+    pkunit.pkeq(123, p)
+    pkunit.pkeq(PKDict(forks=1, savedSecs=1), s.stats)
+    pkunit.pkeq(PKDict(A="1"), m.msg.env)
+    pkunit.pkeq(2, m.fds)
+    # ioloop was not blocked by the handshake
+    pkunit.pkok(len(t) > 10, "ioloop ticks={} during handshake", len(t))
@@ -95,6 +95,30 @@ def test_myapp_sim(fc):
     pkunit.pkok("plots" in r, '"plots" not in response={}', r)
 
 
+def test_myapp_result_cache(fc):
+    from pykern import pkunit
+
+    d = fc.sr_sim_data()
+    w = d.models.dog.weight
+    fc.sr_run_sim(d, _REPORT)
+    d.models.dog.weight = w + 1
+    fc.sr_run_sim(d, _REPORT)
+    d.models.dog.weight = w
+    # run dir for the first weight is restored without running
+    r = fc.sr_post(
+        "runSimulation",
+        dict(
+            forceRun=False,
+            models=d.models,
+            report=_REPORT,
+            simulationId=d.models.simulation.simulationId,
+            simulationType=d.simulationType,
+        ),
+    )
+    pkunit.pkeq("completed", r.state)
+    pkunit.pkok("plots" in r, '"plots" not in response={}', r)
+
+
 def test_srw_cancel(fc):
     from pykern import pkunit, pkcompat
     import subprocess
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""test sim_db_file GET Range and streamed PUT
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from __future__ import absolute_import, division, print_function
+import pytest
+
+_UID = "HsCFbRrQ"
+
+_PATH = f"user/{_UID}/elegant/RrCoL7rQ/"
+
+
+def setup_module(module):
+    from sirepo import srunit
+
+    srunit.setup_srdb_root()
+
+
+def test_range():
+    from pykern import pkio
+    from pykern.pkcollections import PKDict
+    from pykern.pkunit import pkeq, pkne
+    import sirepo.srdb
+
+    d = pkio.mkdir_parent(sirepo.srdb.root().join(_PATH))
+    pkio.write_text(d.join("a.txt"), "0123456789")
+
+    async def _test(fetch):
+        r = await fetch("a.txt")
+        pkeq(200, r.code)
+        pkeq(b"0123456789", r.body)
+        e = r.headers["Etag"]
+        for h, c, b, x in (
+            ("bytes=2-4", 206, b"234", "bytes 2-4/10"),
+            ("bytes=7-", 206, b"789", "bytes 7-9/10"),
+            ("bytes=-3", 206, b"789", "bytes 7-9/10"),
+            ("bytes=5-100", 206, b"56789", "bytes 5-9/10"),
+            ("bytes=10-", 416, b"", "bytes */10"),
+        ):
+            r = await fetch("a.txt", headers=PKDict(Range=h, **{"If-Range": e}))
+            pkeq(c, r.code)
+            pkeq(b, r.body)
+            pkeq(x, r.headers.get("Content-Range"))
+        # file changed so whole file
+        r = await fetch("a.txt", headers=PKDict(Range="bytes=2-4", **{"If-Range": "x"}))
+        pkeq(200, r.code)
+        pkeq(b"0123456789", r.body)
+        pkne(None, r.headers.get("Accept-Ranges"))
+
+    _run(_test)
+
+
+def test_put_abort():
+    from pykern import pkio
+    from pykern.pkunit import pkeq
+    import sirepo.srdb
+    import tornado.gen
+    import tornado.tcpclient
+
+    d = pkio.mkdir_parent(sirepo.srdb.root().join(_PATH))
+
+    async def _test(fetch):
+        r = await fetch("b.txt", method="PUT", body="complete")
+        pkeq(200, r.code)
+        pkeq("complete", pkio.read_text(d.join("b.txt")))
+        # replace fails, because target is a directory
+        pkio.mkdir_parent(d.join("x", "y"))
+        r = await fetch("x", method="PUT", body="fails")
+        pkeq(500, r.code)
+        pkeq([], d.listdir(lambda x: x.basename.startswith(".")))
+        s = await tornado.tcpclient.TCPClient().connect("127.0.0.1", fetch.port)
+        await s.write(
+            "\r\n".join(
+                (
+                    f"PUT /sim-db-file/{_PATH}c.txt HTTP/1.1",
+                    "Host: 127.0.0.1",
+                    f"Authorization: Bearer {fetch.token}",
+                    "Content-Length: 1000",
+                    "",
+                    "partial",
+                )
+            ).encode()
+        )
+        for _ in range(100):
+            if d.listdir(lambda x: x.basename.startswith(".")):
+                break
+            await tornado.gen.sleep(0.01)
+        pkeq(1, len(d.listdir(lambda x: x.basename.startswith("."))))
+        s.close()
+        for _ in range(100):
+            if not d.listdir(lambda x: x.basename.startswith(".")):
+                break
+            await tornado.gen.sleep(0.01)
+        pkeq([], d.listdir(lambda x: x.basename.startswith(".")))
+        pkeq(False, d.join("c.txt").exists())
+
+    _run(_test)
+
+
+def _run(op):
+    from pykern.pkcollections import PKDict
+    import sirepo.job
+    import sirepo.sim_db_file
+    import tornado.httpclient
+    import tornado.httpserver
+    import tornado.ioloop
+    import tornado.testing
+    import tornado.web
+
+    t = sirepo.sim_db_file.token_for_user(_UID)
+    s, p = tornado.testing.bind_unused_port()
+
+    async def _fetch(path, headers=None, **kwargs):
+        return await tornado.httpclient.AsyncHTTPClient().fetch(
+            f"http://127.0.0.1:{p}{sirepo.job.SIM_DB_FILE_URI}/{_PATH}{path}",
+            headers=PKDict(Authorization=f"Bearer {t}", **(headers or {})),
+            raise_error=False,
+            **kwargs,
+        )
+
+    async def _main():
+        h = tornado.httpserver.HTTPServer(
+            tornado.web.Application(
+                [(sirepo.job.SIM_DB_FILE_URI + "/(.+)", sirepo.sim_db_file.FileReq)],
+            ),
+        )
+        h.add_sockets([s])
+        try:
+            _fetch.port = p
+            _fetch.token = t
+            await op(_fetch)
+        finally:
+            h.stop()
+
+    tornado.ioloop.IOLoop.current().run_sync(_main, timeout=10)
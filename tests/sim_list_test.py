@@ -146,3 +146,53 @@ def test_srw_discard_example(fc):
         "incomplete python={}",
         r.data,
     )
+
+
+def test_list_catalog(fc):
+    from pykern import pkio
+    from pykern.pkcollections import PKDict
+    from pykern.pkunit import pkeq
+    import sirepo.srdb
+
+    def _names():
+        return sorted(
+            r.name
+            for r in fc.sr_post(
+                "listSimulations",
+                PKDict(
+                    simulationType=fc.sr_sim_type,
+                    search=PKDict({"simulation.folder": "/catalog"}),
+                ),
+            )
+        )
+
+    d = fc.sr_sim_data()
+    d = fc.sr_post(
+        "newSimulation",
+        d.copy().pkupdate(name="catalog 1", folder="catalog"),
+    )
+    pkeq(["catalog 1"], _names())
+    d.models.simulation.name = "catalog 2"
+    fc.sr_post("saveSimulationData", d)
+    pkeq(["catalog 2"], _names())
+    p = sirepo.srdb.root().join(
+        "user",
+        fc.sr_uid,
+        fc.sr_sim_type,
+        d.models.simulation.simulationId,
+        "sirepo-data.json",
+    )
+    b = pkio.read_text(p)
+    # unparsable file is not listed from a stale entry
+    pkio.write_text(p, "{")
+    pkeq([], _names())
+    pkio.write_text(p, b)
+    pkeq(["catalog 2"], _names())
+    fc.sr_post(
+        "deleteSimulation",
+        PKDict(
+            simulationType=fc.sr_sim_type,
+            simulationId=d.models.simulation.simulationId,
+        ),
+    )
+    pkeq([], _names())
@@ -37,6 +37,29 @@ def test_last_modified(fc):
     )
 
 
+def test_schema_cache(fc):
+    from pykern import pkunit
+    from sirepo import simulation_db
+    import sirepo.srdb
+
+    s = simulation_db.get_schema("myapp")
+    pkunit.pkeq(
+        1,
+        len(sirepo.srdb.schema_cache_dir().listdir("*.pickle")),
+        "expecting compiled schemas in cache",
+    )
+    # reads the compiled schemas this time
+    simulation_db._init_schemas()
+    c = simulation_db.get_schema("myapp")
+    pkunit.pkeq(s, c)
+    pkunit.pkok(
+        simulation_db.SCHEMA_COMMON.appInfo is c.appInfo,
+        "expecting appInfo shared with SCHEMA_COMMON",
+    )
+    r = simulation_db.compile_schemas()
+    pkunit.pkok(r.loadSecs > 0 and r.compileSecs > 0, "invalid benchmark={}", r)
+
+
 def test_uid():
     _do(
         "/sim-db-file/user/xxx/elegant/RrCoL7rQ/flash_exe-SwBZWpYFR-PqFi81T6rQ8g",
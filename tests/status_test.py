@@ -12,7 +12,7 @@ import pytest
 
 def test_basic(auth_fc, monkeypatch):
     from pykern import pkconfig, pkcompat
-    from pykern.pkunit import pkeq
+    from pykern.pkunit import pkeq, pkok
     from sirepo import srunit
     import base64
     import sirepo.auth.basic
@@ -37,3 +37,13 @@ def test_basic(auth_fc, monkeypatch):
         ),
     )
     pkeq("ok", r.state)
+    pkok(
+        r.jobApiLatency.apis.api_runSimulation.count > 0,
+        "expecting runSimulation latency={}",
+        r.jobApiLatency,
+    )
+    pkok(
+        "misses" in r.supervisorCaches.frameCache,
+        "expecting frameCache stats={}",
+        r.supervisorCaches,
+    )
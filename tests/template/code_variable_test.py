@@ -236,6 +236,25 @@ def test_eval2():
     pkeq(0.042466423001805254, code_var.eval_var("l3y12l29")[0])
 
 
+def test_eval_var_errors():
+    from pykern.pkcollections import PKDict
+    from pykern.pkunit import pkeq
+    from sirepo.template.code_variable import CodeVar, PurePythonEval
+
+    code_var = CodeVar(
+        [
+            PKDict(name="a", value="c"),
+            PKDict(name="b", value="a * 3"),
+            PKDict(name="c", value="b + d"),
+            PKDict(name="e", value="7"),
+        ],
+        PurePythonEval(),
+    )
+    pkeq(7, code_var.eval_var("e + 0")[0])
+    pkeq("unknown token: d", code_var.eval_var("d")[1])
+    pkeq("circular dependency: b", code_var.eval_var("b")[1])
+
+
 def test_infix_to_postfix():
     from pykern.pkcollections import PKDict
     from pykern.pkunit import pkeq
@@ -58,6 +58,28 @@ def test_controls_position2(fc):
     _run_test(sim, "initialMonitorPositionsReport", "device_server_position.txt")
 
 
+def test_read_summary_line():
+    from pykern.pkunit import pkeq
+    from sirepo.template import controls
+
+    d = pkunit.empty_work_dir()
+    c = d.join("summary.csv")
+    l = ["a,cost\n"] + [f"{i},{i / 2}\n" for i in range(5)]
+    i = b""
+    for n in range(len(l)):
+        i += len("".join(l[: n + 1])).to_bytes(8, "little")
+    # last row is not indexed yet
+    pkio.write_text(c, "".join(l) + "9,")
+    d.join("summary.index").write_binary(i[:-8])
+    pkeq([PKDict(a="3", cost="1.5")], controls.read_summary_line(d)[0])
+    pkeq(["2", "3"], [r.a for r in controls.read_summary_line(d, 2)[0]])
+    pkeq(4, len(controls.read_summary_line(d, 10)[0]))
+    # runs without an index are read in full
+    d.join("summary.index").remove()
+    pkio.write_text(c, "".join(l))
+    pkeq(["3", "4"], [r.a for r in controls.read_summary_line(d, 2)[0]])
+
+
 def _run_test(sim, report, expect_file):
     from sirepo.template import controls
 
@@ -34,6 +34,34 @@ def test_extract_tfs_pages():
     pkeq(len(res.s), 75)
 
 
+def test_read_tfs_columns(monkeypatch):
+    from pykern.pkunit import pkeq
+    from sirepo.template import madx_parser
+    import numpy
+
+    monkeypatch.setattr(madx_parser, "_TFS_INDEX_SIDECAR_MIN_BYTES", 0)
+    d = pkunit.empty_work_dir()
+    for n in ("ptc_track.file.tfs", "twiss.file.tfs"):
+        pkunit.data_dir().join(n).copy(d.join(n))
+    path = d.join("ptc_track.file.tfs")
+    res = madx_parser.read_tfs_columns(path, columns=("x", "s"), want_page=3)
+    pkeq(["s", "x"], sorted(res.keys()))
+    pkeq(
+        [float(x) for x in madx_parser.parse_tfs_file(path, want_page=3).x],
+        res.x.tolist(),
+    )
+    pkeq(numpy.float64, res.s.dtype)
+    pkeq(75, len(madx_parser.read_tfs_columns(path).turn))
+    # index is cached next to the file and revalidated when the file changes
+    pkeq(True, path.new(basename=path.basename + ".index.json").exists())
+    pkeq(len(madx_parser.parse_tfs_page_info(path)), 15)
+    pkio.write_text(path, "".join(pkio.read_text(path).splitlines(True)[:20]))
+    pkeq(2, len(madx_parser.tfs_index(path).pages))
+    res = madx_parser.read_tfs_columns(d.join("twiss.file.tfs"))
+    pkeq(['"RING$START"', '"D3"'], res.name.tolist())
+    pkeq([11.639, 14.73204923], res.betx.tolist())
+
+
 def test_parse_madx_file():
     from pykern import pkio, pkjson
     from pykern.pkunit import pkeq
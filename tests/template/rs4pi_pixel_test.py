@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""PyTest for pixel planes of :mod:`sirepo.template.rs4pi`
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from __future__ import absolute_import, division, print_function
+from pykern import pkunit
+import pytest
+
+
+def test_read_pixel_plane(monkeypatch):
+    from pykern.pkunit import pkeq
+    from sirepo.template import rs4pi
+    import numpy
+    import os
+
+    d = pkunit.empty_work_dir()
+    p = d.join("pixels3d.dat")
+    monkeypatch.setattr(rs4pi, "_pixel_filename", lambda simulation: str(p))
+    # 3 t frames of 4 rows (c) by 5 columns (s)
+    v = numpy.arange(3 * 4 * 5, dtype=numpy.float32).reshape(3, 4, 5)
+    v.tofile(str(p))
+    data = dict(
+        models=dict(
+            simulation=dict(),
+            dicomSeries=dict(
+                planes=dict(
+                    t=dict(frameCount=3),
+                    c=dict(frameCount=4),
+                    s=dict(frameCount=5),
+                ),
+            ),
+        ),
+    )
+
+    def _assert_planes(volume):
+        for i in range(3):
+            pkeq(volume[i].tolist(), rs4pi._read_pixel_plane("t", i, data))
+        for i in range(4):
+            pkeq(
+                numpy.flipud(volume[:, i, :]).tolist(),
+                rs4pi._read_pixel_plane("c", i, data),
+            )
+        for i in range(5):
+            pkeq(
+                numpy.flipud(volume[:, :, i]).tolist(),
+                rs4pi._read_pixel_plane("s", i, data),
+            )
+
+    _assert_planes(v)
+    c = d.join("pixels3d-c.dat")
+    s = d.join("pixels3d-s.dat")
+    pkeq(True, c.check())
+    pkeq(True, s.check())
+    pkeq(False, d.join("pixels3d-t.dat").check())
+    pkeq([], d.listdir("*.tmp"))
+    # transposed copies are reused
+    t = c.mtime()
+    _assert_planes(v)
+    pkeq(t, c.mtime())
+    # and regenerated when the pixel file is newer
+    v = v * 2
+    v.tofile(str(p))
+    os.utime(str(p), (t + 10, t + 10))
+    _assert_planes(v)
+    with pkunit.pkexcept(RuntimeError):
+        rs4pi._read_pixel_plane("x", 0, data)
+
+
+def test_fixup_pixel_planes(monkeypatch):
+    from pykern import pkio
+    from pykern.pkcollections import PKDict
+    from pykern.pkunit import pkeq
+    from sirepo import simulation_db
+    from sirepo.template import rs4pi
+    import numpy
+
+    d = pkunit.empty_work_dir()
+    monkeypatch.setattr(
+        rs4pi, "_sim_file", lambda sim_id, filename: str(d.join(filename))
+    )
+    s = PKDict(simulationId="x")
+    v = numpy.arange(3 * 4 * 5, dtype=numpy.float32).reshape(3, 4, 5)
+    v.tofile(rs4pi._pixel_filename(s))
+    pkio.mkdir_parent(d.join(rs4pi._DICOM_DIR))
+    for i in range(3):
+        simulation_db.write_json(
+            rs4pi._dicom_path(s, "t", i),
+            PKDict(
+                shape=[4, 5],
+                ImagePositionPatient=["1", "2", str(i * 2.5)],
+                PixelSpacing=[0.5, 0.5],
+            ),
+        )
+    # geometry of a series imported with c as columns and s as rows
+    for p, n in ("c", 5), ("s", 4):
+        for i in range(n):
+            simulation_db.write_json(rs4pi._dicom_path(s, p, i), PKDict(shape=[3, 4]))
+        pkio.write_text(rs4pi._pixel_plane_filename(rs4pi._pixel_filename(s), p), "x")
+    data = PKDict(
+        models=PKDict(
+            simulation=s,
+            dicomSeries=PKDict(
+                planes=PKDict(
+                    t=rs4pi._frame_info(3),
+                    c=rs4pi._frame_info(5),
+                    s=rs4pi._frame_info(4),
+                ),
+            ),
+        ),
+    )
+    rs4pi.fixup_pixel_planes(data)
+    p = data.models.dicomSeries.planes
+    pkeq([4, 5], data.models.dicomSeries.pixelShape)
+    pkeq([4, 5], [p.c["frameCount"], p.s["frameCount"]])
+    for x, n, shape in ("c", 4, [3, 5]), ("s", 5, [3, 4]):
+        pkeq(n, len(d.join(rs4pi._DICOM_DIR).listdir(f"{x}*")))
+        pkeq(shape, simulation_db.read_json(rs4pi._dicom_path(s, x, n - 1)).shape)
+    pkeq(2.5, simulation_db.read_json(rs4pi._dicom_path(s, "c", 0)).PixelSpacing[1])
+    for i in range(4):
+        pkeq(numpy.flipud(v[:, i, :]).tolist(), rs4pi._read_pixel_plane("c", i, data))
+    for i in range(5):
+        pkeq(numpy.flipud(v[:, :, i]).tolist(), rs4pi._read_pixel_plane("s", i, data))
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""PyTest for :mod:`sirepo.template.sdds_util`
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from __future__ import absolute_import, division, print_function
+from pykern import pkunit
+import pytest
+
+
+def test_extract_sdds_columns():
+    from pykern.pkunit import pkeq, pkok
+    from sirepo.template import sdds_util
+    import sdds
+
+    def _def(field, sdds_index=0):
+        return sdds.sddsdata.GetColumnDefinition(sdds_index, field)
+
+    def _page(field, sdds_index=0):
+        return sdds.sddsdata.GetColumn(
+            sdds_index,
+            sdds.sddsdata.GetColumnNames(sdds_index).index(field),
+        )
+
+    f = str(pkunit.data_dir().join("pages.sdds"))
+    c = ["x", "p", "particleID"]
+    # backwards and repeated pages reopen or hit the cache
+    for p in (2, 0, 1, 1, 2):
+        r = sdds_util.extract_sdds_columns(f, c, p)
+        pkeq(None, r.err)
+        for x in c:
+            pkeq(sdds_util.process_sdds_page(f, p, _page, x), r.columns[x].tolist())
+            pkeq(sdds_util.process_sdds_page(f, p, _def, x), r.column_defs[x])
+    # last page 2 came from the page cache, so the input is still at page 1
+    pkeq(1, sdds_util._open_inputs[f].page)
+    pkok(sdds_util.extract_sdds_columns(f, c, 2) is r, "page 2 not cached")
+    a = sdds_util.read_sdds_pages(f, c, group_by_page_number=True)
+    for p in range(3):
+        for x in c:
+            pkeq(
+                a[x][p],
+                sdds_util.extract_sdds_columns(f, c, p).columns[x].tolist(),
+            )
+    r = sdds_util.extract_sdds_column(f, "xp", 1)
+    pkeq(sdds_util.process_sdds_page(f, 1, _page, "xp"), r["values"])
+    pkok(sdds_util.extract_sdds_columns(f, c, 3).err, "page 3 does not exist")
+    pkok(
+        sdds_util.extract_sdds_columns(f + "-missing", c, 0).err,
+        "file does not exist",
+    )
+
+
+def test_twiss_to_madx():
+    from sirepo.template import sdds_util
+
+    m = pkunit.empty_work_dir().join("twiss.madx")
+    sdds_util.twiss_to_madx(str(pkunit.data_dir().join("twiss.sdds")), str(m))
+    pkunit.file_eq(pkunit.data_dir().join("twiss.madx"), actual_path=m)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""PyTest for 3d report sidecars of :mod:`sirepo.template.srw`
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from __future__ import absolute_import, division, print_function
+import pytest
+
+
+def test_report_sidecar():
+    from pykern import pkio, pkunit
+    from pykern.pkunit import pkeq, pkne
+    from sirepo.template import srw
+    import os
+
+    p = pkunit.empty_work_dir().join("res_int_pr_me.dat")
+    pkio.write_text(p, _intensity_file(1))
+    a, r, k = srw._load_report_data(str(p), 3)
+    pkeq([1.0, 2.0, 3.0, 4.0, 5.0, 6.0], a.tolist())
+    pkeq(True, p.new(basename=p.basename + ".npy").exists())
+    b, r2, k2 = srw._load_report_data(str(p), 3)
+    pkeq(k, k2)
+    pkeq(list(r), list(r2))
+    pkeq(a.tolist(), b.tolist())
+    # memory mapped read-only from the sidecar
+    pkeq(False, b.flags.writeable)
+    # size changes
+    pkio.write_text(p, _intensity_file(10))
+    c, _, k3 = srw._load_report_data(str(p), 3)
+    pkne(k, k3)
+    pkeq(10.0, c[0])
+    # same size, only mtime changes
+    s = os.stat(p)
+    pkio.write_text(p, _intensity_file(20))
+    pkeq(s.st_size, os.stat(p).st_size)
+    os.utime(p, ns=(s.st_atime_ns, s.st_mtime_ns + 10**9))
+    c, _, k4 = srw._load_report_data(str(p), 3)
+    pkne(k3, k4)
+    pkeq(20.0, c[0])
+
+
+def _intensity_file(start):
+    return (
+        "\n".join(
+            (
+                "#C-aligned Intensity (inner loop is vs X, outer loop is vs Y)",
+                "#1000.0 #Initial Photon Energy [eV]",
+                "#1000.0 #Final Photon Energy [eV]",
+                "#1 #Number of points vs Photon Energy",
+                "#-0.001 #Initial Horizontal Position [m]",
+                "#0.001 #Final Horizontal Position [m]",
+                "#3 #Number of points vs Horizontal Position",
+                "#-0.001 #Initial Vertical Position [m]",
+                "#0.001 #Final Vertical Position [m]",
+                "#2 #Number of points vs Vertical Position",
+            )
+            + tuple(f"{float(start + i):.1f}" for i in range(6))
+        )
+        + "\n"
+    )
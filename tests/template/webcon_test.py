@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""PyTest for :mod:`sirepo.template.webcon`
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from __future__ import absolute_import, division, print_function
+from pykern import pkio
+from pykern import pkunit
+import pytest
+
+
+def test_monitor_store(monkeypatch):
+    from pykern.pkunit import pkeq
+    from sirepo.template import webcon
+
+    monkeypatch.setattr(webcon, "_MONITOR_STORE_CAPACITY", 4)
+    p = pkunit.empty_work_dir().join(webcon.MONITOR_LOGFILE)
+    l = [
+        f"sr_epics:bpm1:{f}  2023-01-01 00:00:0{i}.{i}00000 {i}.5"
+        for i in range(5)
+        for f in ("x", "y")
+    ]
+    # last line is incomplete
+    pkio.write_text(p, "\n".join(l[:3]) + "\n" + l[3][:10])
+    s = webcon._monitor_store(p)
+    pkeq(3, s.count)
+    pkeq(dict(bpm1_x=1.5, bpm1_y=0.5), dict(s.latest))
+    # header is not rewritten when there are no new lines
+    h = p.new(basename=webcon._MONITOR_STORE_HEADER_FILE)
+    t = h.mtime()
+    h.setmtime(t - 10)
+    pkeq(3, webcon._monitor_store(p).count)
+    pkeq(t - 10, h.mtime())
+    with open(p, "a") as f:
+        f.write(l[3][10:] + "\n" + "\n".join(l[4:]) + "\n")
+    s = webcon._monitor_store(p)
+    pkeq(10, s.count)
+    # oldest readings were overwritten
+    pkeq([3.5, 3.5, 4.5, 4.5], webcon._monitor_records(s)[:, 2].tolist())
+    h = webcon._monitor_history(s)
+    pkeq([3.0, 4.0], h.bpm1_x.times.tolist())
+    pkeq([3.5, 4.5], h.bpm1_y.vals.tolist())
+    # replaced log starts a new store
+    pkio.write_text(p, l[0] + "\n")
+    pkeq(1, webcon._monitor_store(p).count)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""PyTest for column cache of :mod:`sirepo.template.zgoubi`
+
+:copyright: Copyright (c) 2023 RadiaSoft LLC.  All Rights Reserved.
+:license: http://www.apache.org/licenses/LICENSE-2.0.html
+"""
+from __future__ import absolute_import, division, print_function
+from pykern import pkio
+from pykern import pkunit
+import pytest
+
+_COLS = "KEX Do1 Yo To Zo Po So to D1 Y T Z P S time ENEKI ENERG IT IREP SORT X BX BY BZ RET DPR PS SX SY SZ KLEY LABEL1 IPASS".split()
+
+
+def test_read_columns():
+    from pykern.pkunit import pkeq
+    from sirepo.template import zgoubi
+    import numpy
+
+    d = pkunit.empty_work_dir()
+    # contiguous passes
+    f = d.join("zgoubi.fai")
+    pkio.write_text(f, _data_file((1, 2, 3)))
+    # passes are not contiguous
+    p = d.join("zgoubi.plt")
+    pkio.write_text(p, _data_file((1, 2, 1, 2)))
+    for x, r in ((f, [[0, 4], [4, 8], [8, 12]]), (p, None)):
+        c = zgoubi._read_columns(x)
+        _assert_columns(zgoubi, x, c)
+        pkeq(r, c.ipassRows)
+    pkeq([1, 2], c.ipasses)
+    pkeq([4, 5, 6, 7, 12, 13, 14, 15], zgoubi._ipass_rows(c, 2).tolist())
+    # cached columns are memory mapped
+    c = zgoubi._read_columns(p)
+    pkeq(True, isinstance(c.columns[0], numpy.memmap))
+    _assert_columns(zgoubi, p, c)
+    pkeq([4, 5, 6, 7, 12, 13, 14, 15], zgoubi._ipass_rows(c, 2).tolist())
+    g = _generations(p)
+    pkeq(1, len(g))
+    # new generation replaces the old one
+    pkio.write_text(p, _data_file((1, 2, 1, 2, 3)))
+    c = zgoubi._read_columns(p)
+    pkeq(False, isinstance(c.columns[0], numpy.memmap))
+    _assert_columns(zgoubi, p, c)
+    pkeq([1, 2, 3], c.ipasses)
+    pkeq([16, 17, 18, 19], zgoubi._ipass_rows(c, 3).tolist())
+    n = _generations(p)
+    pkeq(1, len(n))
+    pkeq(False, g[0] == n[0])
+    pkeq(True, isinstance(zgoubi._read_columns(p).columns[0], numpy.memmap))
+
+
+def _assert_columns(zgoubi, path, columns):
+    from pykern.pkunit import pkeq
+
+    n, r = zgoubi._read_data_file(path)
+    pkeq(n, columns.colNames)
+    pkeq(len(_COLS), columns.columnCount)
+    for i, c in enumerate(columns.columns):
+        e = [x[i] for x in r]
+        if c.dtype.kind == "f":
+            e = [float(x) for x in e]
+        pkeq(e, c.tolist())
+
+
+def _data_file(ipasses):
+    import random
+
+    r = random.Random(1)
+    res = ["@ Zgoubi", "@ title", "", "# " + ", ".join(_COLS), "# units"]
+    for p in ipasses:
+        for i in range(4):
+            v = [f"{r.uniform(-5, 5):.6e}" for _ in _COLS]
+            v[_COLS.index("KEX")] = r.choice(("1", "-1"))
+            v[_COLS.index("IT")] = str(i + 1)
+            v[_COLS.index("KLEY")] = r.choice(("'DRIF     '", "'QUADRUPO  '"))
+            v[_COLS.index("LABEL1")] = f"'L{i}    '"
+            v[_COLS.index("IPASS")] = str(p)
+            res.append("  " + "  ".join(v))
+    return "\n".join(res) + "\n"
+
+
+def _generations(path):
+    return [
+        x.basename
+        for x in path.new(basename=path.basename + ".columns").listdir()
+        if not x.basename.startswith(".")
+    ]
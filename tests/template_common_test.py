@@ -56,3 +56,34 @@ def test_dict_to_from_h5():
     with h5py.File(_TEST_H5_FILE, "r") as f:
         d = template_common.h5_to_dict(f)
     pkunit.pkeq(_TEST_DICT, d)
+
+
+def test_read_step_ranges():
+    from pykern import pkio
+    from pykern.pkcollections import PKDict
+    import os
+
+    def _extend(path, index):
+        s = index.state.pksetdefault(offset=0)
+        calls.append(s.offset)
+        with open(path) as f:
+            f.seek(s.offset)
+            for l in f.readlines():
+                v = [float(x) for x in l.split()]
+                index.steps.append(PKDict(a=[min(v), max(v)]))
+                s.offset += len(l)
+
+    calls = []
+    p = pkio.write_text(pkunit.empty_work_dir().join("out.txt"), "1 3\n-2 5\n")
+    r = template_common.read_step_ranges(p, _extend)
+    pkunit.pkeq([[1, 3], [-2, 5]], [x.a for x in r.steps])
+    pkunit.pkeq([[-2, 5]], [template_common.merge_step_ranges(r.steps).a])
+    template_common.read_step_ranges(p, _extend)
+    pkunit.pkeq([0], calls)
+    with open(p, "a") as f:
+        f.write("7 9\n")
+    os.utime(p, ns=(0, os.stat(p).st_mtime_ns + 1))
+    r = template_common.read_step_ranges(p, _extend)
+    # only the new step is read
+    pkunit.pkeq([0, 9], calls)
+    pkunit.pkeq([-2, 9], template_common.merge_step_ranges(r.steps).a)